@@ -39,6 +39,10 @@ class Settings:
     # Redis (optional)
     redis_url: Optional[str] = os.getenv("REDIS_URL", None)
     
+    # Event logging qua Redis Stream: chỉ bật khi có chạy event worker (scripts/event_worker.py),
+    # nếu không thì interaction logs được ghi PostgreSQL bằng event queue trong process API
+    event_stream_enabled: bool = os.getenv("EVENT_STREAM_ENABLED", "false").lower() == "true"
+
     # Qdrant (optional)
     qdrant_url: Optional[str] = os.getenv("QDRANT_URL", "http://localhost:6333")
 
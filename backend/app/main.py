@@ -1,5 +1,6 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from pathlib import Path
 import time
@@ -28,6 +29,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Nén gzip response JSON lớn (analytics, danh sách items, recommendations)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # Request timeout middleware
 @app.middleware("http")
 async def timeout_middleware(request: Request, call_next):
@@ -105,6 +109,15 @@ async def startup_event():
     print(f"   Type:         Local PostgreSQL (localhost:5432)")
     print(f"   ✅ Status:    Using local database (hardcoded in config)")
     print("\n" + "=" * 60 + "\n")
+    
+    # Event worker: gom batch events rồi ghi PostgreSQL
+    await event.start_event_worker()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush các events còn trong queue trước khi tắt app."""
+    await event.stop_event_worker()
 
 
 @app.get("/")
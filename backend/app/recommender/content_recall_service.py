@@ -3,14 +3,25 @@ Content-Based Recall Service
 ============================
 
 Service để tính content similarity scores sử dụng Qdrant embeddings.
+
+Neighbors của mỗi item được cache trong Redis (hash similar:{item_id}: item_id -> score),
+tính sẵn bằng backend/scripts/precompute_similar_items.py hoặc lazy ở lần search đầu tiên,
+nên trang chi tiết sản phẩm không phải search Qdrant mỗi request.
 """
 
 import logging
 from typing import List, Dict, Optional
 import numpy as np
+import redis
+
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+SIMILAR_ITEMS_KEY = "similar:{item_id}"
+SIMILAR_ITEMS_K = 200  # Số neighbors lưu sẵn cho mỗi item
+SIMILAR_ITEMS_TTL_SECONDS = 7 * 86400  # Neighbors cũ (trước khi train lại embeddings) tự hết hạn sau 7 ngày
+
 
 class ContentBasedRecallService:
     """
@@ -19,16 +30,38 @@ class ContentBasedRecallService:
     Sử dụng Qdrant để tìm items tương tự dựa trên embeddings.
     """
     
-    def __init__(self, qdrant_url: str = "http://localhost:6333"):
+    def __init__(
+        self,
+        qdrant_url: str = "http://localhost:6333",
+        redis_host: str = "localhost",
+        redis_port: int = 6379,
+        redis_db: int = 0,
+        redis_url: Optional[str] = None
+    ):
         """
         Khởi tạo ContentBasedRecallService.
         
         Args:
             qdrant_url: URL của Qdrant server
+            redis_host: Redis host (cache neighbors)
+            redis_port: Redis port
+            redis_db: Redis database number
+            redis_url: Redis URL (default: settings.redis_url); nếu có thì bỏ qua host/port/db
         """
         self.qdrant_url = qdrant_url
         self._qdrant_manager = None
         self._initialized = False
+        redis_url = redis_url or settings.redis_url
+        if redis_url:
+            # Cùng Redis với precompute_similar_items.py
+            self.redis_client = redis.Redis.from_url(redis_url, decode_responses=True)
+        else:
+            self.redis_client = redis.Redis(
+                host=redis_host,
+                port=redis_port,
+                db=redis_db,
+                decode_responses=True
+            )
         
     def _init_qdrant(self):
         """Lazy initialization của Qdrant manager."""
@@ -72,6 +105,62 @@ class ContentBasedRecallService:
                 logger.debug(f"Could not get vector for item {item_id}: {e}")
             return None
     
+    def _load_neighbors(self, item_id: str) -> Optional[List[Dict]]:
+        """HGETALL similar:{item_id}; None nếu cache miss, raise nếu Redis lỗi."""
+        neighbors = self.redis_client.hgetall(SIMILAR_ITEMS_KEY.format(item_id=item_id))
+        if not neighbors:
+            return None
+        
+        results = [{'item_id': neighbor_id, 'score': float(score)} for neighbor_id, score in neighbors.items()]
+        results.sort(key=lambda x: x['score'], reverse=True)
+        return results
+    
+    def get_cached_neighbors(self, item_id: str) -> Optional[List[Dict]]:
+        """
+        Lấy neighbors đã cache của item (HGETALL similar:{item_id}).
+        
+        Args:
+            item_id: Item ID
+            
+        Returns:
+            List of dicts với keys: item_id, score (sort giảm dần theo score),
+            None nếu cache miss hoặc Redis lỗi
+        """
+        try:
+            return self._load_neighbors(item_id)
+        except Exception as e:
+            logger.debug(f"Could not get cached neighbors for item {item_id}: {e}")
+            return None
+    
+    def cache_neighbors(self, item_id: str, neighbors: List[Dict]) -> bool:
+        """
+        Ghi neighbors của item vào Redis (thay thế toàn bộ hash similar:{item_id}, TTL 7 ngày).
+        
+        Neighbors chỉ đổi khi train lại embeddings: chạy lại precompute_similar_items.py
+        để ghi đè ngay, không thì entry cũ tự hết hạn theo TTL.
+        
+        Args:
+            item_id: Item ID
+            neighbors: List of dicts với keys: item_id, score
+            
+        Returns:
+            True nếu thành công, False nếu có lỗi
+        """
+        if not neighbors:
+            return False
+        
+        try:
+            key = SIMILAR_ITEMS_KEY.format(item_id=item_id)
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.delete(key)
+            pipe.hset(key, mapping={n['item_id']: float(n['score']) for n in neighbors})
+            pipe.expire(key, SIMILAR_ITEMS_TTL_SECONDS)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.debug(f"Could not cache neighbors for item {item_id}: {e}")
+            return False
+    
     def compute_content_scores(
         self,
         candidate_item_ids: List[str],
@@ -89,11 +178,22 @@ class ContentBasedRecallService:
         Returns:
             Dict mapping item_id -> content_score (0.0 - 1.0)
         """
+        # Candidates nằm trong neighbors đã cache của reference item: dùng luôn score
+        # (cosine similarity từ Qdrant), chỉ lấy vector cho các candidates còn lại
+        cached_scores = {}
+        if reference_vector is None and reference_item_id:
+            neighbors = self.get_cached_neighbors(reference_item_id)
+            if neighbors:
+                cached_scores = {n['item_id']: max(0.0, min(1.0, n['score'])) for n in neighbors}
+        
+        if cached_scores and all(item_id in cached_scores for item_id in candidate_item_ids):
+            return {item_id: cached_scores[item_id] for item_id in candidate_item_ids}
+        
         self._init_qdrant()
         
         if not self._qdrant_manager:
-            # Nếu không có Qdrant, trả về scores = 0.0
-            return {item_id: 0.0 for item_id in candidate_item_ids}
+            # Nếu không có Qdrant, trả về scores = 0.0 (trừ scores đã cache)
+            return {item_id: cached_scores.get(item_id, 0.0) for item_id in candidate_item_ids}
         
         # Lấy reference vector
         if reference_vector is None and reference_item_id:
@@ -116,6 +216,10 @@ class ContentBasedRecallService:
         content_scores = {}
         
         for item_id in candidate_item_ids:
+            if item_id in cached_scores:
+                content_scores[item_id] = cached_scores[item_id]
+                continue
+            
             try:
                 # Lấy vector của candidate
                 candidate_vector = self.get_item_vector(item_id)
@@ -209,6 +313,44 @@ class ContentBasedRecallService:
             top_k: Số lượng items tương tự
             exclude_items: Danh sách items cần loại bỏ (ví dụ: item hiện tại)
             
+        Returns:
+            List of dicts với keys: item_id, score
+        """
+        search_k = top_k + (len(exclude_items) if exclude_items else 0)
+        
+        # Đủ neighbors trong cache Redis thì không cần search Qdrant
+        cacheable = search_k <= SIMILAR_ITEMS_K
+        results = None
+        if cacheable:
+            try:
+                results = self._load_neighbors(item_id)
+            except Exception as e:
+                # Redis lỗi: search đúng số lượng cần, không ghi cache
+                logger.debug(f"Could not get cached neighbors for item {item_id}: {e}")
+                cacheable = False
+        
+        if results is None:
+            # Chỉ search rộng (SIMILAR_ITEMS_K) khi kết quả được ghi lại vào cache
+            results = self.search_neighbors(item_id, top_k=SIMILAR_ITEMS_K if cacheable else search_k)
+            if cacheable:
+                self.cache_neighbors(item_id, results)
+        
+        # Filter excluded items
+        if exclude_items:
+            exclude_set = set(exclude_items)
+            results = [r for r in results if r.get('item_id') not in exclude_set]
+        
+        # Limit to top_k
+        return results[:top_k]
+    
+    def search_neighbors(self, item_id: str, top_k: int = SIMILAR_ITEMS_K) -> List[Dict]:
+        """
+        Search Qdrant các items gần nhất với item_id (không qua cache).
+        
+        Args:
+            item_id: Item ID
+            top_k: Số lượng neighbors
+            
         Returns:
             List of dicts với keys: item_id, score
         """
@@ -226,18 +368,10 @@ class ContentBasedRecallService:
         try:
             results = self._qdrant_manager.search_similar_items(
                 query_vector=query_vector,
-                top_k=top_k + (len(exclude_items) if exclude_items else 0)
+                top_k=top_k
             )
             
-            # Filter excluded items
-            if exclude_items:
-                exclude_set = set(exclude_items)
-                results = [r for r in results if r.get('item_id') not in exclude_set]
-            
-            # Limit to top_k
-            results = results[:top_k]
-            
-            return results
+            return [{'item_id': r['item_id'], 'score': r['score']} for r in results]
             
         except Exception as e:
             logger.warning(f"Error finding similar items for {item_id}: {e}")
@@ -396,13 +396,8 @@ class RankingService:
         
         # Normalize feature vectors nếu cần (để giảm dominance)
         if self.use_normalization and self.normalizer:
-            # Extract scores để tính stats
-            mf_scores = [fv[0] if len(fv) > 0 else 0.0 for fv in feature_vectors]
-            popularity_scores = [fv[1] if len(fv) > 1 else 0.0 for fv in feature_vectors]
-            
-            # Compute stats và normalize
-            normalized_vectors, stats = self.normalizer.normalize_batch(feature_vectors)
-            feature_vectors = normalized_vectors
+            # Compute stats và normalize (giữ dạng ndarray cho model)
+            X, stats = self.normalizer.normalize_batch(feature_vectors, as_list=False)
             
             if DEBUG_RANKING:
                 logger.info(
@@ -410,9 +405,9 @@ class RankingService:
                     f"MF=[{stats.mf_min:.4f}, {stats.mf_max:.4f}], "
                     f"Pop=[{stats.popularity_min:.4f}, {stats.popularity_max:.4f}]"
                 )
-        
-        # Convert to numpy array
-        X = np.array(feature_vectors)
+        else:
+            # Convert to numpy array
+            X = np.array(feature_vectors)
         
         if DEBUG_RANKING:
             logger.info(f"Feature vectors shape: {X.shape}")
@@ -422,7 +417,7 @@ class RankingService:
             for i in range(num_samples):
                 logger.info(
                     f"  Item {candidate_items[i]}: "
-                    f"features={[f'{f:.4f}' for f in feature_vectors[i]]}"
+                    f"features={[f'{f:.4f}' for f in X[i]]}"
                 )
         
         # Predict scores
@@ -441,7 +436,7 @@ class RankingService:
                     item_id=item_id,
                     rank_score=float(score),
                     rank_position=i + 1,  # Will be updated after sorting
-                    features=feature_vectors[i] if DEBUG_RANKING else None
+                    features=X[i].tolist() if DEBUG_RANKING else None
                 )
             )
         
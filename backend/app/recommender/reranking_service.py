@@ -15,9 +15,12 @@ Rules:
 """
 
 import logging
+from collections import Counter
 from dataclasses import dataclass, field
+from operator import attrgetter
 from typing import List, Optional, Dict, Any
 import redis
+from app.config import settings
 from app.recommender.ranking_service import RankedItem
 
 # Setup logging
@@ -26,8 +29,16 @@ logger = logging.getLogger(__name__)
 # Debug flag
 DEBUG_RERANKING = False
 
+# Rule labels cố định (không cần format lại cho mỗi item)
+_LBL_RECENT_TOP5 = "recent_penalty_top5(-80%)"
+_LBL_RECENT_TOP10 = "recent_penalty_top10(-60%)"
+_LBL_RECENT_OTHER = "recent_penalty(-40%)"
 
-@dataclass
+# Sort key (C-level attribute lookup thay vì lambda)
+_BY_ADJUSTED_SCORE = attrgetter("adjusted_score")
+
+
+@dataclass(slots=True)
 class ReRankedItem:
     """
     Item đã được re-rank với adjusted score và explanation.
@@ -62,6 +73,7 @@ class ReRankingService:
         redis_host: str = "localhost",
         redis_port: int = 6379,
         redis_db: int = 0,
+        redis_url: Optional[str] = None,
         top_n: int = 20,
         min_rating_threshold: int = 5,
         diversity_threshold: float = 0.25,  # Giảm xuống 25% để tăng diversity
@@ -75,18 +87,24 @@ class ReRankingService:
             redis_host: Redis host
             redis_port: Redis port
             redis_db: Redis database number
+            redis_url: Redis URL (default: settings.redis_url); nếu có thì bỏ qua host/port/db
             top_n: Số lượng items top-N cần trả về
             min_rating_threshold: Threshold cho popularity floor rule
             diversity_threshold: Threshold cho diversity rule (0.0 - 1.0)
             diversity_penalty: Penalty factor cho diversity (giảm để penalty mạnh hơn)
             max_same_category: Tối đa số items cùng category trong top-N
         """
-        self.redis_client = redis.Redis(
-            host=redis_host,
-            port=redis_port,
-            db=redis_db,
-            decode_responses=True  # Decode responses to strings
-        )
+        redis_url = redis_url or settings.redis_url
+        if redis_url:
+            # REDIS_URL: cùng Redis với RedisContextService (nơi ghi realtime context)
+            self.redis_client = redis.Redis.from_url(redis_url, decode_responses=True)
+        else:
+            self.redis_client = redis.Redis(
+                host=redis_host,
+                port=redis_port,
+                db=redis_db,
+                decode_responses=True
+            )
         self.top_n = top_n
         self.min_rating_threshold = min_rating_threshold
         self.diversity_threshold = diversity_threshold  # Giảm xuống 25% để tăng diversity
@@ -181,18 +199,19 @@ class ReRankingService:
             boost_factor = min(0.4, 0.08 * interaction_count)
             adjusted_score *= (1.0 + boost_factor)
             applied_rules.append(f"intent_boost({category}:+{boost_factor:.2%})")
-            logger.debug(
-                f"  Intent boost for {item.item_id}: "
-                f"category={category}, count={interaction_count}, "
-                f"boost={boost_factor:.2%}"
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"  Intent boost for {item.item_id}: "
+                    f"category={category}, count={interaction_count}, "
+                    f"boost={boost_factor:.2%}"
+                )
         
         return adjusted_score
     
     def _apply_rule_penalize_recent(
         self,
         item: RankedItem,
-        recent_items: List[str],
+        recent_positions: Dict[str, int],
         adjusted_score: float,
         applied_rules: List[str]
     ) -> float:
@@ -206,86 +225,84 @@ class ReRankingService:
         
         Args:
             item: RankedItem
-            recent_items: List of recent item_ids (mới nhất ở đầu)
+            recent_positions: Dict mapping item_id -> vị trí trong recent items (0 = mới nhất)
             adjusted_score: Current adjusted score
             applied_rules: List to append rule name
             
         Returns:
             Adjusted score
         """
-        if item.item_id in recent_items:
-            # Tìm vị trí trong recent_items (0 = mới nhất)
-            position = recent_items.index(item.item_id)
-            
+        # Tìm vị trí trong recent items (0 = mới nhất), O(1) thay vì list.index
+        position = recent_positions.get(item.item_id)
+        if position is not None:
             if position < 5:
                 # Top 5 items gần nhất: penalty mạnh nhất
                 penalty = 0.2
-                applied_rules.append(f"recent_penalty_top5(-80%)")
+                applied_rules.append(_LBL_RECENT_TOP5)
             elif position < 10:
                 # Top 10 items: penalty vừa
                 penalty = 0.4
-                applied_rules.append(f"recent_penalty_top10(-60%)")
+                applied_rules.append(_LBL_RECENT_TOP10)
             else:
                 # Còn lại: penalty nhẹ
                 penalty = 0.6
-                applied_rules.append(f"recent_penalty(-40%)")
+                applied_rules.append(_LBL_RECENT_OTHER)
             
             adjusted_score *= penalty
-            logger.debug(
-                f"  Recent penalty for {item.item_id}: "
-                f"position={position}, penalty={penalty:.1%}"
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"  Recent penalty for {item.item_id}: "
+                    f"position={position}, penalty={penalty:.1%}"
+                )
         
         return adjusted_score
     
-    def _apply_rule_diversity(
-        self,
-        item_category: Optional[str],
-        top_items_categories: List[Optional[str]],
-        adjusted_score: float,
-        applied_rules: List[str]
-    ) -> float:
+    def _diversity_pass(self, window: List[ReRankedItem]) -> bool:
         """
-        Rule 3: Diversity penalty.
+        Rule 3: Diversity penalty (một lượt trên top window, mutate in place).
         
-        Nếu top-N có quá nhiều items cùng category:
-        Penalize các item trùng category: adjusted_score *= 0.85
+        - Category chiếm > diversity_threshold: adjusted_score *= diversity_penalty
+        - Category vượt quá max_same_category: adjusted_score *= 0.5
         
         Args:
-            item_category: Category của item hiện tại
-            top_items_categories: List of categories của top items
-            adjusted_score: Current adjusted score
-            applied_rules: List to append rule name
+            window: Top items (đã sort theo adjusted_score DESC)
             
         Returns:
-            Adjusted score
+            True nếu có ít nhất một penalty được áp dụng
         """
-        if not item_category:
-            return adjusted_score
-        
-        # Đếm số items cùng category trong top items
-        category_count = sum(1 for cat in top_items_categories if cat == item_category)
-        
-        # Nếu category chiếm > threshold thì penalty
-        if len(top_items_categories) > 0:
-            category_ratio = category_count / len(top_items_categories)
-            if category_ratio > self.diversity_threshold:
-                adjusted_score *= self.diversity_penalty
-                applied_rules.append(f"diversity_penalty({category_ratio:.1%})")
-                logger.debug(
-                    f"  Diversity penalty: category={item_category}, ratio={category_ratio:.1%}, "
-                    f"penalty={self.diversity_penalty}"
-                )
-        
-        # Thêm rule: Nếu đã có quá nhiều items cùng category trong top-N, penalty mạnh hơn
-        if category_count >= self.max_same_category:
-            adjusted_score *= 0.6  # Penalty mạnh hơn
-            applied_rules.append(f"category_limit_exceeded({category_count})")
-            logger.debug(
-                f"  Category limit penalty: category={item_category}, count={category_count}"
-            )
-        
-        return adjusted_score
+        # Recalculate category counts
+        category_counts = Counter(item.category for item in window if item.category)
+        
+        # Loop invariant: ratio > threshold <=> count > total_top * threshold
+        total_top = sum(category_counts.values())
+        count_threshold = total_top * self.diversity_threshold
+        
+        penalty_applied = False
+        for reranked_item in window:
+            if reranked_item.category:
+                category_count = category_counts[reranked_item.category]
+                
+                # Penalty nếu category chiếm quá nhiều (giảm threshold)
+                if category_count > count_threshold:
+                    penalty = self.diversity_penalty
+                    reranked_item.adjusted_score *= penalty
+                    penalty_applied = True
+                    # Ratio chỉ cần cho label (trả về trong applied_rules)
+                    label = f"diversity_penalty({category_count / total_top:.1%})"
+                    if label not in reranked_item.applied_rules:
+                        reranked_item.applied_rules.append(label)
+                
+                # Penalty nếu vượt quá max_same_category (giảm threshold)
+                if category_count > self.max_same_category:
+                    penalty = 0.5  # Penalty mạnh hơn
+                    reranked_item.adjusted_score *= penalty
+                    penalty_applied = True
+                    if f"category_limit_exceeded({category_count})" not in reranked_item.applied_rules:
+                        reranked_item.applied_rules.append(
+                            f"category_limit_exceeded({category_count})"
+                        )
+        
+        return penalty_applied
     
     def _apply_rule_popularity_floor(
         self,
@@ -315,13 +332,73 @@ class ReRankingService:
         if rating_number is not None and rating_number < self.min_rating_threshold:
             adjusted_score *= 0.9
             applied_rules.append(f"popularity_floor(rating={rating_number})")
-            logger.debug(
-                f"  Popularity floor penalty for {item.item_id}: "
-                f"rating_number={rating_number}"
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"  Popularity floor penalty for {item.item_id}: "
+                    f"rating_number={rating_number}"
+                )
         
         return adjusted_score
     
+    def _rerank_item(
+        self,
+        item: RankedItem,
+        recent_positions: Dict[str, int],
+        recent_categories: Dict[str, int]
+    ) -> ReRankedItem:
+        """
+        Áp dụng rules 1, 2, 4 cho một item và tạo ReRankedItem.
+        
+        Args:
+            item: RankedItem
+            recent_positions: Dict mapping item_id -> vị trí trong recent items
+            recent_categories: Dict of category -> count
+            
+        Returns:
+            ReRankedItem (rank_position = 0, sẽ được update sau khi sort)
+        """
+        # Khởi tạo adjusted_score = rank_score
+        adjusted_score = item.rank_score
+        applied_rules = []
+        
+        # Lấy metadata từ item
+        category = item.category
+        if not category and hasattr(item, 'raw_signals') and item.raw_signals:
+            category = item.raw_signals.get('category') or item.raw_signals.get('main_category')
+        
+        rating_number = item.rating_number
+        if rating_number is None and hasattr(item, 'raw_signals') and item.raw_signals:
+            rating_number = item.raw_signals.get('rating_number')
+        
+        # Rule 1: Intent boost (no-op khi user chưa có recent categories)
+        if recent_categories:
+            adjusted_score = self._apply_rule_intent_boost(
+                item, recent_categories, adjusted_score, applied_rules
+            )
+        
+        # Rule 2: Penalize recent items (no-op khi user chưa có recent items)
+        if recent_positions:
+            adjusted_score = self._apply_rule_penalize_recent(
+                item, recent_positions, adjusted_score, applied_rules
+            )
+        
+        # Rule 3: Diversity (cần top items để tính) - áp dụng sau khi sort
+        
+        # Rule 4: Popularity floor
+        adjusted_score = self._apply_rule_popularity_floor(
+            item, adjusted_score, applied_rules
+        )
+        
+        return ReRankedItem(
+            item_id=item.item_id,
+            rank_score=item.rank_score,
+            adjusted_score=adjusted_score,
+            rank_position=0,  # Will be updated after sorting
+            applied_rules=applied_rules,
+            category=category,
+            rating_number=rating_number
+        )
+    
     def rerank_items(
         self,
         user_id: str,
@@ -351,129 +428,44 @@ class ReRankingService:
             f"Redis context: {len(recent_items)} recent items, "
             f"{len(recent_categories)} recent categories"
         )
+        if not recent_items and not recent_categories:
+            # Cold-start user: rules 1 và 2 chắc chắn không áp dụng
+            logger.debug(f"Empty Redis context for user {user_id}, skipping intent/recent rules")
         
-        # Apply rules cho từng item
-        reranked_items = []
+        # Index vị trí recent items một lần (giữ vị trí mới nhất nếu trùng)
+        recent_positions = {
+            item_id: position
+            for position, item_id in reversed(list(enumerate(recent_items)))
+        }
         
-        for item in ranked_items:
-            # Khởi tạo adjusted_score = rank_score
-            adjusted_score = item.rank_score
-            applied_rules = []
-            
-            # Lấy metadata từ item
-            category = item.category
-            if not category and hasattr(item, 'raw_signals') and item.raw_signals:
-                category = item.raw_signals.get('category') or item.raw_signals.get('main_category')
-            
-            rating_number = item.rating_number
-            if rating_number is None and hasattr(item, 'raw_signals') and item.raw_signals:
-                rating_number = item.raw_signals.get('rating_number')
-            
-            # Rule 1: Intent boost
-            adjusted_score = self._apply_rule_intent_boost(
-                item, recent_categories, adjusted_score, applied_rules
-            )
-            
-            # Rule 2: Penalize recent items
-            adjusted_score = self._apply_rule_penalize_recent(
-                item, recent_items, adjusted_score, applied_rules
-            )
-            
-            # Rule 3: Diversity (cần top items để tính)
-            # Tạm thời skip, sẽ áp dụng sau khi có top items
-            # adjusted_score = self._apply_rule_diversity(
-            #     item, ranked_items[:self.top_n], adjusted_score, applied_rules
-            # )
-            
-            # Rule 4: Popularity floor
-            adjusted_score = self._apply_rule_popularity_floor(
-                item, adjusted_score, applied_rules
-            )
-            
-            # Tạo ReRankedItem
-            reranked_item = ReRankedItem(
-                item_id=item.item_id,
-                rank_score=item.rank_score,
-                adjusted_score=adjusted_score,
-                rank_position=0,  # Will be updated after sorting
-                applied_rules=applied_rules,
-                category=category,
-                rating_number=rating_number
-            )
-            
-            reranked_items.append(reranked_item)
+        # Apply rules cho từng item
+        reranked_items = [
+            self._rerank_item(item, recent_positions, recent_categories)
+            for item in ranked_items
+        ]
         
         # Sort theo adjusted_score
-        reranked_items_sorted = sorted(
-            reranked_items,
-            key=lambda x: x.adjusted_score,
-            reverse=True
-        )
+        reranked_items_sorted = sorted(reranked_items, key=_BY_ADJUSTED_SCORE, reverse=True)
         
         # Apply diversity rule cho top items (iterative để đảm bảo diversity tốt)
         # Lấy top items để tính diversity (lấy nhiều hơn để có buffer)
         top_items_for_diversity = reranked_items_sorted[:min(self.top_n * 3, len(reranked_items_sorted))]
         
-        # Tính category distribution trong top items
-        category_counts = {}
-        for item in top_items_for_diversity:
-            if item.category:
-                category_counts[item.category] = category_counts.get(item.category, 0) + 1
-        
         # Áp dụng diversity penalty cho top items (iterative để đảm bảo diversity tốt)
         max_iterations = 3
         for iteration in range(max_iterations):
             # Sort lại sau mỗi iteration
-            top_items_for_diversity = sorted(
-                top_items_for_diversity,
-                key=lambda x: x.adjusted_score,
-                reverse=True
-            )
+            top_items_for_diversity.sort(key=_BY_ADJUSTED_SCORE, reverse=True)
             
-            # Recalculate category counts
-            category_counts = {}
-            for item in top_items_for_diversity[:self.top_n * 2]:
-                if item.category:
-                    category_counts[item.category] = category_counts.get(item.category, 0) + 1
-            
-            # Apply penalties
-            penalty_applied = False
-            for reranked_item in top_items_for_diversity[:self.top_n * 2]:
-                if reranked_item.category:
-                    category_count = category_counts.get(reranked_item.category, 0)
-                    total_top = len([x for x in top_items_for_diversity[:self.top_n * 2] if x.category])
-                    category_ratio = category_count / total_top if total_top > 0 else 0
-                    
-                    # Penalty nếu category chiếm quá nhiều (giảm threshold)
-                    if category_ratio > self.diversity_threshold:
-                        penalty = self.diversity_penalty
-                        reranked_item.adjusted_score *= penalty
-                        penalty_applied = True
-                        if f"diversity_penalty({category_ratio:.1%})" not in reranked_item.applied_rules:
-                            reranked_item.applied_rules.append(
-                                f"diversity_penalty({category_ratio:.1%})"
-                            )
-                    
-                    # Penalty nếu vượt quá max_same_category (giảm threshold)
-                    if category_count > self.max_same_category:
-                        penalty = 0.5  # Penalty mạnh hơn
-                        reranked_item.adjusted_score *= penalty
-                        penalty_applied = True
-                        if f"category_limit_exceeded({category_count})" not in reranked_item.applied_rules:
-                            reranked_item.applied_rules.append(
-                                f"category_limit_exceeded({category_count})"
-                            )
+            penalty_applied = self._diversity_pass(top_items_for_diversity[:self.top_n * 2])
             
             # Nếu không có penalty nào được áp dụng, dừng iteration
             if not penalty_applied:
                 break
         
         # Sort lại sau khi áp dụng diversity
-        reranked_items_sorted = sorted(
-            reranked_items,
-            key=lambda x: x.adjusted_score,
-            reverse=True
-        )
+        reranked_items.sort(key=_BY_ADJUSTED_SCORE, reverse=True)
+        reranked_items_sorted = reranked_items
         
         # Deduplication: Loại bỏ items trùng lặp
         # 1. Deduplicate theo item_id (ASIN)
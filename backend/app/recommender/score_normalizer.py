@@ -13,24 +13,120 @@ Features:
 """
 
 import logging
+import math
+import threading
 import numpy as np
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+from typing import Callable, List, Dict, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def _clip01(x: float) -> float:
+    """Clip scalar về [0, 1] (tránh NumPy ufunc dispatch cho Python float)."""
+    return 0.0 if x < 0.0 else (1.0 if x > 1.0 else float(x))
+
+
+def _column_stats(values: np.ndarray) -> Tuple[float, float, float, float]:
+    """
+    (min, max, mean, std) của một cột, mỗi reduction chỉ chạy một lần.
+    
+    Cột rỗng trả về identity stats; std = 1.0 nếu cột là hằng số.
+    """
+    if values.size == 0:
+        return 0.0, 1.0, 0.0, 1.0
+    
+    mean = values.mean()
+    std = float(np.sqrt(np.square(values - mean).mean()))
+    return float(values.min()), float(values.max()), float(mean), (std if std > 0 else 1.0)
+
+
+def _make_row_normalizer(
+    coefficients: Tuple[Tuple[float, float, float, float], ...]
+) -> Callable[[List[float]], List[float]]:
+    """
+    Tạo hàm normalize một feature vector với (scale, bias, lo, hi) của từng feature
+    đã bind sẵn thành hằng số trong closure.
+    
+    4 phần tử: Python float arithmetic nhanh hơn NumPy dispatch cho mỗi ufunc.
+    """
+    (
+        (s0, b0, lo0, hi0),
+        (s1, b1, lo1, hi1),
+        (s2, b2, lo2, hi2),
+        (s3, b3, lo3, hi3),
+    ) = coefficients
+    
+    def normalize_row(features: List[float]) -> List[float]:
+        x0, x1, x2, x3 = features[:4]
+        return [
+            min(max(x0 * s0 + b0, lo0), hi0),
+            min(max(x1 * s1 + b1, lo1), hi1),
+            min(max(x2 * s2 + b2, lo2), hi2),
+            min(max(x3 * s3 + b3, lo3), hi3),
+        ]
+    
+    return normalize_row
+
+
+def _sigmoid(z: float) -> float:
+    """Sigmoid cho scalar bằng math.exp (không overflow với |z| lớn)."""
+    if z >= 0.0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
+
+
+def _stats_field(index: int) -> property:
+    """Named accessor cho một phần tử của NormalizationStats array."""
+    return property(lambda self: float(self._a[index]))
+
+
 class NormalizationStats:
-    """Statistics để normalize scores."""
-    mf_min: float = 0.0
-    mf_max: float = 1.0
-    mf_mean: float = 0.0
-    mf_std: float = 1.0
-    popularity_min: float = 0.0
-    popularity_max: float = 1.0
-    popularity_mean: float = 0.0
-    popularity_std: float = 1.0
+    """
+    Statistics để normalize scores.
+    
+    Lưu trong một float32 array shape (8,):
+    [mf_min, mf_max, mf_mean, mf_std, popularity_min, popularity_max, popularity_mean, popularity_std]
+    """
+    __slots__ = ("_a",)
+    
+    def __init__(
+        self,
+        mf_min: float = 0.0,
+        mf_max: float = 1.0,
+        mf_mean: float = 0.0,
+        mf_std: float = 1.0,
+        popularity_min: float = 0.0,
+        popularity_max: float = 1.0,
+        popularity_mean: float = 0.0,
+        popularity_std: float = 1.0
+    ):
+        self._a = np.array([
+            mf_min, mf_max, mf_mean, mf_std,
+            popularity_min, popularity_max, popularity_mean, popularity_std
+        ], dtype=np.float32)
+    
+    mf_min = _stats_field(0)
+    mf_max = _stats_field(1)
+    mf_mean = _stats_field(2)
+    mf_std = _stats_field(3)
+    popularity_min = _stats_field(4)
+    popularity_max = _stats_field(5)
+    popularity_mean = _stats_field(6)
+    popularity_std = _stats_field(7)
+    
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, NormalizationStats):
+            return NotImplemented
+        return bool(np.array_equal(self._a, other._a))
+    
+    def __repr__(self) -> str:
+        return (
+            f"NormalizationStats(mf_min={self.mf_min}, mf_max={self.mf_max}, "
+            f"mf_mean={self.mf_mean}, mf_std={self.mf_std}, "
+            f"popularity_min={self.popularity_min}, popularity_max={self.popularity_max}, "
+            f"popularity_mean={self.popularity_mean}, popularity_std={self.popularity_std})"
+        )
 
 
 class ScoreNormalizer:
@@ -64,23 +160,46 @@ class ScoreNormalizer:
             content_weight: Weight cho content score
         """
         self.normalization_method = normalization_method
-        self.stats: Optional[NormalizationStats] = None
+        # Identity stats (min=0, max=1, mean=0, std=1) cho đến batch đầu tiên
+        # (gán thẳng _stats: coefficients được compile ở cuối __init__)
+        self._stats = NormalizationStats()
         
         # Feature weights để balance dominance
-        if feature_weights:
-            self.feature_weights = feature_weights
-        else:
-            self.feature_weights = {
-                "mf_score": mf_weight,
-                "popularity_score": popularity_weight,  # Giảm weight
-                "rating_score": rating_weight,
-                "content_score": content_weight
-            }
-        
-        logger.info(
-            f"ScoreNormalizer initialized: method={normalization_method}, "
-            f"weights={self.feature_weights}"
-        )
+        self.feature_weights = feature_weights or {
+            "mf_score": mf_weight,
+            "popularity_score": popularity_weight,  # Giảm weight
+            "rating_score": rating_weight,
+            "content_score": content_weight
+        }
+        
+        # Weight vector theo feature order (materialize một lần)
+        self._weights = np.array([
+            self.feature_weights.get("mf_score", 1.0),
+            self.feature_weights.get("popularity_score", 0.8),
+            self.feature_weights.get("rating_score", 1.0),
+            self.feature_weights.get("content_score", 1.0)
+        ], dtype=np.float32)
+        self._row_weights = tuple(self._weights.tolist())
+        
+        # Compile ngay để call đầu tiên cũng chạy fast path
+        self._compile_row_normalizer()
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "ScoreNormalizer initialized: method=%s, weights=%s",
+                self.normalization_method, self.feature_weights
+            )
+    
+    @property
+    def stats(self) -> NormalizationStats:
+        """Stats đang dùng để normalize."""
+        return self._stats
+    
+    @stats.setter
+    def stats(self, stats: NormalizationStats) -> None:
+        # NormalizationStats không đổi sau khi tạo: chỉ cần compile lại khi gán stats mới
+        self._stats = stats
+        self._compile_row_normalizer()
     
     def compute_stats(
         self,
@@ -97,18 +216,21 @@ class ScoreNormalizer:
         Returns:
             NormalizationStats
         """
-        mf_array = np.array(mf_scores)
-        pop_array = np.array(popularity_scores)
+        mf_array = np.asarray(mf_scores, dtype=np.float32)
+        pop_array = np.asarray(popularity_scores, dtype=np.float32)
+        
+        mf_min, mf_max, mf_mean, mf_std = _column_stats(mf_array)
+        pop_min, pop_max, pop_mean, pop_std = _column_stats(pop_array)
         
         stats = NormalizationStats(
-            mf_min=float(np.min(mf_array)) if len(mf_array) > 0 else 0.0,
-            mf_max=float(np.max(mf_array)) if len(mf_array) > 0 else 1.0,
-            mf_mean=float(np.mean(mf_array)) if len(mf_array) > 0 else 0.0,
-            mf_std=float(np.std(mf_array)) if len(mf_array) > 0 and np.std(mf_array) > 0 else 1.0,
-            popularity_min=float(np.min(pop_array)) if len(pop_array) > 0 else 0.0,
-            popularity_max=float(np.max(pop_array)) if len(pop_array) > 0 else 1.0,
-            popularity_mean=float(np.mean(pop_array)) if len(pop_array) > 0 else 0.0,
-            popularity_std=float(np.std(pop_array)) if len(pop_array) > 0 and np.std(pop_array) > 0 else 1.0
+            mf_min=mf_min,
+            mf_max=mf_max,
+            mf_mean=mf_mean,
+            mf_std=mf_std,
+            popularity_min=pop_min,
+            popularity_max=pop_max,
+            popularity_mean=pop_mean,
+            popularity_std=pop_std
         )
         
         return stats
@@ -123,30 +245,26 @@ class ScoreNormalizer:
         Returns:
             Normalized MF score [0, 1]
         """
-        if self.stats is None:
-            # Fallback: clip to [0, 1] nếu chưa có stats
-            return float(np.clip(mf_score, 0.0, 1.0))
-        
         if self.normalization_method == "min_max":
             # Min-Max normalization
             if self.stats.mf_max > self.stats.mf_min:
                 normalized = (mf_score - self.stats.mf_min) / (self.stats.mf_max - self.stats.mf_min)
             else:
                 normalized = 0.5  # Fallback
-            return float(np.clip(normalized, 0.0, 1.0))
+            return _clip01(normalized)
         
         elif self.normalization_method == "z_score":
             # Z-score normalization (sau đó clip về [0, 1])
             if self.stats.mf_std > 0:
                 z_score = (mf_score - self.stats.mf_mean) / self.stats.mf_std
                 # Convert z-score to [0, 1] using sigmoid
-                normalized = 1.0 / (1.0 + np.exp(-z_score))
+                normalized = _sigmoid(z_score)
             else:
                 normalized = 0.5
-            return float(np.clip(normalized, 0.0, 1.0))
+            return _clip01(normalized)
         
         else:
-            return float(np.clip(mf_score, 0.0, 1.0))
+            return _clip01(mf_score)
     
     def normalize_popularity_score(self, popularity_score: float) -> float:
         """
@@ -158,9 +276,6 @@ class ScoreNormalizer:
         Returns:
             Normalized popularity score [0, 1]
         """
-        if self.stats is None:
-            return float(np.clip(popularity_score, 0.0, 1.0))
-        
         if self.normalization_method == "min_max":
             if self.stats.popularity_max > self.stats.popularity_min:
                 normalized = (popularity_score - self.stats.popularity_min) / (
@@ -168,18 +283,18 @@ class ScoreNormalizer:
                 )
             else:
                 normalized = 0.5
-            return float(np.clip(normalized, 0.0, 1.0))
+            return _clip01(normalized)
         
         elif self.normalization_method == "z_score":
             if self.stats.popularity_std > 0:
                 z_score = (popularity_score - self.stats.popularity_mean) / self.stats.popularity_std
-                normalized = 1.0 / (1.0 + np.exp(-z_score))
+                normalized = _sigmoid(z_score)
             else:
                 normalized = 0.5
-            return float(np.clip(normalized, 0.0, 1.0))
+            return _clip01(normalized)
         
         else:
-            return float(np.clip(popularity_score, 0.0, 1.0))
+            return _clip01(popularity_score)
     
     def normalize_feature_vector(
         self,
@@ -191,31 +306,33 @@ class ScoreNormalizer:
         
         Args:
             features: [mf_score, popularity_score, rating_score, content_score]
+                (ít nhất 4 phần tử; padding cho batch được xử lý ở normalize_batch)
             apply_weights: Có apply weights không
             
         Returns:
             Normalized và weighted feature vector
         """
-        if len(features) < 4:
-            # Pad với 0 nếu thiếu
-            features = list(features) + [0.0] * (4 - len(features))
-        
         mf_score, popularity_score, rating_score, content_score = features[:4]
         
+        # Fast path: min_max + weights dùng lại affine coefficients đã compile
+        if apply_weights and self.normalization_method == "min_max":
+            return self._row_normalizer(features)
+        
         # Normalize
         normalized_mf = self.normalize_mf_score(mf_score)
         normalized_pop = self.normalize_popularity_score(popularity_score)
         
         # Rating và content đã được normalize (0-1)
-        normalized_rating = float(np.clip(rating_score, 0.0, 1.0))
-        normalized_content = float(np.clip(content_score, 0.0, 1.0))
+        normalized_rating = _clip01(rating_score)
+        normalized_content = _clip01(content_score)
         
         # Apply weights nếu cần
         if apply_weights:
-            normalized_mf *= self.feature_weights.get("mf_score", 1.0)
-            normalized_pop *= self.feature_weights.get("popularity_score", 0.8)
-            normalized_rating *= self.feature_weights.get("rating_score", 1.0)
-            normalized_content *= self.feature_weights.get("content_score", 1.0)
+            mf_weight, pop_weight, rating_weight, content_weight = self._row_weights
+            normalized_mf *= mf_weight
+            normalized_pop *= pop_weight
+            normalized_rating *= rating_weight
+            normalized_content *= content_weight
         
         return [
             normalized_mf,
@@ -226,38 +343,129 @@ class ScoreNormalizer:
     
     def normalize_batch(
         self,
-        feature_vectors: List[List[float]]
-    ) -> Tuple[List[List[float]], NormalizationStats]:
+        feature_vectors: Union[List[List[float]], np.ndarray],
+        as_list: bool = True
+    ) -> Tuple[Union[List[List[float]], np.ndarray], NormalizationStats]:
         """
         Normalize batch of feature vectors.
         
         Args:
-            feature_vectors: List of feature vectors
+            feature_vectors: List of feature vectors hoặc array shape (n_samples, n_features)
+            as_list: True -> trả về List[List[float]], False -> trả về float32 np.ndarray
             
         Returns:
             Tuple of (normalized_vectors, stats)
         """
-        if not feature_vectors:
-            return [], NormalizationStats()
+        if len(feature_vectors) == 0:
+            empty = [] if as_list else np.empty((0, 4), dtype=np.float32)
+            return empty, NormalizationStats()
+        
+        # (N, 4) float32 matrix, mỗi cột là một feature
+        if isinstance(feature_vectors, np.ndarray):
+            # Không copy nếu đã đúng dtype/layout
+            arr = np.ascontiguousarray(feature_vectors, dtype=np.float32)
+        else:
+            arr = np.asarray(feature_vectors, dtype=np.float32)
+        if arr.ndim != 2:
+            raise ValueError(
+                f"feature_vectors phải có shape (n_samples, n_features), got {arr.shape}"
+            )
         
-        # Extract scores để tính stats
-        mf_scores = [fv[0] if len(fv) > 0 else 0.0 for fv in feature_vectors]
-        popularity_scores = [fv[1] if len(fv) > 1 else 0.0 for fv in feature_vectors]
+        # Fixed-width layout: cắt về 4 cột, pad 0 một lần cho cả batch nếu thiếu
+        if arr.shape[1] > 4:
+            arr = np.ascontiguousarray(arr[:, :4])
+        elif arr.shape[1] < 4:
+            arr = np.pad(arr, ((0, 0), (0, 4 - arr.shape[1])))
         
-        # Compute stats
-        self.stats = self.compute_stats(mf_scores, popularity_scores)
+        # Compute stats trên cột MF và popularity
+        # Stats/coefficients là biến local: instance là singleton dùng chung giữa các
+        # executor threads nên batch path không gán self.stats
+        stats = self.compute_stats(arr[:, 0], arr[:, 1])
+        scale, bias, clip_lo, clip_hi, is_identity = self._compile_affine(stats)
         
-        # Normalize từng vector
-        normalized_vectors = [
-            self.normalize_feature_vector(fv, apply_weights=True)
-            for fv in feature_vectors
-        ]
+        if is_identity:
+            # scale = 1, bias = 0 (weights = 1, stats identity): chỉ cần clip
+            out = np.clip(arr, 0.0, 1.0)
+        else:
+            # Fused normalize + weight: out = clip(x * scale + bias, lo, hi)
+            out = arr * scale
+            out += bias
+            if self.normalization_method == "z_score":
+                # Cột MF/popularity lúc này là z/2: weight * sigmoid(z) == w/2 * tanh(z/2) + w/2
+                half_weights = 0.5 * self._weights[:2]
+                out[:, :2] = half_weights * np.tanh(out[:, :2]) + half_weights
+            np.clip(out, clip_lo, clip_hi, out=out)
         
-        return normalized_vectors, self.stats
+        return (out.tolist() if as_list else out), stats
+    
+    def _compile_affine(
+        self,
+        stats: NormalizationStats
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, bool]:
+        """
+        Precompute affine coefficients từ stats và feature weights.
+        
+        min_max: weight * clip((x - min) / (max - min), 0, 1) == clip(x * scale + bias, lo, hi)
+        với scale = weight / (max - min), bias = -min * scale, [lo, hi] = [0, weight].
+        z_score: scale/bias cho cột MF/popularity tính ra z-score / 2 (sigmoid qua tanh áp dụng sau).
+        Rating/content (đã ở [0, 1]): scale = weight, bias = 0.
+        
+        Không đọc/ghi state của instance ngoài weights (an toàn khi gọi song song).
+        
+        Returns:
+            Tuple of (scale, bias, clip_lo, clip_hi, is_identity)
+        """
+        # Hàng 0: MF, hàng 1: popularity; mỗi hàng (min, max, mean, std)
+        column_stats = stats._a.reshape(2, 4).tolist()
+        
+        weights = self._weights
+        scale = weights.copy()
+        bias = np.zeros(4, dtype=np.float32)
+        
+        for col, (col_min, col_max, col_mean, col_std) in enumerate(column_stats):
+            if self.normalization_method == "min_max":
+                if col_max > col_min:
+                    scale[col] = weights[col] / (col_max - col_min)
+                    bias[col] = -col_min * scale[col]
+                else:
+                    # Fallback 0.5
+                    scale[col] = 0.0
+                    bias[col] = 0.5 * weights[col]
+            elif self.normalization_method == "z_score":
+                if col_std > 0:
+                    scale[col] = 0.5 / col_std
+                    bias[col] = -0.5 * col_mean / col_std
+                else:
+                    # z = 0 -> sigmoid = 0.5
+                    scale[col] = 0.0
+                    bias[col] = 0.0
+        
+        clip_lo = np.minimum(weights, 0.0)
+        clip_hi = np.maximum(weights, 0.0)
+        is_identity = (
+            self.normalization_method != "z_score"
+            and bool(np.all(scale == 1.0))
+            and bool(np.all(bias == 0.0))
+        )
+        return scale, bias, clip_lo, clip_hi, is_identity
+    
+    def _compile_row_normalizer(self) -> None:
+        """
+        Specialize per-vector path (normalize_feature_vector) theo self.stats.
+        
+        Được gọi một lần trong __init__ và mỗi khi gán stats (stats setter),
+        không gọi trên per-row path hay trong normalize_batch.
+        """
+        scale, bias, clip_lo, clip_hi, _ = self._compile_affine(self._stats)
+        # Coefficients (Python float) bind sẵn vào closure
+        self._row_normalizer = _make_row_normalizer(
+            tuple(zip(scale.tolist(), bias.tolist(), clip_lo.tolist(), clip_hi.tolist()))
+        )
 
 
 # Singleton instance
 _normalizer_instance: Optional[ScoreNormalizer] = None
+_normalizer_lock = threading.Lock()
 
 
 def get_score_normalizer(
@@ -277,10 +485,13 @@ def get_score_normalizer(
     global _normalizer_instance
     
     if _normalizer_instance is None:
-        _normalizer_instance = ScoreNormalizer(
-            normalization_method=normalization_method,
-            popularity_weight=popularity_weight
-        )
+        # Double-checked locking: chỉ một thread khởi tạo instance
+        with _normalizer_lock:
+            if _normalizer_instance is None:
+                _normalizer_instance = ScoreNormalizer(
+                    normalization_method=normalization_method,
+                    popularity_weight=popularity_weight
+                )
     
     return _normalizer_instance
 
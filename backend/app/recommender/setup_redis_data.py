@@ -7,6 +7,7 @@ Usage:
 """
 
 import sys
+import time
 from pathlib import Path
 import redis
 
@@ -14,6 +15,16 @@ import redis
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(BASE_DIR))
 
+# Connection pool dùng chung cho module (keepalive + health check)
+REDIS_URL = "redis://localhost:6379/0"
+_POOL = redis.ConnectionPool.from_url(
+    REDIS_URL,
+    decode_responses=True,
+    socket_keepalive=True,
+    health_check_interval=30,
+    max_connections=32
+)
+
 
 def setup_redis_data():
     """Setup mock Redis data cho testing."""
@@ -24,12 +35,7 @@ def setup_redis_data():
     
     # Kết nối Redis
     try:
-        client = redis.Redis(
-            host="localhost",
-            port=6379,
-            db=0,
-            decode_responses=True
-        )
+        client = redis.Redis(connection_pool=_POOL)
         
         # Test connection
         client.ping()
@@ -46,30 +52,42 @@ def setup_redis_data():
     
     print(f"\nSetting up data for user: {test_user_id}")
     
-    # 1. Recent items (List)
     key_items = f"user:{test_user_id}:recent_items"
-    client.delete(key_items)
-    client.lpush(key_items, "item_2", "item_4", "item_6")
-    client.expire(key_items, 1800)  # TTL 30 phút
-    print(f"  ✅ Recent items: {client.lrange(key_items, 0, -1)}")
+    key_categories = f"user:{test_user_id}:recent_categories"
+    key_last_active = f"user:{test_user_id}:last_active"
+    
+    # Ghi tất cả keys trong một pipeline (MULTI/EXEC, 1 round-trip)
+    pipe = client.pipeline(transaction=True)
+    
+    # 1. Recent items (List)
+    pipe.delete(key_items)
+    pipe.lpush(key_items, "item_2", "item_4", "item_6")
+    pipe.expire(key_items, 1800)  # TTL 30 phút
     
     # 2. Recent categories (Hash)
-    key_categories = f"user:{test_user_id}:recent_categories"
-    client.delete(key_categories)
-    client.hset(key_categories, mapping={
+    pipe.delete(key_categories)
+    pipe.hset(key_categories, mapping={
         "Electronics": "5",
         "Fashion": "2",
         "Home": "1"
     })
-    client.expire(key_categories, 1800)  # TTL 30 phút
-    print(f"  ✅ Recent categories: {client.hgetall(key_categories)}")
+    pipe.expire(key_categories, 1800)  # TTL 30 phút
     
     # 3. Last active (String)
-    key_last_active = f"user:{test_user_id}:last_active"
-    import time
-    client.set(key_last_active, str(int(time.time())))
-    client.expire(key_last_active, 1800)
-    print(f"  ✅ Last active: {client.get(key_last_active)}")
+    pipe.set(key_last_active, str(int(time.time())), ex=1800)  # SET ... EX, TTL 30 phút
+    
+    pipe.execute()
+    
+    # Đọc lại để log (một pipeline thứ hai)
+    pipe = client.pipeline(transaction=False)
+    pipe.lrange(key_items, 0, -1)
+    pipe.hgetall(key_categories)
+    pipe.get(key_last_active)
+    recent_items, recent_categories, last_active = pipe.execute()
+    
+    print(f"  ✅ Recent items: {recent_items}")
+    print(f"  ✅ Recent categories: {recent_categories}")
+    print(f"  ✅ Last active: {last_active}")
     
     print("\n" + "=" * 80)
     print("[OK] Redis data đã được setup!")
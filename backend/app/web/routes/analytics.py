@@ -5,21 +5,64 @@ Analytics API routes
 API endpoints để cung cấp dữ liệu thống kê cho dashboard.
 """
 
+import asyncio
+import hashlib
+import inspect
 import logging
 import json
+import os
+import time
+from functools import lru_cache, wraps
 from pathlib import Path
-from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException
+from typing import List, Dict, Any, Callable, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
 import polars as pl
-import numpy as np
+import pyarrow.parquet as pq
+
+try:
+    import redis
+except ImportError:
+    redis = None
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+# orjson serialize payload lớn (cleaning-stats, data-quality) nhanh hơn json chuẩn;
+# thiếu orjson thì dùng JSONResponse mặc định
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    class AnalyticsResponse(JSONResponse):
+        """JSONResponse render bằng orjson; numpy scalar/array serialize trực tiếp, không cần cast."""
+
+        def render(self, content: Any) -> bytes:
+            return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+else:
+    AnalyticsResponse = JSONResponse
+
+router = APIRouter(
+    prefix="/api/analytics",
+    tags=["analytics"],
+    default_response_class=AnalyticsResponse,
+)
 
 # Đường dẫn đến data directory
+@lru_cache(maxsize=None)
 def get_project_root() -> Path:
-    """Tìm project root directory."""
+    """
+    Tìm project root directory.
+
+    Ưu tiên biến môi trường PROJECT_ROOT (deploy/container, dùng nguyên giá trị,
+    không resolve/stat); nếu không có thì dò ngược từ file này. Kết quả được cache
+    nên chỉ stat filesystem một lần.
+    """
+    env_root = os.getenv("PROJECT_ROOT")
+    if env_root:
+        return Path(env_root)
+    
     script_path = Path(__file__).resolve()
     current = script_path.parent
     # Đi lên từ backend/app/web/routes đến project root
@@ -27,68 +70,344 @@ def get_project_root() -> Path:
         if (current / "data").exists() and (current / "backend").exists():
             return current
         current = current.parent
-    # Fallback: đi lên 5 levels từ backend/app/web/routes
-    return script_path.parent.parent.parent.parent.parent
+    # Fallback: backend/app/web/routes/analytics.py -> parents[4] là project root
+    return script_path.parents[4]
 
 PROJECT_ROOT = get_project_root()
 DATA_DIR = PROJECT_ROOT / "data"
 PROCESSED_DIR = DATA_DIR / "processed"
 EMBEDDING_DIR = DATA_DIR / "embedding"
 
+# Các file dữ liệu analytics đọc (tính một lần lúc import, endpoint dùng lại)
+INTERACTIONS_ALL_PATH = PROCESSED_DIR / "interactions_all.parquet"
+INTERACTIONS_5CORE_PATH = PROCESSED_DIR / "interactions_5core.parquet"
+INTERACTIONS_TRAIN_PATH = PROCESSED_DIR / "interactions_5core_train.parquet"
+INTERACTIONS_TEST_PATH = PROCESSED_DIR / "interactions_5core_test.parquet"
+REVIEWS_RAW_PATH = PROCESSED_DIR / "reviews_raw.parquet"
+REVIEWS_NORMALIZED_PATH = PROCESSED_DIR / "reviews_normalized.parquet"
+REVIEWS_CLEAN_PATH = PROCESSED_DIR / "reviews_clean.parquet"
+METADATA_RAW_PATH = PROCESSED_DIR / "metadata_raw.parquet"
+METADATA_NORMALIZED_PATH = PROCESSED_DIR / "metadata_normalized.parquet"
+METADATA_CLEAN_PATH = PROCESSED_DIR / "metadata_clean.parquet"
+ITEMS_FOR_RS_PATH = PROCESSED_DIR / "items_for_rs.parquet"
+ITEM_POPULARITY_PATH = PROCESSED_DIR / "item_popularity.parquet"
+# Output của build_item_popularity.py (đã sort sẵn theo interaction_count giảm dần)
+ITEM_POPULARITY_ARTIFACT_PATH = PROJECT_ROOT / "artifacts" / "popularity" / "item_popularity.parquet"
+SEMANTIC_ATTRIBUTES_PATH = EMBEDDING_DIR / "semantic_attributes.parquet"
+EMBEDDING_TEXT_PATH = EMBEDDING_DIR / "embedding_text.parquet"
+
+# Aggregate tính sẵn bởi scripts/data_preprocessing/build_analytics_aggregates.py
+AGG_RATING_DISTRIBUTION_PATH = PROCESSED_DIR / "agg_rating_distribution.parquet"
+AGG_CATEGORY_DISTRIBUTION_PATH = PROCESSED_DIR / "agg_category_distribution.parquet"
+AGG_TOP_ITEMS_PATH = PROCESSED_DIR / "agg_top_items.parquet"
+INTERACTION_STATS_PATH = PROCESSED_DIR / "interaction_stats.json"
+DASHBOARD_STATS_PATH = PROCESSED_DIR / "dashboard_stats.json"
+
+# File nguồn của các endpoint nặng (dùng cho cache response và kiểm tra dashboard_stats.json)
+CLEANING_STATS_SOURCES = (
+    REVIEWS_NORMALIZED_PATH,
+    REVIEWS_CLEAN_PATH,
+    INTERACTIONS_ALL_PATH,
+    INTERACTIONS_5CORE_PATH,
+    INTERACTIONS_TRAIN_PATH,
+    INTERACTIONS_TEST_PATH,
+    EMBEDDING_TEXT_PATH,
+)
+DATA_QUALITY_SOURCES = (
+    REVIEWS_RAW_PATH,
+    REVIEWS_NORMALIZED_PATH,
+    METADATA_RAW_PATH,
+    METADATA_NORMALIZED_PATH,
+)
+
+# Các cột interactions mà analytics dùng (bỏ qua timestamp, ...)
+INTERACTION_COLUMNS = ("user_id", "item_id", "rating")
+
 # Log paths for debugging
 logger.info(f"PROJECT_ROOT: {PROJECT_ROOT}")
 logger.info(f"DATA_DIR: {DATA_DIR} (exists: {DATA_DIR.exists()})")
 logger.info(f"PROCESSED_DIR: {PROCESSED_DIR} (exists: {PROCESSED_DIR.exists()})")
 logger.info(f"EMBEDDING_DIR: {EMBEDDING_DIR} (exists: {EMBEDDING_DIR.exists()})")
 
+# Cache kết quả các endpoint: các file parquet chỉ đổi khi chạy lại preprocessing,
+# nên key gồm mtime_ns của file nguồn -> cache tự mất hiệu lực khi data được refresh.
+ANALYTICS_CACHE_EXPIRE_SECONDS = 3600
+_ANALYTICS_CACHE_MAX_ENTRIES = 128
+_response_cache: Dict[Tuple, Tuple[float, Tuple, Dict[str, Any]]] = {}
 
-def get_rating_distribution(df: pl.DataFrame) -> List[Dict[str, Any]]:
-    """Tính phân bố rating."""
-    rating_counts = df.group_by("rating").agg(pl.count().alias("count")).sort("rating")
-    return [
-        {"rating": int(row["rating"]), "count": int(row["count"])}
-        for row in rating_counts.iter_rows(named=True)
-    ]
+# Giới hạn top_n của các endpoint top-k (bằng số top items lưu sẵn trong agg_top_items)
+ANALYTICS_MAX_TOP_N = 1000
+
+# HTTP cache: ETag theo mtime file nguồn, client/proxy giữ response tối đa 5 phút
+ANALYTICS_HTTP_MAX_AGE_SECONDS = 300
+_REQUEST_PARAM = "_analytics_request"
+
+# Tầng cache thứ hai trên Redis: dùng chung giữa các worker uvicorn, sống qua restart.
+# Redis không bắt buộc - lỗi kết nối thì tạm bỏ qua Redis một lúc rồi thử lại.
+ANALYTICS_REDIS_KEY_PREFIX = "analytics:response:"
+_REDIS_RETRY_SECONDS = 60
+_redis_client = None
+_redis_unavailable_until = 0.0
+
+
+def _get_redis_client():
+    """Redis client cho analytics cache (None nếu không có redis hoặc đang tạm bỏ qua)."""
+    global _redis_client
+    if redis is None or time.monotonic() < _redis_unavailable_until:
+        return None
+    if _redis_client is None:
+        options = {"decode_responses": True, "socket_connect_timeout": 0.2, "socket_timeout": 0.5}
+        redis_url = os.getenv("REDIS_URL")
+        if redis_url:
+            _redis_client = redis.Redis.from_url(redis_url, **options)
+        else:
+            _redis_client = redis.Redis(host="localhost", port=6379, db=0, **options)
+    return _redis_client
+
+
+def _mark_redis_unavailable(error: Exception) -> None:
+    """Tạm ngừng dùng Redis để request sau không phải chờ timeout kết nối."""
+    global _redis_unavailable_until
+    _redis_unavailable_until = time.monotonic() + _REDIS_RETRY_SECONDS
+    logger.debug(f"Analytics Redis cache unavailable: {error}")
+
+
+def _redis_cache_key(key: Tuple, signature: Tuple) -> str:
+    """Key Redis gồm endpoint, query params và mtime file nguồn (data mới -> key mới)."""
+    name, params = key
+    return f"{ANALYTICS_REDIS_KEY_PREFIX}{name}:{json.dumps(params)}:{json.dumps(signature)}"
+
+
+def _redis_get_response(redis_key: str) -> Optional[Dict[str, Any]]:
+    client = _get_redis_client()
+    if client is None:
+        return None
+    try:
+        cached = client.get(redis_key)
+    except Exception as e:
+        _mark_redis_unavailable(e)
+        return None
+    return json.loads(cached) if cached else None
+
+
+def _redis_set_response(redis_key: str, result: Dict[str, Any], expire: int) -> None:
+    client = _get_redis_client()
+    if client is None:
+        return
+    try:
+        client.setex(redis_key, expire, json.dumps(result))
+    except Exception as e:
+        _mark_redis_unavailable(e)
+
+
+def _mtime_signature(paths: Tuple[Path, ...]) -> Tuple[Optional[int], ...]:
+    """mtime_ns của từng file nguồn (None nếu file chưa tồn tại)."""
+    signature = []
+    for path in paths:
+        try:
+            signature.append(path.stat().st_mtime_ns)
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def _response_etag(key: Tuple, signature: Tuple) -> str:
+    """ETag theo endpoint + query params + mtime file nguồn (data không đổi -> ETag không đổi)."""
+    return '"' + hashlib.md5(_redis_cache_key(key, signature).encode()).hexdigest() + '"'
 
 
-def get_category_distribution(df: pl.DataFrame, top_n: int = 20) -> List[Dict[str, Any]]:
-    """Tính phân bố category."""
-    if "main_category" not in df.columns:
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """So header If-None-Match (có thể nhiều giá trị, weak W/) với ETag hiện tại."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+
+def _http_cache_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": f"public, max-age={ANALYTICS_HTTP_MAX_AGE_SECONDS}"}
+
+
+def cached_response(*source_paths: Path, expire: int = ANALYTICS_CACHE_EXPIRE_SECONDS) -> Callable:
+    """
+    Decorator cache response của endpoint analytics: HTTP (ETag), trong process, rồi tới Redis.
+
+    Key gồm tên endpoint + query params; entry chỉ được dùng lại khi chưa hết
+    `expire` giây và mtime của các file nguồn không đổi. Chỉ cache response
+    thành công để lỗi tạm thời (thiếu file, ...) không bị giữ lại.
+
+    Response thành công kèm ETag + Cache-Control; client gửi lại If-None-Match
+    trùng ETag thì trả 304 luôn, không đọc cache hay file.
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            request: Optional[Request] = kwargs.pop(_REQUEST_PARAM, None)
+            key = (func.__name__, tuple(sorted(kwargs.items())))
+            signature = _mtime_signature(source_paths)
+            now = time.monotonic()
+
+            etag = _response_etag(key, signature)
+            if request is not None and _etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=_http_cache_headers(etag))
+
+            entry = _response_cache.get(key)
+            if entry is not None and entry[1] == signature and now - entry[0] < expire:
+                return AnalyticsResponse(content=entry[2], headers=_http_cache_headers(etag))
+
+            redis_key = _redis_cache_key(key, signature)
+            result = await asyncio.to_thread(_redis_get_response, redis_key)
+            if result is None:
+                result = await func(*args, **kwargs)
+                if isinstance(result, dict) and result.get("success"):
+                    await asyncio.to_thread(_redis_set_response, redis_key, result, expire)
+            if isinstance(result, dict) and result.get("success"):
+                if key not in _response_cache and len(_response_cache) >= _ANALYTICS_CACHE_MAX_ENTRIES:
+                    # Bỏ entry cũ nhất (dict giữ thứ tự chèn)
+                    _response_cache.pop(next(iter(_response_cache)))
+                _response_cache[key] = (now, signature, result)
+                return AnalyticsResponse(content=result, headers=_http_cache_headers(etag))
+            return result
+
+        # Thêm tham số Request (keyword-only) vào signature để FastAPI inject request
+        # cho việc đọc If-None-Match; tham số này không truyền xuống endpoint
+        func_signature = inspect.signature(func)
+        wrapper.__signature__ = func_signature.replace(parameters=[
+            *func_signature.parameters.values(),
+            inspect.Parameter(_REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+        ])
+        return wrapper
+    return decorator
+
+
+# Bật streaming engine cho các scan lớn (reviews, embedding text): polars mới dùng
+# engine="streaming", bản cũ hơn dùng streaming=True
+_COLLECT_ALL_PARAMS = inspect.signature(pl.collect_all).parameters
+if "engine" in _COLLECT_ALL_PARAMS:
+    _STREAMING_COLLECT_KWARGS: Dict[str, Any] = {"engine": "streaming"}
+elif "streaming" in _COLLECT_ALL_PARAMS:
+    _STREAMING_COLLECT_KWARGS = {"streaming": True}
+else:
+    _STREAMING_COLLECT_KWARGS = {}
+
+
+def _collect_all_streaming(queries: List[pl.LazyFrame]) -> List[pl.DataFrame]:
+    """collect_all bằng streaming engine: đọc file theo từng batch thay vì load cả file vào RAM."""
+    return pl.collect_all(queries, **_STREAMING_COLLECT_KWARGS)
+
+
+@lru_cache(maxsize=8)
+def _read_parquet_cached(path_str: str, mtime_ns: int, columns: Optional[Tuple[str, ...]]) -> pl.DataFrame:
+    """Decode parquet một lần cho mỗi (path, mtime_ns, columns)."""
+    return pl.read_parquet(path_str, columns=list(columns) if columns else None)
+
+
+def load_parquet(path: Path, columns: Optional[Tuple[str, ...]] = None) -> pl.DataFrame:
+    """
+    Đọc parquet qua LRU cache dùng chung giữa các endpoint.
+
+    Key gồm mtime_ns nên khi file bị ghi lại (chạy lại preprocessing) sẽ được đọc lại.
+    DataFrame trả về được dùng chung, caller không được sửa tại chỗ.
+    """
+    return _read_parquet_cached(str(path), path.stat().st_mtime_ns, columns)
+
+
+@lru_cache(maxsize=32)
+def _read_parquet_metadata(path_str: str, mtime_ns: int) -> pq.FileMetaData:
+    """Parse footer parquet một lần cho mỗi (path, mtime_ns)."""
+    return pq.read_metadata(path_str, memory_map=True)
+
+
+def _parquet_num_rows(path: Path) -> int:
+    """Số dòng của file parquet, lấy từ footer (không decode data page nào)."""
+    return _read_parquet_metadata(str(path), path.stat().st_mtime_ns).num_rows
+
+
+@lru_cache(maxsize=4)
+def _read_dashboard_stats(path_str: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse dashboard_stats.json một lần cho mỗi (path, mtime_ns)."""
+    with open(path_str, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _precomputed_dashboard_stats(key: str, *source_paths: Path) -> Optional[Any]:
+    """Lấy section `key` trong dashboard_stats.json nếu file còn mới so với file nguồn, không thì None."""
+    if not _is_fresh(DASHBOARD_STATS_PATH, *source_paths):
+        return None
+    return _read_dashboard_stats(str(DASHBOARD_STATS_PATH), DASHBOARD_STATS_PATH.stat().st_mtime_ns).get(key)
+
+
+def _is_fresh(aggregate_path: Path, *source_paths: Path) -> bool:
+    """Aggregate tính sẵn chỉ được dùng khi tồn tại và không cũ hơn file nguồn nào."""
+    try:
+        aggregate_mtime = aggregate_path.stat().st_mtime_ns
+    except OSError:
+        return False
+    for path in source_paths:
+        try:
+            if path.stat().st_mtime_ns > aggregate_mtime:
+                return False
+        except OSError:
+            continue
+    return True
+
+
+def get_rating_distribution(lf: pl.LazyFrame) -> List[Dict[str, Any]]:
+    """Tính phân bố rating (chỉ đọc cột rating)."""
+    rating_counts = (
+        lf.select(pl.col("rating").value_counts())
+        .unnest("rating")
+        .sort("rating")
+        .select([pl.col("rating").cast(pl.Int64), pl.col("count").cast(pl.Int64)])
+        .collect()
+    )
+    return rating_counts.to_dicts()
+
+
+def get_category_distribution(lf: pl.LazyFrame, top_n: int = 20) -> List[Dict[str, Any]]:
+    """Tính phân bố category (chỉ đọc cột main_category)."""
+    if "main_category" not in lf.collect_schema().names():
         return []
     
+    # Null được đếm thành một nhóm riêng rồi bỏ sau khi đếm: lọc trên vài nhóm
+    # thay vì tạo mask + gather trên toàn bộ cột
     category_counts = (
-        df.filter(pl.col("main_category").is_not_null())
-        .group_by("main_category")
-        .agg(pl.count().alias("count"))
-        .sort("count", descending=True)
+        lf.select(pl.col("main_category").value_counts(sort=True))
+        .unnest("main_category")
+        .filter(pl.col("main_category").is_not_null())
         .head(top_n)
+        .select([pl.col("main_category").alias("category"), pl.col("count").cast(pl.Int64)])
+        .collect()
     )
     
-    return [
-        {"category": row["main_category"], "count": int(row["count"])}
-        for row in category_counts.iter_rows(named=True)
-    ]
+    return category_counts.to_dicts()
 
 
-def get_top_items(df: pl.DataFrame, top_n: int = 20) -> List[Dict[str, Any]]:
-    """Lấy top items theo số lượng interactions."""
-    if "item_id" not in df.columns:
+def get_top_items(lf: pl.LazyFrame, top_n: int = 20) -> List[Dict[str, Any]]:
+    """Lấy top items theo số lượng interactions (chỉ đọc cột item_id)."""
+    if "item_id" not in lf.collect_schema().names():
         return []
     
     item_counts = (
-        df.group_by("item_id")
-        .agg(pl.count().alias("count"))
-        .sort("count", descending=True)
+        lf.select(pl.col("item_id").value_counts(sort=True))
+        .unnest("item_id")
         .head(top_n)
+        .with_columns(pl.col("count").cast(pl.Int64))
+        .collect()
     )
     
-    return [
-        {"item_id": row["item_id"], "count": int(row["count"])}
-        for row in item_counts.iter_rows(named=True)
-    ]
+    return item_counts.to_dicts()
+
+
+def _rating_distribution_data(interactions_path: Path) -> List[Dict[str, Any]]:
+    """Phân bố rating: đọc aggregate tính sẵn nếu còn mới, không thì tính trực tiếp."""
+    if _is_fresh(AGG_RATING_DISTRIBUTION_PATH, interactions_path):
+        return pl.read_parquet(str(AGG_RATING_DISTRIBUTION_PATH)).to_dicts()
+    return get_rating_distribution(load_parquet(interactions_path, INTERACTION_COLUMNS).lazy())
 
 
 @router.get("/rating-distribution")
+@cached_response(INTERACTIONS_5CORE_PATH, AGG_RATING_DISTRIBUTION_PATH)
 async def get_rating_distribution_endpoint():
     """Lấy phân bố rating từ interactions."""
     try:
@@ -99,7 +418,7 @@ async def get_rating_distribution_endpoint():
                 "data": None
             }
         
-        interactions_path = PROCESSED_DIR / "interactions_5core.parquet"
+        interactions_path = INTERACTIONS_5CORE_PATH
         if not interactions_path.exists():
             return {
                 "success": False,
@@ -107,8 +426,8 @@ async def get_rating_distribution_endpoint():
                 "data": None
             }
         
-        df = pl.read_parquet(str(interactions_path))
-        distribution = get_rating_distribution(df)
+        # Polars chạy blocking -> đẩy sang thread để không chặn event loop
+        distribution = await asyncio.to_thread(_rating_distribution_data, interactions_path)
         
         return {
             "success": True,
@@ -124,25 +443,32 @@ async def get_rating_distribution_endpoint():
         }
 
 
+# Các vị trí có thể chứa metrics file (theo thứ tự ưu tiên)
+MODEL_METRICS_PATHS = (
+    PROJECT_ROOT / "backend" / "artifacts" / "metrics" / "recommendation_metrics.json",
+    PROJECT_ROOT / "artifacts" / "metrics" / "recommendation_metrics.json",
+    PROJECT_ROOT / "backend" / "artifacts" / "mf" / "metrics.json",
+    PROJECT_ROOT / "artifacts" / "mf" / "metrics.json",
+)
+
+
+def _load_model_metrics() -> Optional[Dict[str, Any]]:
+    """Đọc metrics file đầu tiên tìm thấy (None nếu chưa có)."""
+    for path in MODEL_METRICS_PATHS:
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                metrics_data = json.load(f)
+            logger.info(f"Loaded metrics from: {path}")
+            return metrics_data
+    return None
+
+
 @router.get("/model-metrics")
+@cached_response(*MODEL_METRICS_PATHS)
 async def get_recommendation_metrics():
     """Lấy recommendation metrics (RMSE, MAE, Precision@K, Recall@K)."""
     try:
-        # Tìm metrics file
-        metrics_paths = [
-            PROJECT_ROOT / "backend" / "artifacts" / "metrics" / "recommendation_metrics.json",
-            PROJECT_ROOT / "artifacts" / "metrics" / "recommendation_metrics.json",
-            PROJECT_ROOT / "backend" / "artifacts" / "mf" / "metrics.json",
-            PROJECT_ROOT / "artifacts" / "mf" / "metrics.json",
-        ]
-        
-        metrics_data = None
-        for path in metrics_paths:
-            if path.exists():
-                with open(path, 'r', encoding='utf-8') as f:
-                    metrics_data = json.load(f)
-                logger.info(f"Loaded metrics from: {path}")
-                break
+        metrics_data = await asyncio.to_thread(_load_model_metrics)
         
         if not metrics_data:
             return {
@@ -164,8 +490,19 @@ async def get_recommendation_metrics():
         }
 
 
+def _category_distribution_data(metadata_path: Path, top_n: int) -> List[Dict[str, Any]]:
+    """Phân bố category: đọc aggregate tính sẵn nếu còn mới, không thì tính trực tiếp."""
+    if _is_fresh(AGG_CATEGORY_DISTRIBUTION_PATH, metadata_path):
+        # Aggregate đã sort giảm dần -> head được push xuống scan, chỉ đọc top_n dòng
+        return pl.scan_parquet(str(AGG_CATEGORY_DISTRIBUTION_PATH)).head(top_n).collect().to_dicts()
+    return get_category_distribution(pl.scan_parquet(str(metadata_path)), top_n)
+
+
 @router.get("/category-distribution")
-async def get_category_distribution_endpoint(top_n: int = 20):
+@cached_response(METADATA_CLEAN_PATH, AGG_CATEGORY_DISTRIBUTION_PATH)
+async def get_category_distribution_endpoint(
+    top_n: int = Query(20, ge=1, le=ANALYTICS_MAX_TOP_N, description="Number of items")
+):
     """Lấy phân bố category từ metadata."""
     try:
         if not PROCESSED_DIR.exists():
@@ -175,7 +512,7 @@ async def get_category_distribution_endpoint(top_n: int = 20):
                 "data": None
             }
         
-        metadata_path = PROCESSED_DIR / "metadata_clean.parquet"
+        metadata_path = METADATA_CLEAN_PATH
         if not metadata_path.exists():
             return {
                 "success": False,
@@ -183,8 +520,7 @@ async def get_category_distribution_endpoint(top_n: int = 20):
                 "data": None
             }
         
-        df = pl.read_parquet(str(metadata_path))
-        distribution = get_category_distribution(df, top_n)
+        distribution = await asyncio.to_thread(_category_distribution_data, metadata_path, top_n)
         
         return {
             "success": True,
@@ -200,8 +536,20 @@ async def get_category_distribution_endpoint(top_n: int = 20):
         }
 
 
+def _top_items_data(interactions_path: Path, top_n: int) -> List[Dict[str, Any]]:
+    """Top items: đọc aggregate tính sẵn nếu còn mới và đủ top_n, không thì tính trực tiếp."""
+    if _is_fresh(AGG_TOP_ITEMS_PATH, interactions_path):
+        # File chỉ lưu N items đầu (số dòng lấy từ footer); top_n lớn hơn thì phải tính trực tiếp
+        if top_n <= _parquet_num_rows(AGG_TOP_ITEMS_PATH):
+            return pl.scan_parquet(str(AGG_TOP_ITEMS_PATH)).head(top_n).collect().to_dicts()
+    return get_top_items(load_parquet(interactions_path, INTERACTION_COLUMNS).lazy(), top_n)
+
+
 @router.get("/top-items")
-async def get_top_items_endpoint(top_n: int = 20):
+@cached_response(INTERACTIONS_5CORE_PATH, AGG_TOP_ITEMS_PATH)
+async def get_top_items_endpoint(
+    top_n: int = Query(20, ge=1, le=ANALYTICS_MAX_TOP_N, description="Number of items")
+):
     """Lấy top items theo số lượng interactions."""
     try:
         if not PROCESSED_DIR.exists():
@@ -211,7 +559,7 @@ async def get_top_items_endpoint(top_n: int = 20):
                 "data": None
             }
         
-        interactions_path = PROCESSED_DIR / "interactions_5core.parquet"
+        interactions_path = INTERACTIONS_5CORE_PATH
         if not interactions_path.exists():
             return {
                 "success": False,
@@ -219,8 +567,7 @@ async def get_top_items_endpoint(top_n: int = 20):
                 "data": None
             }
         
-        df = pl.read_parquet(str(interactions_path))
-        top_items = get_top_items(df, top_n)
+        top_items = await asyncio.to_thread(_top_items_data, interactions_path, top_n)
         
         return {
             "success": True,
@@ -235,7 +582,49 @@ async def get_top_items_endpoint(top_n: int = 20):
         }
 
 
+def _interaction_stats_data(all_path: Path, train_path: Path, test_path: Path) -> Dict[str, Any]:
+    """Thống kê tổng quan interactions (kèm train/test nếu có)."""
+    if _is_fresh(INTERACTION_STATS_PATH, all_path, train_path, test_path):
+        with open(INTERACTION_STATS_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    # Mọi reduction trong một select -> Polars tính song song trong một lần duyệt
+    summary = load_parquet(all_path, INTERACTION_COLUMNS).lazy().select([
+        pl.col("user_id").n_unique().alias("unique_users"),
+        pl.col("item_id").n_unique().alias("unique_items"),
+        pl.col("rating").mean().alias("avg_rating"),
+        pl.col("rating").min().cast(pl.Float64).alias("min_rating"),
+        pl.col("rating").max().cast(pl.Float64).alias("max_rating"),
+    ]).collect().row(0, named=True)
+    
+    stats = {
+        "total_interactions": _parquet_num_rows(all_path),
+        "unique_users": summary["unique_users"],
+        "unique_items": summary["unique_items"],
+        "avg_rating": summary["avg_rating"],
+        "min_rating": summary["min_rating"],
+        "max_rating": summary["max_rating"],
+    }
+    
+    # Thống kê train/test nếu có
+    if train_path.exists() and test_path.exists():
+        train_count = _parquet_num_rows(train_path)
+        test_count = _parquet_num_rows(test_path)
+        stats["train_count"] = train_count
+        stats["test_count"] = test_count
+        stats["train_ratio"] = train_count / (train_count + test_count)
+        stats["test_ratio"] = test_count / (train_count + test_count)
+    
+    return stats
+
+
 @router.get("/interaction-stats")
+@cached_response(
+    INTERACTIONS_5CORE_PATH,
+    INTERACTIONS_TRAIN_PATH,
+    INTERACTIONS_TEST_PATH,
+    INTERACTION_STATS_PATH,
+)
 async def get_interaction_stats():
     """Lấy thống kê tổng quan về interactions."""
     try:
@@ -246,9 +635,9 @@ async def get_interaction_stats():
                 "data": None
             }
         
-        train_path = PROCESSED_DIR / "interactions_5core_train.parquet"
-        test_path = PROCESSED_DIR / "interactions_5core_test.parquet"
-        all_path = PROCESSED_DIR / "interactions_5core.parquet"
+        train_path = INTERACTIONS_TRAIN_PATH
+        test_path = INTERACTIONS_TEST_PATH
+        all_path = INTERACTIONS_5CORE_PATH
         
         if not all_path.exists():
             return {
@@ -257,25 +646,7 @@ async def get_interaction_stats():
                 "data": None
             }
         
-        df_all = pl.read_parquet(str(all_path))
-        
-        stats = {
-            "total_interactions": len(df_all),
-            "unique_users": df_all["user_id"].n_unique(),
-            "unique_items": df_all["item_id"].n_unique(),
-            "avg_rating": float(df_all["rating"].mean()),
-            "min_rating": float(df_all["rating"].min()),
-            "max_rating": float(df_all["rating"].max()),
-        }
-        
-        # Thống kê train/test nếu có
-        if train_path.exists() and test_path.exists():
-            df_train = pl.read_parquet(str(train_path))
-            df_test = pl.read_parquet(str(test_path))
-            stats["train_count"] = len(df_train)
-            stats["test_count"] = len(df_test)
-            stats["train_ratio"] = len(df_train) / (len(df_train) + len(df_test))
-            stats["test_ratio"] = len(df_test) / (len(df_train) + len(df_test))
+        stats = await asyncio.to_thread(_interaction_stats_data, all_path, train_path, test_path)
         
         return {
             "success": True,
@@ -290,7 +661,41 @@ async def get_interaction_stats():
         }
 
 
+def _embedding_stats_data(data_path: Path) -> Dict[str, Any]:
+    """Thống kê schema + số item/category unique của file embedding data."""
+    lf = pl.scan_parquet(str(data_path))
+    
+    # Schema lấy từ footer parquet, không cần đọc data
+    schema = lf.collect_schema()
+    columns = schema.names()
+    
+    # Chỉ đọc các cột cần đếm unique; số dòng lấy từ footer
+    exprs = []
+    if "main_category" in columns:
+        exprs.append(pl.col("main_category").n_unique().alias("unique_categories"))
+    elif "category" in columns:
+        exprs.append(pl.col("category").n_unique().alias("unique_categories"))
+    if "item_id" in columns:
+        exprs.append(pl.col("item_id").n_unique().alias("unique_items"))
+    elif "parent_asin" in columns:
+        exprs.append(pl.col("parent_asin").n_unique().alias("unique_items"))
+    counts = lf.select(exprs).collect().row(0, named=True) if exprs else {}
+    
+    stats = {
+        "total_items": _parquet_num_rows(data_path),
+        "columns": columns,
+        "schema": {col: str(dtype) for col, dtype in schema.items()}
+    }
+    stats.update(counts)
+    return stats
+
+
 @router.get("/embedding-stats")
+@cached_response(
+    SEMANTIC_ATTRIBUTES_PATH,
+    ITEMS_FOR_RS_PATH,
+    METADATA_CLEAN_PATH,
+)
 async def get_embedding_stats():
     """Lấy thống kê về embedding data."""
     try:
@@ -304,23 +709,23 @@ async def get_embedding_stats():
             }
         
         # Thử tìm semantic_attributes.parquet trong embedding directory
-        semantic_path = EMBEDDING_DIR / "semantic_attributes.parquet"
+        semantic_path = SEMANTIC_ATTRIBUTES_PATH
         
         # Nếu không có, thử dùng items_for_rs.parquet hoặc metadata_clean.parquet
         if not semantic_path.exists():
             logger.info(f"semantic_attributes.parquet not found at {semantic_path}, trying fallback files...")
             
             # Fallback 1: items_for_rs.parquet
-            fallback_path = PROCESSED_DIR / "items_for_rs.parquet"
+            fallback_path = ITEMS_FOR_RS_PATH
             if fallback_path.exists():
                 logger.info(f"Using fallback: {fallback_path}")
-                df = pl.read_parquet(str(fallback_path))
+                data_path = fallback_path
             else:
                 # Fallback 2: metadata_clean.parquet
-                fallback_path = PROCESSED_DIR / "metadata_clean.parquet"
+                fallback_path = METADATA_CLEAN_PATH
                 if fallback_path.exists():
                     logger.info(f"Using fallback: {fallback_path}")
-                    df = pl.read_parquet(str(fallback_path))
+                    data_path = fallback_path
                 else:
                     logger.error(f"No embedding data files found. Checked: {semantic_path}, {PROCESSED_DIR / 'items_for_rs.parquet'}, {fallback_path}")
                     return {
@@ -329,25 +734,9 @@ async def get_embedding_stats():
                         "data": None
                     }
         else:
-            df = pl.read_parquet(str(semantic_path))
-        
-        stats = {
-            "total_items": len(df),
-            "columns": df.columns,
-            "schema": {col: str(dtype) for col, dtype in zip(df.columns, df.dtypes)}
-        }
+            data_path = semantic_path
         
-        # Thống kê các cột nếu có
-        if "main_category" in df.columns:
-            stats["unique_categories"] = df["main_category"].n_unique()
-        elif "category" in df.columns:
-            stats["unique_categories"] = df["category"].n_unique()
-        
-        # Thống kê item_id nếu có
-        if "item_id" in df.columns:
-            stats["unique_items"] = df["item_id"].n_unique()
-        elif "parent_asin" in df.columns:
-            stats["unique_items"] = df["parent_asin"].n_unique()
+        stats = await asyncio.to_thread(_embedding_stats_data, data_path)
         
         return {
             "success": True,
@@ -362,7 +751,68 @@ async def get_embedding_stats():
         }
 
 
+# Bins histogram số interactions per user
+USER_ACTIVITY_BREAKS = [5, 10, 20, 50, 100, 200, 500]
+USER_ACTIVITY_LABELS = ["1-5", "6-10", "11-20", "21-50", "51-100", "101-200", "201-500", "500+"]
+
+
+def _user_activity_data(interactions_path: Path) -> Dict[str, Any]:
+    """User activity: đọc từ dashboard_stats.json nếu còn mới, không thì tính trực tiếp."""
+    precomputed = _precomputed_dashboard_stats("user_activity", interactions_path)
+    if precomputed is not None:
+        return precomputed
+    return _compute_user_activity(interactions_path)
+
+
+def _compute_user_activity(interactions_path: Path) -> Dict[str, Any]:
+    """Histogram + thống kê số interactions per user."""
+    # Tính số interactions per user (chỉ đọc cột user_id)
+    user_activity = (
+        load_parquet(interactions_path, INTERACTION_COLUMNS).lazy()
+        .select("user_id")
+        .group_by("user_id")
+        .agg(pl.len().alias("interaction_count"))
+    )
+    
+    # Tạo histogram bằng cut ngay trong Polars (bins trái-đóng như np.histogram);
+    # join với danh sách label để giữ đủ 8 bins theo thứ tự, kể cả bin rỗng
+    bin_counts = (
+        user_activity.select(
+            pl.col("interaction_count")
+            .cut(USER_ACTIVITY_BREAKS, labels=USER_ACTIVITY_LABELS, left_closed=True)
+            .cast(pl.String)
+            .alias("range")
+        )
+        .group_by("range")
+        .agg(pl.len().alias("count"))
+    )
+    histogram_query = (
+        pl.LazyFrame({"range": USER_ACTIVITY_LABELS, "order": list(range(len(USER_ACTIVITY_LABELS)))})
+        .join(bin_counts, on="range", how="left")
+        .sort("order")
+        .select(["range", pl.col("count").fill_null(0).cast(pl.Int64)])
+    )
+    summary_query = user_activity.select([
+        pl.col("interaction_count").mean().alias("avg"),
+        pl.col("interaction_count").median().cast(pl.Float64).alias("median"),
+        pl.col("interaction_count").max().cast(pl.Int64).alias("max"),
+        pl.col("interaction_count").min().cast(pl.Int64).alias("min"),
+    ])
+    histogram_df, summary_df = pl.collect_all([histogram_query, summary_query])
+    
+    summary = summary_df.row(0, named=True)
+    
+    return {
+        "histogram": histogram_df.to_dicts(),
+        "avg_interactions_per_user": summary["avg"],
+        "median_interactions_per_user": summary["median"],
+        "max_interactions_per_user": summary["max"],
+        "min_interactions_per_user": summary["min"],
+    }
+
+
 @router.get("/user-activity")
+@cached_response(INTERACTIONS_5CORE_PATH, DASHBOARD_STATS_PATH)
 async def get_user_activity():
     """Lấy thống kê về hoạt động của users."""
     try:
@@ -373,7 +823,7 @@ async def get_user_activity():
                 "data": None
             }
         
-        interactions_path = PROCESSED_DIR / "interactions_5core.parquet"
+        interactions_path = INTERACTIONS_5CORE_PATH
         if not interactions_path.exists():
             return {
                 "success": False,
@@ -381,36 +831,11 @@ async def get_user_activity():
                 "data": None
             }
         
-        df = pl.read_parquet(str(interactions_path))
-        
-        # Tính số interactions per user
-        user_activity = (
-            df.group_by("user_id")
-            .agg(pl.count().alias("interaction_count"))
-            .select("interaction_count")
-        )
-        
-        activity_counts = user_activity["interaction_count"].to_numpy()
-        
-        # Tạo histogram
-        bins = [0, 5, 10, 20, 50, 100, 200, 500, float('inf')]
-        labels = ["1-5", "6-10", "11-20", "21-50", "51-100", "101-200", "201-500", "500+"]
-        hist, _ = np.histogram(activity_counts, bins=bins)
-        
-        histogram_data = [
-            {"range": label, "count": int(count)}
-            for label, count in zip(labels, hist)
-        ]
+        activity = await asyncio.to_thread(_user_activity_data, interactions_path)
         
         return {
             "success": True,
-            "data": {
-                "histogram": histogram_data,
-                "avg_interactions_per_user": float(np.mean(activity_counts)),
-                "median_interactions_per_user": float(np.median(activity_counts)),
-                "max_interactions_per_user": int(np.max(activity_counts)),
-                "min_interactions_per_user": int(np.min(activity_counts)),
-            }
+            "data": activity
         }
     except Exception as e:
         logger.error(f"Error getting user activity: {e}", exc_info=True)
@@ -421,8 +846,57 @@ async def get_user_activity():
         }
 
 
+def _is_sorted_descending(path: Path, column: str) -> bool:
+    """
+    Kiểm tra từ footer parquet: file đã sort giảm dần theo column trên toàn file.
+    
+    Yêu cầu mọi row group khai báo sorting_columns giảm dần theo column và
+    min của row group trước >= max của row group sau (theo statistics).
+    """
+    metadata = _read_parquet_metadata(str(path), path.stat().st_mtime_ns)
+    column_index = metadata.schema.to_arrow_schema().get_field_index(column)
+    if column_index < 0 or metadata.num_row_groups == 0:
+        return False
+    
+    previous_min = None
+    for i in range(metadata.num_row_groups):
+        row_group = metadata.row_group(i)
+        sorting = row_group.sorting_columns
+        if not sorting or sorting[0].column_index != column_index or not sorting[0].descending:
+            return False
+        stats = row_group.column(column_index).statistics
+        if stats is None or not stats.has_min_max:
+            return False
+        if previous_min is not None and stats.max > previous_min:
+            return False
+        previous_min = stats.min
+    return True
+
+
+def _item_popularity_data(popularity_path: Path, top_n: int) -> List[Dict[str, Any]]:
+    """Top items theo interaction_count từ item_popularity.parquet."""
+    lf = pl.scan_parquet(str(popularity_path)).select(["item_id", "interaction_count", "mean_rating"])
+    if not _is_sorted_descending(popularity_path, "interaction_count"):
+        # File cũ / không khai báo thứ tự: sort + head (được tối ưu thành top-k)
+        lf = lf.sort("interaction_count", descending=True)
+    # File đã sort sẵn: head được push xuống scan, chỉ đọc top_n dòng đầu
+    top_items = (
+        lf.head(top_n)
+        .with_columns([
+            pl.col("interaction_count").cast(pl.Int64),
+            pl.col("mean_rating").cast(pl.Float64),
+        ])
+        .collect()
+    )
+    
+    return top_items.to_dicts()
+
+
 @router.get("/item-popularity")
-async def get_item_popularity(top_n: int = 20):
+@cached_response(ITEM_POPULARITY_PATH, ITEM_POPULARITY_ARTIFACT_PATH)
+async def get_item_popularity(
+    top_n: int = Query(20, ge=1, le=ANALYTICS_MAX_TOP_N, description="Number of items")
+):
     """Lấy thống kê về popularity của items."""
     try:
         if not PROCESSED_DIR.exists():
@@ -432,7 +906,10 @@ async def get_item_popularity(top_n: int = 20):
                 "data": None
             }
         
-        popularity_path = PROCESSED_DIR / "item_popularity.parquet"
+        popularity_path = ITEM_POPULARITY_PATH
+        if not popularity_path.exists() and ITEM_POPULARITY_ARTIFACT_PATH.exists():
+            # Fallback: file do build_item_popularity.py ghi vào artifacts/popularity
+            popularity_path = ITEM_POPULARITY_ARTIFACT_PATH
         if not popularity_path.exists():
             return {
                 "success": False,
@@ -440,25 +917,11 @@ async def get_item_popularity(top_n: int = 20):
                 "data": None
             }
         
-        df = pl.read_parquet(str(popularity_path))
-        
-        # Lấy top items
-        top_items = (
-            df.sort("interaction_count", descending=True)
-            .head(top_n)
-            .select(["item_id", "interaction_count", "mean_rating"])
-        )
+        top_items = await asyncio.to_thread(_item_popularity_data, popularity_path, top_n)
         
         return {
             "success": True,
-            "data": [
-                {
-                    "item_id": row["item_id"],
-                    "interaction_count": int(row["interaction_count"]),
-                    "mean_rating": float(row["mean_rating"]) if row["mean_rating"] is not None else None
-                }
-                for row in top_items.iter_rows(named=True)
-            ]
+            "data": top_items
         }
     except Exception as e:
         logger.error(f"Error getting item popularity: {e}", exc_info=True)
@@ -469,220 +932,293 @@ async def get_item_popularity(top_n: int = 20):
         }
 
 
+def _rating_histogram(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Phân bố rating dạng float (cho các biểu đồ cleaning), cast sẵn để dùng to_dicts()."""
+    return (
+        lf.select("rating")
+        .group_by("rating")
+        .agg(pl.len().alias("count"))
+        .sort("rating")
+        .select([pl.col("rating").cast(pl.Float64), pl.col("count").cast(pl.Int64)])
+    )
+
+
+def _reviews_cleaning_stats(reviews_normalized_path: Path, reviews_clean_path: Path) -> Optional[Dict[str, Any]]:
+    """Thống kê từng task cleaning reviews (phase 3); None nếu thiếu file."""
+    if not (reviews_normalized_path.exists() and reviews_clean_path.exists()):
+        return None
+    
+    reviews_normalized = pl.scan_parquet(str(reviews_normalized_path))
+    reviews_clean = pl.scan_parquet(str(reviews_clean_path))
+    
+    # Điều kiện giữ lại của từng task trong phase 3
+    # Task 1: Missing values - drop records thiếu amazon_user_id, asin, rating
+    task1_keep = (
+        pl.col("amazon_user_id").is_not_null() &
+        pl.col("asin").is_not_null() &
+        pl.col("rating").is_not_null()
+    )
+    # Task 2: Sanity check - rating ngoài [1, 5]
+    task2_keep = pl.col("rating").is_between(1, 5, closed="both")
+    
+    # Gộp các phép đếm vào một lazy select -> một lần scan file
+    counts_query = reviews_normalized.select([
+        pl.len().alias("initial_count"),
+        task1_keep.sum().alias("after_task1"),
+        # Task 3: Deduplication (ước tính) - số bản ghi bị drop theo (amazon_user_id, asin)
+        # = số dòng sau task 2 - số cặp unique, không cần group_by
+        pl.struct(["amazon_user_id", "asin"])
+        .filter(task1_keep & task2_keep)
+        .n_unique()
+        .alias("unique_pairs"),
+        # Missing values breakdown
+        *[
+            pl.col(col).null_count().alias(col)
+            for col in ["amazon_user_id", "asin", "rating", "review_title", "review_text"]
+        ],
+    ])
+    
+    # Task 2 đếm bằng filter trên LazyFrame: predicate được đẩy xuống parquet reader,
+    # row group nào có min/max rating nằm trọn trong [1, 5] bị bỏ qua nhờ footer statistics
+    task2_query = (
+        reviews_normalized
+        .filter(~task2_keep & task1_keep)
+        .select(pl.len().alias("dropped"))
+    )
+    
+    # Rating distribution trước và sau
+    counts_df, task2_df, rating_dist_before, rating_dist_after = _collect_all_streaming([
+        counts_query,
+        task2_query,
+        _rating_histogram(reviews_normalized),
+        _rating_histogram(reviews_clean),
+    ])
+    counts = counts_df.row(0, named=True)
+    
+    initial_count = counts["initial_count"]
+    final_count = _parquet_num_rows(reviews_clean_path)
+    task1_dropped = initial_count - counts["after_task1"]
+    task2_dropped = task2_df.item()
+    task3_dropped = counts["after_task1"] - task2_dropped - counts["unique_pairs"]
+    
+    missing_breakdown = {
+        col: counts[col]
+        for col in ["amazon_user_id", "asin", "rating", "review_title", "review_text"]
+    }
+    
+    return {
+        "before": initial_count,
+        "after": final_count,
+        "dropped": initial_count - final_count,
+        "retention_rate": (final_count / initial_count * 100) if initial_count > 0 else 0,
+        "tasks": {
+            "task1_missing_values": {
+                "dropped": task1_dropped,
+                "percentage": (task1_dropped / initial_count * 100) if initial_count > 0 else 0
+            },
+            "task2_sanity_check": {
+                "dropped": task2_dropped,
+                "percentage": (task2_dropped / initial_count * 100) if initial_count > 0 else 0
+            },
+            "task3_deduplication": {
+                "dropped": task3_dropped,
+                "percentage": (task3_dropped / initial_count * 100) if initial_count > 0 else 0
+            }
+        },
+        "rating_distribution_before": rating_dist_before.to_dicts(),
+        "rating_distribution_after": rating_dist_after.to_dicts(),
+        "missing_values_breakdown": missing_breakdown,
+        "retention_by_task": [
+            {"task": "Initial", "count": initial_count, "percentage": 100.0},
+            {"task": "After Task 1", "count": initial_count - task1_dropped, "percentage": ((initial_count - task1_dropped) / initial_count * 100) if initial_count > 0 else 0},
+            {"task": "After Task 2", "count": initial_count - task1_dropped - task2_dropped, "percentage": ((initial_count - task1_dropped - task2_dropped) / initial_count * 100) if initial_count > 0 else 0},
+            {"task": "After Task 3", "count": initial_count - task1_dropped - task2_dropped - task3_dropped, "percentage": ((initial_count - task1_dropped - task2_dropped - task3_dropped) / initial_count * 100) if initial_count > 0 else 0},
+            {"task": "Final", "count": final_count, "percentage": (final_count / initial_count * 100) if initial_count > 0 else 0}
+        ]
+    }
+
+
+def _interactions_5core_stats(
+    interactions_all_path: Path,
+    interactions_5core_path: Path,
+    interactions_5core_train_path: Path,
+    interactions_5core_test_path: Path
+) -> Optional[Dict[str, Any]]:
+    """Thống kê 5-core interactions và train/test split; None nếu thiếu file."""
+    if not (interactions_all_path.exists() and interactions_5core_path.exists()):
+        return None
+    
+    # Số dòng lấy từ footer parquet
+    all_count = _parquet_num_rows(interactions_all_path)
+    core_count = _parquet_num_rows(interactions_5core_path)
+    
+    # Train/Test split stats
+    train_count = 0
+    test_count = 0
+    if interactions_5core_train_path.exists() and interactions_5core_test_path.exists():
+        train_count = _parquet_num_rows(interactions_5core_train_path)
+        test_count = _parquet_num_rows(interactions_5core_test_path)
+    
+    # User and item statistics (chỉ scan 2 cột id)
+    unique_exprs = [
+        pl.col("user_id").n_unique().alias("users"),
+        pl.col("item_id").n_unique().alias("items"),
+    ]
+    interactions_5core = load_parquet(interactions_5core_path, INTERACTION_COLUMNS).lazy()
+    all_unique, core_unique, rating_dist_5core = pl.collect_all([
+        load_parquet(interactions_all_path, INTERACTION_COLUMNS).lazy().select(unique_exprs),
+        interactions_5core.select(unique_exprs),
+        # Rating distribution in 5core
+        _rating_histogram(interactions_5core),
+    ])
+    all_users, all_items = all_unique.row(0)
+    core_users, core_items = core_unique.row(0)
+    
+    return {
+        "all_interactions": {
+            "count": all_count,
+            "unique_users": all_users,
+            "unique_items": all_items
+        },
+        "core_interactions": {
+            "count": core_count,
+            "unique_users": core_users,
+            "unique_items": core_items,
+            "retention_rate": (core_count / all_count * 100) if all_count > 0 else 0,
+            "users_retention_rate": (core_users / all_users * 100) if all_users > 0 else 0,
+            "items_retention_rate": (core_items / all_items * 100) if all_items > 0 else 0
+        },
+        "train_test_split": {
+            "train_count": train_count,
+            "test_count": test_count,
+            "train_ratio": (train_count / (train_count + test_count) * 100) if (train_count + test_count) > 0 else 0,
+            "test_ratio": (test_count / (train_count + test_count) * 100) if (train_count + test_count) > 0 else 0
+        },
+        "rating_distribution": rating_dist_5core.to_dicts(),
+        "filtering_steps": [
+            {"step": "All Interactions", "count": all_count, "users": all_users, "items": all_items},
+            {"step": "5-Core Filtered", "count": core_count, "users": core_users, "items": core_items}
+        ]
+    }
+
+
+def _embedding_token_stats(embedding_text_path: Path) -> Optional[Dict[str, Any]]:
+    """Thống kê số token của embedding_text; None nếu thiếu file/cột."""
+    if not embedding_text_path.exists():
+        return None
+    
+    embedding_lf = pl.scan_parquet(str(embedding_text_path))
+    
+    # Count tokens in embedding_text (simple word count)
+    if "embedding_text" not in embedding_lf.collect_schema().names():
+        return None
+    
+    # Calculate approximate token counts (số khoảng trắng + 1, tương đương
+    # split(" ").list.len() nhưng không tạo cột list trung gian)
+    token_counts = embedding_lf.select([
+        (pl.col("embedding_text").str.count_matches(" ", literal=True) + 1).alias("token_count")
+    ])
+    
+    # fill_null(0): file rỗng / một item (std null) vẫn trả về số
+    token_stats_query = token_counts.select([
+        pl.len().alias("total_items"),
+        pl.col("token_count").mean().fill_null(0).alias("avg_tokens"),
+        pl.col("token_count").median().fill_null(0).alias("median_tokens"),
+        pl.col("token_count").min().cast(pl.Int64).fill_null(0).alias("min_tokens"),
+        pl.col("token_count").max().cast(pl.Int64).fill_null(0).alias("max_tokens"),
+        pl.col("token_count").std().fill_null(0).alias("std_tokens")
+    ])
+    
+    # Token distribution (bins [a, b), bin cuối: >= 1000) bằng cut trong Polars
+    breaks = [50, 100, 200, 300, 500, 1000]
+    bin_labels = ["0-50", "51-100", "101-200", "201-300", "301-500", "501-1000", "1000+"]
+    # Inner join với danh sách label: chỉ giữ bin có dữ liệu, theo đúng thứ tự bins
+    token_bins_query = (
+        pl.LazyFrame({"range": bin_labels, "order": list(range(len(bin_labels)))})
+        .join(
+            token_counts.select(
+                pl.col("token_count")
+                .cut(breaks, labels=bin_labels, left_closed=True)
+                .cast(pl.String)
+                .alias("range")
+            )
+            .drop_nulls("range")
+            .group_by("range")
+            .agg(pl.len().alias("count")),
+            on="range",
+            how="inner",
+        )
+        .sort("order")
+        .select(["range", pl.col("count").cast(pl.Int64)])
+    )
+    
+    token_stats_df, token_bins_df = _collect_all_streaming([token_stats_query, token_bins_query])
+    token_stats = token_stats_df.row(0, named=True)
+    total_items = token_stats["total_items"]
+    
+    token_distribution = token_bins_df.to_dicts()
+    for row in token_distribution:
+        row["percentage"] = row["count"] / total_items * 100
+    
+    return {
+        "total_items": total_items,
+        "statistics": {
+            "avg_tokens": token_stats["avg_tokens"],
+            "median_tokens": token_stats["median_tokens"],
+            "min_tokens": token_stats["min_tokens"],
+            "max_tokens": token_stats["max_tokens"],
+            "std_tokens": token_stats["std_tokens"]
+        },
+        "token_distribution": token_distribution
+    }
+
+
 @router.get("/cleaning-stats")
+@cached_response(*CLEANING_STATS_SOURCES, DASHBOARD_STATS_PATH)
 async def get_cleaning_stats():
     """Lấy thống kê chi tiết về quá trình cleaning, 5core interactions và embedding tokens."""
     try:
+        precomputed = await asyncio.to_thread(_precomputed_dashboard_stats, "cleaning_stats", *CLEANING_STATS_SOURCES)
+        if precomputed is not None:
+            return {
+                "success": True,
+                "data": precomputed
+            }
+        
         # Đọc raw và clean data để so sánh
-        reviews_normalized_path = PROCESSED_DIR / "reviews_normalized.parquet"
-        reviews_clean_path = PROCESSED_DIR / "reviews_clean.parquet"
+        reviews_normalized_path = REVIEWS_NORMALIZED_PATH
+        reviews_clean_path = REVIEWS_CLEAN_PATH
         
         # 5core interactions files
-        interactions_all_path = PROCESSED_DIR / "interactions_all.parquet"
-        interactions_5core_path = PROCESSED_DIR / "interactions_5core.parquet"
-        interactions_5core_train_path = PROCESSED_DIR / "interactions_5core_train.parquet"
-        interactions_5core_test_path = PROCESSED_DIR / "interactions_5core_test.parquet"
+        interactions_all_path = INTERACTIONS_ALL_PATH
+        interactions_5core_path = INTERACTIONS_5CORE_PATH
+        interactions_5core_train_path = INTERACTIONS_TRAIN_PATH
+        interactions_5core_test_path = INTERACTIONS_TEST_PATH
         
         # Embedding data
-        embedding_text_path = EMBEDDING_DIR / "embedding_text.parquet"
-        
-        stats = {}
-        
-        if reviews_normalized_path.exists() and reviews_clean_path.exists():
-            reviews_normalized = pl.read_parquet(str(reviews_normalized_path))
-            reviews_clean = pl.read_parquet(str(reviews_clean_path))
-            
-            initial_count = len(reviews_normalized)
-            final_count = len(reviews_clean)
-            
-            # Tính toán chi tiết từng task
-            # Task 1: Missing values - drop records thiếu amazon_user_id, asin, rating
-            task1_dropped = initial_count - len(
-                reviews_normalized.filter(
-                    pl.col("amazon_user_id").is_not_null() &
-                    pl.col("asin").is_not_null() &
-                    pl.col("rating").is_not_null()
-                )
-            )
-            
-            # Task 2: Sanity check - rating ngoài [1, 5]
-            after_task1 = reviews_normalized.filter(
-                pl.col("amazon_user_id").is_not_null() &
-                pl.col("asin").is_not_null() &
-                pl.col("rating").is_not_null()
-            )
-            task2_dropped = len(after_task1) - len(
-                after_task1.filter(
-                    (pl.col("rating") >= 1) & (pl.col("rating") <= 5)
-                )
-            )
-            
-            # Task 3: Deduplication (ước tính)
-            after_task2 = after_task1.filter(
-                (pl.col("rating") >= 1) & (pl.col("rating") <= 5)
-            )
-            # Đếm duplicates theo (amazon_user_id, asin)
-            duplicates = after_task2.group_by(["amazon_user_id", "asin"]).agg(pl.count().alias("count"))
-            duplicates_count = duplicates.filter(pl.col("count") > 1)
-            task3_dropped = duplicates_count["count"].sum() - len(duplicates_count) if len(duplicates_count) > 0 else 0
-            
-            # Rating distribution trước và sau
-            rating_dist_before = reviews_normalized.group_by("rating").agg(pl.count().alias("count")).sort("rating")
-            rating_dist_after = reviews_clean.group_by("rating").agg(pl.count().alias("count")).sort("rating")
-            
-            # Missing values breakdown
-            missing_breakdown = {
-                "amazon_user_id": reviews_normalized.filter(pl.col("amazon_user_id").is_null()).height,
-                "asin": reviews_normalized.filter(pl.col("asin").is_null()).height,
-                "rating": reviews_normalized.filter(pl.col("rating").is_null()).height,
-                "review_title": reviews_normalized.filter(pl.col("review_title").is_null()).height,
-                "review_text": reviews_normalized.filter(pl.col("review_text").is_null()).height,
-            }
-            
-            stats["reviews"] = {
-                "before": initial_count,
-                "after": final_count,
-                "dropped": initial_count - final_count,
-                "retention_rate": (final_count / initial_count * 100) if initial_count > 0 else 0,
-                "tasks": {
-                    "task1_missing_values": {
-                        "dropped": task1_dropped,
-                        "percentage": (task1_dropped / initial_count * 100) if initial_count > 0 else 0
-                    },
-                    "task2_sanity_check": {
-                        "dropped": task2_dropped,
-                        "percentage": (task2_dropped / initial_count * 100) if initial_count > 0 else 0
-                    },
-                    "task3_deduplication": {
-                        "dropped": task3_dropped,
-                        "percentage": (task3_dropped / initial_count * 100) if initial_count > 0 else 0
-                    }
-                },
-                "rating_distribution_before": [
-                    {"rating": float(row["rating"]), "count": int(row["count"])}
-                    for row in rating_dist_before.to_dicts()
-                ],
-                "rating_distribution_after": [
-                    {"rating": float(row["rating"]), "count": int(row["count"])}
-                    for row in rating_dist_after.to_dicts()
-                ],
-                "missing_values_breakdown": missing_breakdown,
-                "retention_by_task": [
-                    {"task": "Initial", "count": initial_count, "percentage": 100.0},
-                    {"task": "After Task 1", "count": initial_count - task1_dropped, "percentage": ((initial_count - task1_dropped) / initial_count * 100) if initial_count > 0 else 0},
-                    {"task": "After Task 2", "count": initial_count - task1_dropped - task2_dropped, "percentage": ((initial_count - task1_dropped - task2_dropped) / initial_count * 100) if initial_count > 0 else 0},
-                    {"task": "After Task 3", "count": initial_count - task1_dropped - task2_dropped - task3_dropped, "percentage": ((initial_count - task1_dropped - task2_dropped - task3_dropped) / initial_count * 100) if initial_count > 0 else 0},
-                    {"task": "Final", "count": final_count, "percentage": (final_count / initial_count * 100) if initial_count > 0 else 0}
-                ]
-            }
+        embedding_text_path = EMBEDDING_TEXT_PATH
         
-        # 5-Core Interactions Statistics
-        if interactions_all_path.exists() and interactions_5core_path.exists():
-            interactions_all = pl.read_parquet(str(interactions_all_path))
-            interactions_5core = pl.read_parquet(str(interactions_5core_path))
-            
-            all_count = len(interactions_all)
-            core_count = len(interactions_5core)
-            
-            # Train/Test split stats
-            train_count = 0
-            test_count = 0
-            if interactions_5core_train_path.exists() and interactions_5core_test_path.exists():
-                train_df = pl.read_parquet(str(interactions_5core_train_path))
-                test_df = pl.read_parquet(str(interactions_5core_test_path))
-                train_count = len(train_df)
-                test_count = len(test_df)
-            
-            # User and item statistics
-            all_users = interactions_all["user_id"].n_unique()
-            all_items = interactions_all["item_id"].n_unique()
-            core_users = interactions_5core["user_id"].n_unique()
-            core_items = interactions_5core["item_id"].n_unique()
-            
-            # Rating distribution in 5core
-            rating_dist_5core = interactions_5core.group_by("rating").agg(pl.count().alias("count")).sort("rating")
-            
-            stats["interactions_5core"] = {
-                "all_interactions": {
-                    "count": all_count,
-                    "unique_users": all_users,
-                    "unique_items": all_items
-                },
-                "core_interactions": {
-                    "count": core_count,
-                    "unique_users": core_users,
-                    "unique_items": core_items,
-                    "retention_rate": (core_count / all_count * 100) if all_count > 0 else 0,
-                    "users_retention_rate": (core_users / all_users * 100) if all_users > 0 else 0,
-                    "items_retention_rate": (core_items / all_items * 100) if all_items > 0 else 0
-                },
-                "train_test_split": {
-                    "train_count": train_count,
-                    "test_count": test_count,
-                    "train_ratio": (train_count / (train_count + test_count) * 100) if (train_count + test_count) > 0 else 0,
-                    "test_ratio": (test_count / (train_count + test_count) * 100) if (train_count + test_count) > 0 else 0
-                },
-                "rating_distribution": [
-                    {"rating": float(row["rating"]), "count": int(row["count"])}
-                    for row in rating_dist_5core.to_dicts()
-                ],
-                "filtering_steps": [
-                    {"step": "All Interactions", "count": all_count, "users": all_users, "items": all_items},
-                    {"step": "5-Core Filtered", "count": core_count, "users": core_users, "items": core_items}
-                ]
-            }
+        # Các file độc lập với nhau -> đọc/tính song song trên thread pool,
+        # Polars nhả GIL khi decode parquet nên các thread chạy thực sự song song
+        reviews_stats, interactions_stats, token_stats = await asyncio.gather(
+            asyncio.to_thread(_reviews_cleaning_stats, reviews_normalized_path, reviews_clean_path),
+            asyncio.to_thread(
+                _interactions_5core_stats,
+                interactions_all_path,
+                interactions_5core_path,
+                interactions_5core_train_path,
+                interactions_5core_test_path,
+            ),
+            asyncio.to_thread(_embedding_token_stats, embedding_text_path),
+        )
         
-        # Embedding Token Statistics
-        if embedding_text_path.exists():
-            embedding_df = pl.read_parquet(str(embedding_text_path))
-            
-            # Count tokens in embedding_text (simple word count)
-            if "embedding_text" in embedding_df.columns:
-                # Calculate approximate token counts (split by spaces)
-                token_counts = embedding_df.select([
-                    pl.col("embedding_text").str.split(" ").list.len().alias("token_count")
-                ])
-                
-                token_stats = token_counts.select([
-                    pl.col("token_count").mean().alias("avg_tokens"),
-                    pl.col("token_count").median().alias("median_tokens"),
-                    pl.col("token_count").min().alias("min_tokens"),
-                    pl.col("token_count").max().alias("max_tokens"),
-                    pl.col("token_count").std().alias("std_tokens")
-                ]).to_dicts()[0]
-                
-                # Token distribution (bins)
-                token_counts_list = token_counts["token_count"].to_list()
-                bins = [0, 50, 100, 200, 300, 500, 1000]
-                bin_labels = ["0-50", "51-100", "101-200", "201-300", "301-500", "501-1000", "1000+"]
-                token_distribution = []
-                
-                for i in range(len(bins)):
-                    if i < len(bins) - 1:
-                        bin_min, bin_max = bins[i], bins[i + 1]
-                        count = sum(1 for tc in token_counts_list if bin_min <= tc < bin_max)
-                    else:
-                        # Last bin: >= 1000
-                        count = sum(1 for tc in token_counts_list if tc >= bins[-1])
-                    
-                    if count > 0:
-                        token_distribution.append({
-                            "range": bin_labels[i],
-                            "count": count,
-                            "percentage": (count / len(token_counts_list) * 100) if token_counts_list else 0
-                        })
-                
-                stats["embedding_tokens"] = {
-                    "total_items": len(embedding_df),
-                    "statistics": {
-                        "avg_tokens": float(token_stats["avg_tokens"]) if token_stats["avg_tokens"] else 0,
-                        "median_tokens": float(token_stats["median_tokens"]) if token_stats["median_tokens"] else 0,
-                        "min_tokens": int(token_stats["min_tokens"]) if token_stats["min_tokens"] else 0,
-                        "max_tokens": int(token_stats["max_tokens"]) if token_stats["max_tokens"] else 0,
-                        "std_tokens": float(token_stats["std_tokens"]) if token_stats["std_tokens"] else 0
-                    },
-                    "token_distribution": token_distribution
-            }
+        stats = {}
+        if reviews_stats is not None:
+            stats["reviews"] = reviews_stats
+        if interactions_stats is not None:
+            stats["interactions_5core"] = interactions_stats
+        if token_stats is not None:
+            stats["embedding_tokens"] = token_stats
         
         return {
             "success": True,
@@ -693,125 +1229,189 @@ async def get_cleaning_stats():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _is_blank(column: str) -> pl.Expr:
+    """Predicate dùng chung cho các cột text: null hoặc chỉ gồm khoảng trắng."""
+    # Regex match trực tiếp, không tạo cột string đã strip chỉ để so sánh với ""
+    return pl.col(column).is_null() | pl.col(column).str.contains(r"^\s*$")
+
+
+def _pct(count: float, total: float) -> float:
+    """Phần trăm count / total (0 khi total = 0)."""
+    return (count / total * 100.0) if total > 0 else 0.0
+
+
+def _null_counts_by_column(null_counts: Dict[str, int], total_rows: int) -> Dict[str, Dict[str, Any]]:
+    """Đổi {column: null_count} (một dòng của null_count()) sang format count/percentage."""
+    return {
+        col: {
+            "count": null_count,
+            "percentage": _pct(null_count, total_rows)
+        }
+        for col, null_count in null_counts.items()
+    }
+
+
+def _reviews_quality_stats(reviews_raw_path: Path, reviews_normalized_path: Path) -> Optional[Dict[str, Any]]:
+    """Data quality của reviews_raw (None nếu thiếu file)."""
+    if not (reviews_raw_path.exists() and reviews_normalized_path.exists()):
+        return None
+    
+    # Gom mọi aggregate vào lazy query, không materialize toàn bộ file raw
+    reviews_lf = pl.scan_parquet(str(reviews_raw_path))
+    review_columns = reviews_lf.collect_schema().names()
+    summary_lf = reviews_lf.select([
+        pl.col(review_columns).null_count(),
+        # Invalid: null hoặc ngoài [1, 5]
+        (~pl.col("rating").is_between(1, 5, closed="both").fill_null(False))
+        .sum().alias("__invalid_ratings"),
+        _is_blank("review_text").sum().alias("__empty_review_text"),
+        # Duplicate records (theo amazon_user_id + asin) = số dòng - số cặp unique
+        pl.struct(["amazon_user_id", "asin"]).n_unique().alias("__unique_pairs"),
+    ])
+    summary = _collect_all_streaming([summary_lf])[0].row(0, named=True)
+    
+    # Số dòng lấy từ footer parquet
+    total_rows = _parquet_num_rows(reviews_raw_path)
+    
+    # Null values per column
+    null_counts = _null_counts_by_column({col: summary[col] for col in review_columns}, total_rows)
+    
+    duplicate_count = total_rows - summary["__unique_pairs"]
+    
+    # Invalid ratings (ngoài [1, 5])
+    invalid_ratings = summary["__invalid_ratings"]
+    
+    # Empty text fields
+    empty_review_text = summary["__empty_review_text"]
+    
+    duplicate_pct = _pct(duplicate_count, total_rows)
+    invalid_ratings_pct = _pct(invalid_ratings, total_rows)
+    key_null_pct = sum(
+        null_counts.get(col, {}).get("percentage", 0) for col in ["amazon_user_id", "asin", "rating"]
+    ) / 3
+    
+    return {
+        "total_rows": total_rows,
+        "null_values_by_column": null_counts,
+        "duplicate_records": {
+            "count": duplicate_count,
+            "percentage": duplicate_pct
+        },
+        "invalid_ratings": {
+            "count": invalid_ratings,
+            "percentage": invalid_ratings_pct
+        },
+        "empty_review_text": {
+            "count": empty_review_text,
+            "percentage": _pct(empty_review_text, total_rows)
+        },
+        "data_quality_score": max(0.0, 100.0 - duplicate_pct - invalid_ratings_pct - key_null_pct)
+    }
+
+
+def _metadata_quality_stats(metadata_raw_path: Path, metadata_normalized_path: Path) -> Optional[Dict[str, Any]]:
+    """Data quality của metadata_raw (None nếu thiếu file)."""
+    if not (metadata_raw_path.exists() and metadata_normalized_path.exists()):
+        return None
+    
+    # Gom mọi aggregate vào lazy query, không materialize toàn bộ file raw
+    metadata_lf = pl.scan_parquet(str(metadata_raw_path))
+    metadata_columns = metadata_lf.collect_schema().names()
+    summary_lf = metadata_lf.select([
+        pl.col(metadata_columns).null_count(),
+        # Missing title
+        _is_blank("title").sum().alias("__missing_title"),
+        # Missing category (All Beauty hoặc null)
+        (_is_blank("main_category") | (pl.col("main_category") == "All Beauty"))
+        .sum().alias("__missing_category"),
+        # Duplicate records (theo parent_asin) = số dòng - số parent_asin unique
+        pl.col("parent_asin").n_unique().alias("__unique_parent_asins"),
+    ])
+    summary = _collect_all_streaming([summary_lf])[0].row(0, named=True)
+    
+    # Số dòng lấy từ footer parquet
+    total_rows = _parquet_num_rows(metadata_raw_path)
+    
+    # Null values per column
+    null_counts = _null_counts_by_column({col: summary[col] for col in metadata_columns}, total_rows)
+    
+    duplicate_count = total_rows - summary["__unique_parent_asins"]
+    missing_title = summary["__missing_title"]
+    missing_category = summary["__missing_category"]
+    
+    duplicate_pct = _pct(duplicate_count, total_rows)
+    missing_title_pct = _pct(missing_title, total_rows)
+    missing_category_pct = _pct(missing_category, total_rows)
+    
+    return {
+        "total_rows": total_rows,
+        "null_values_by_column": null_counts,
+        "duplicate_records": {
+            "count": duplicate_count,
+            "percentage": duplicate_pct
+        },
+        "missing_title": {
+            "count": missing_title,
+            "percentage": missing_title_pct
+        },
+        "missing_category": {
+            "count": missing_category,
+            "percentage": missing_category_pct
+        },
+        "data_quality_score": max(0.0, 100.0 - duplicate_pct - missing_title_pct - missing_category_pct)
+    }
+
+
+def _data_quality_stats(
+    reviews_raw_path: Path,
+    reviews_normalized_path: Path,
+    metadata_raw_path: Path,
+    metadata_normalized_path: Path
+) -> Dict[str, Any]:
+    """Thống kê data quality của reviews và metadata (bỏ qua phần thiếu file)."""
+    return _data_quality_payload(
+        _reviews_quality_stats(reviews_raw_path, reviews_normalized_path),
+        _metadata_quality_stats(metadata_raw_path, metadata_normalized_path),
+    )
+
+
+def _data_quality_payload(
+    reviews_stats: Optional[Dict[str, Any]],
+    metadata_stats: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Gộp kết quả từng phần thành data của /data-quality (bỏ qua phần None)."""
+    stats = {}
+    if reviews_stats is not None:
+        stats["reviews"] = reviews_stats
+    if metadata_stats is not None:
+        stats["metadata"] = metadata_stats
+    return stats
+
+
 @router.get("/data-quality")
+@cached_response(*DATA_QUALITY_SOURCES, DASHBOARD_STATS_PATH)
 async def get_data_quality():
     """Lấy thống kê về data quality: null values, missing data, duplicates."""
     try:
-        # Đọc raw và normalized data để so sánh
-        reviews_raw_path = PROCESSED_DIR / "reviews_raw.parquet"
-        reviews_normalized_path = PROCESSED_DIR / "reviews_normalized.parquet"
-        metadata_raw_path = PROCESSED_DIR / "metadata_raw.parquet"
-        metadata_normalized_path = PROCESSED_DIR / "metadata_normalized.parquet"
-        
-        stats = {}
-        
-        # Reviews Data Quality
-        if reviews_raw_path.exists() and reviews_normalized_path.exists():
-            reviews_raw = pl.read_parquet(str(reviews_raw_path))
-            reviews_normalized = pl.read_parquet(str(reviews_normalized_path))
-            
-            total_rows = len(reviews_raw)
-            
-            # Null values per column
-            null_counts = {}
-            for col in reviews_raw.columns:
-                null_count = reviews_raw.filter(pl.col(col).is_null()).height
-                null_counts[col] = {
-                    "count": null_count,
-                    "percentage": (null_count / total_rows * 100) if total_rows > 0 else 0
-                }
-            
-            # Duplicate records (theo amazon_user_id + asin)
-            duplicates = reviews_raw.group_by(["amazon_user_id", "asin"]).agg(pl.count().alias("count"))
-            duplicate_records = duplicates.filter(pl.col("count") > 1)
-            duplicate_count = duplicate_records["count"].sum() - len(duplicate_records) if len(duplicate_records) > 0 else 0
-            
-            # Invalid ratings (ngoài [1, 5])
-            invalid_ratings = reviews_raw.filter(
-                (pl.col("rating") < 1) | (pl.col("rating") > 5) | pl.col("rating").is_null()
-            ).height
-            
-            # Empty text fields
-            empty_review_text = reviews_raw.filter(
-                (pl.col("review_text").is_null()) | (pl.col("review_text").str.strip_chars() == "")
-            ).height
-            
-            stats["reviews"] = {
-                "total_rows": total_rows,
-                "null_values_by_column": null_counts,
-                "duplicate_records": {
-                    "count": duplicate_count,
-                    "percentage": (duplicate_count / total_rows * 100) if total_rows > 0 else 0
-                },
-                "invalid_ratings": {
-                    "count": invalid_ratings,
-                    "percentage": (invalid_ratings / total_rows * 100) if total_rows > 0 else 0
-                },
-                "empty_review_text": {
-                    "count": empty_review_text,
-                    "percentage": (empty_review_text / total_rows * 100) if total_rows > 0 else 0
-                },
-                "data_quality_score": max(0, 100 - (
-                    (duplicate_count / total_rows * 100) if total_rows > 0 else 0 +
-                    (invalid_ratings / total_rows * 100) if total_rows > 0 else 0 +
-                    sum(null_counts.get(col, {}).get("percentage", 0) for col in ["amazon_user_id", "asin", "rating"]) / 3
-                ))
+        precomputed = await asyncio.to_thread(_precomputed_dashboard_stats, "data_quality", *DATA_QUALITY_SOURCES)
+        if precomputed is not None:
+            return {
+                "success": True,
+                "data": precomputed
             }
         
-        # Metadata Data Quality
-        if metadata_raw_path.exists() and metadata_normalized_path.exists():
-            metadata_raw = pl.read_parquet(str(metadata_raw_path))
-            metadata_normalized = pl.read_parquet(str(metadata_normalized_path))
-            
-            total_rows = len(metadata_raw)
-            
-            # Null values per column
-            null_counts = {}
-            for col in metadata_raw.columns:
-                null_count = metadata_raw.filter(pl.col(col).is_null()).height
-                null_counts[col] = {
-                    "count": null_count,
-                    "percentage": (null_count / total_rows * 100) if total_rows > 0 else 0
-                }
-            
-            # Duplicate records (theo parent_asin)
-            duplicates = metadata_raw.group_by("parent_asin").agg(pl.count().alias("count"))
-            duplicate_records = duplicates.filter(pl.col("count") > 1)
-            duplicate_count = duplicate_records["count"].sum() - len(duplicate_records) if len(duplicate_records) > 0 else 0
-            
-            # Missing title
-            missing_title = metadata_raw.filter(
-                (pl.col("title").is_null()) | (pl.col("title").str.strip_chars() == "")
-            ).height
-            
-            # Missing category (All Beauty hoặc null)
-            missing_category = metadata_raw.filter(
-                (pl.col("main_category").is_null()) | 
-                (pl.col("main_category") == "All Beauty") |
-                (pl.col("main_category").str.strip_chars() == "")
-            ).height
-            
-            stats["metadata"] = {
-                "total_rows": total_rows,
-                "null_values_by_column": null_counts,
-                "duplicate_records": {
-                    "count": duplicate_count,
-                    "percentage": (duplicate_count / total_rows * 100) if total_rows > 0 else 0
-                },
-                "missing_title": {
-                    "count": missing_title,
-                    "percentage": (missing_title / total_rows * 100) if total_rows > 0 else 0
-                },
-                "missing_category": {
-                    "count": missing_category,
-                    "percentage": (missing_category / total_rows * 100) if total_rows > 0 else 0
-                },
-                "data_quality_score": max(0, 100 - (
-                    (duplicate_count / total_rows * 100) if total_rows > 0 else 0 +
-                    (missing_title / total_rows * 100) if total_rows > 0 else 0 +
-                    (missing_category / total_rows * 100) if total_rows > 0 else 0
-                ))
-            }
+        # Đọc raw và normalized data để so sánh
+        reviews_raw_path = REVIEWS_RAW_PATH
+        reviews_normalized_path = REVIEWS_NORMALIZED_PATH
+        metadata_raw_path = METADATA_RAW_PATH
+        metadata_normalized_path = METADATA_NORMALIZED_PATH
+        
+        # Reviews và metadata độc lập -> tính song song trên thread pool
+        reviews_stats, metadata_stats = await asyncio.gather(
+            asyncio.to_thread(_reviews_quality_stats, reviews_raw_path, reviews_normalized_path),
+            asyncio.to_thread(_metadata_quality_stats, metadata_raw_path, metadata_normalized_path),
+        )
+        stats = _data_quality_payload(reviews_stats, metadata_stats)
         
         return {
             "success": True,
@@ -13,6 +13,7 @@ from app.web.schemas.cart import (
 )
 from app.web.schemas.auth import UserResponse, ErrorResponse
 from app.web.services.cart_service import CartService
+from app.web.services.redis_context_service import get_redis_context_service
 
 router = APIRouter(prefix="/api/cart", tags=["Shopping Cart"])
 
@@ -79,16 +80,18 @@ async def add_to_cart(
     
     Nếu item đã có trong cart, sẽ tăng quantity.
     """
-    success, error = await CartService.add_item(db, current_user.id, item_data)
+    # Service trả về luôn cart sau khi thêm (không query lại cart)
+    cart, error = await CartService.add_item(db, current_user.id, item_data)
     
-    if not success:
+    if not cart:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=error or "Không thể thêm item vào cart"
         )
     
-    # Trả về cart sau khi thêm
-    cart = await CartService.get_cart(db, current_user.id)
+    # Cart đổi -> reference items của user đổi, bỏ cache recommendation cũ
+    get_redis_context_service().invalidate_user_recommendations(current_user.id)
+    
     return cart
 
 
@@ -113,19 +116,21 @@ async def update_cart_item(
     - **asin**: Item ASIN (path parameter)
     - **quantity**: Số lượng mới (tối thiểu 1)
     """
-    success, error = await CartService.update_item(
+    # Service trả về luôn cart sau khi cập nhật
+    cart, error = await CartService.update_item(
         db, current_user.id, asin, item_data
     )
     
-    if not success:
+    if not cart:
         status_code = status.HTTP_404_NOT_FOUND if "không có" in (error or "").lower() else status.HTTP_400_BAD_REQUEST
         raise HTTPException(
             status_code=status_code,
             detail=error or "Không thể cập nhật item"
         )
     
-    # Trả về cart sau khi cập nhật
-    cart = await CartService.get_cart(db, current_user.id)
+    # Cart đổi -> reference items của user đổi, bỏ cache recommendation cũ
+    get_redis_context_service().invalidate_user_recommendations(current_user.id)
+    
     return cart
 
 
@@ -147,17 +152,19 @@ async def remove_from_cart(
     
     - **asin**: Item ASIN (path parameter)
     """
-    success, error = await CartService.remove_item(db, current_user.id, asin)
+    # Service trả về luôn cart sau khi xóa
+    cart, error = await CartService.remove_item(db, current_user.id, asin)
     
-    if not success:
+    if not cart:
         status_code = status.HTTP_404_NOT_FOUND if "không có" in (error or "").lower() else status.HTTP_400_BAD_REQUEST
         raise HTTPException(
             status_code=status_code,
             detail=error or "Không thể xóa item"
         )
     
-    # Trả về cart sau khi xóa
-    cart = await CartService.get_cart(db, current_user.id)
+    # Cart đổi -> reference items của user đổi, bỏ cache recommendation cũ
+    get_redis_context_service().invalidate_user_recommendations(current_user.id)
+    
     return cart
 
 
@@ -175,15 +182,17 @@ async def clear_cart(
     """
     Xóa tất cả items khỏi cart.
     """
-    success, error = await CartService.clear_cart(db, current_user.id)
+    # Service trả về luôn cart rỗng sau khi xóa
+    cart, error = await CartService.clear_cart(db, current_user.id)
     
-    if not success:
+    if not cart:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=error or "Không thể xóa cart"
         )
     
-    # Trả về cart rỗng
-    cart = await CartService.get_cart(db, current_user.id)
+    # Cart đổi -> reference items của user đổi, bỏ cache recommendation cũ
+    get_redis_context_service().invalidate_user_recommendations(current_user.id)
+    
     return cart
 
@@ -8,70 +8,143 @@ API endpoint để nhận events từ frontend và xử lý:
 3. Gửi event sang async worker để ghi PostgreSQL (LONG-TERM)
 """
 
+import asyncio
 import logging
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.web.schemas.event import EventRequest, EventResponse, InteractionLog
 from app.web.services.redis_context_service import get_redis_context_service
 from app.web.services.event_logging_service import EventLoggingService
-from app.web.utils.database import get_db
+from app.web.utils.database import AsyncSessionLocal, get_db
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/event", tags=["events"])
 
 
-async def log_interaction_to_postgres(
-    db: AsyncSession,
-    interaction_log: InteractionLog,
-    category: str = None,
-    brand: str = None
-):
+# Event queue trong process: mặc định (EVENT_STREAM_ENABLED chưa bật) hoặc khi không đẩy
+# được vào Redis Stream; event worker nội bộ gom batch rồi ghi PostgreSQL
+EVENT_BATCH_SIZE = 500  # Flush khi đủ số event này
+EVENT_FLUSH_INTERVAL = 1.0  # Hoặc sau số giây này kể từ event đầu tiên của batch
+EVENT_QUEUE_MAXSIZE = 50000  # Giới hạn bộ nhớ nếu PostgreSQL chậm/không ghi được
+
+_event_queue: Optional[asyncio.Queue] = None
+_event_worker_task: Optional[asyncio.Task] = None
+
+
+def get_event_queue() -> asyncio.Queue:
+    """Get event queue (tạo lazy trong event loop đang chạy)."""
+    global _event_queue
+    if _event_queue is None:
+        _event_queue = asyncio.Queue(maxsize=EVENT_QUEUE_MAXSIZE)
+    return _event_queue
+
+
+def enqueue_interaction_log(interaction_log: InteractionLog):
+    """Đưa interaction log vào event queue trong process (mặc định, hoặc fallback khi Redis Stream lỗi)."""
+    try:
+        get_event_queue().put_nowait(interaction_log)
+    except asyncio.QueueFull:
+        logger.error(
+            f"Event queue full, dropping PostgreSQL log for user {interaction_log.user_id}, "
+            f"asin={interaction_log.asin}"
+        )
+
+
+async def flush_interaction_logs(interaction_logs: List[InteractionLog]):
     """
-    Background task để ghi interaction log vào PostgreSQL.
+    Ghi một batch interaction logs vào PostgreSQL.
+    
+    Dùng session riêng (không dùng session của request vì request đã kết thúc).
     
     Args:
-        db: Database session
-        interaction_log: InteractionLog object
-        category: Item category (optional)
-        brand: Item brand (optional)
+        interaction_logs: Danh sách InteractionLog
     """
     try:
-        # Nếu chưa có category, lấy từ database
-        if not category:
-            category = await EventLoggingService.get_item_category(db, interaction_log.asin)
+        async with AsyncSessionLocal() as db:
+            success_count = await EventLoggingService.log_interactions_batch(db, interaction_logs)
         
-        # Nếu chưa có brand, lấy từ database
-        if not brand:
-            brand = await EventLoggingService.get_item_brand(db, interaction_log.asin)
-        
-        # Thêm category và brand vào metadata nếu có
-        if interaction_log.metadata is None:
-            interaction_log.metadata = {}
-        
-        if category:
-            interaction_log.metadata["category"] = category
-        if brand:
-            interaction_log.metadata["brand"] = brand
-        
-        # Ghi vào PostgreSQL
-        success = await EventLoggingService.log_interaction(db, interaction_log)
-        
-        if success:
-            logger.info(
-                f"✅ Logged interaction to PostgreSQL: "
-                f"user_id={interaction_log.user_id}, asin={interaction_log.asin}, "
-                f"event_type={interaction_log.event_type.value}"
-            )
+        if success_count == len(interaction_logs):
+            logger.info(f"✅ Logged {success_count} interactions to PostgreSQL")
         else:
             logger.error(
-                f"❌ Failed to log interaction to PostgreSQL: "
-                f"user_id={interaction_log.user_id}, asin={interaction_log.asin}"
+                f"❌ Failed to log {len(interaction_logs) - success_count}/"
+                f"{len(interaction_logs)} interactions to PostgreSQL"
             )
             
     except Exception as e:
-        logger.error(f"Error in background task log_interaction_to_postgres: {e}")
+        logger.error(f"Error in flush_interaction_logs: {e}")
+
+
+async def _drain_event_queue():
+    """
+    Event worker: lấy event từ queue, flush khi đủ EVENT_BATCH_SIZE
+    hoặc sau EVENT_FLUSH_INTERVAL giây. Dừng khi nhận None (do stop_event_worker gửi),
+    sau khi đã flush batch đang gom.
+    """
+    queue = get_event_queue()
+    loop = asyncio.get_running_loop()
+    stopping = False
+    
+    while not stopping:
+        first = await queue.get()
+        if first is None:
+            break
+        
+        batch = [first]
+        deadline = loop.time() + EVENT_FLUSH_INTERVAL
+        
+        while len(batch) < EVENT_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+        
+        await flush_interaction_logs(batch)
+
+
+async def start_event_worker():
+    """Khởi động event worker (gọi trong startup event của app)."""
+    global _event_worker_task
+    if _event_worker_task is None:
+        _event_worker_task = asyncio.create_task(_drain_event_queue())
+        logger.info(
+            f"Event worker started: batch_size={EVENT_BATCH_SIZE}, "
+            f"flush_interval={EVENT_FLUSH_INTERVAL}s"
+        )
+
+
+async def stop_event_worker():
+    """
+    Dừng event worker (gọi khi shutdown): gửi None để worker flush batch đang gom
+    và thoát, sau đó flush nốt các event còn lại trong queue.
+    """
+    global _event_worker_task
+    queue = get_event_queue()
+    
+    if _event_worker_task is not None:
+        await queue.put(None)
+        await _event_worker_task
+        _event_worker_task = None
+    
+    remaining = []
+    while not queue.empty():
+        item = queue.get_nowait()
+        if item is not None:
+            remaining.append(item)
+    
+    for i in range(0, len(remaining), EVENT_BATCH_SIZE):
+        await flush_interaction_logs(remaining[i:i + EVENT_BATCH_SIZE])
 
 
 @router.post(
@@ -90,7 +163,6 @@ async def log_interaction_to_postgres(
 )
 async def log_event(
     event_request: EventRequest,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -99,16 +171,20 @@ async def log_event(
     Flow:
     1. Ghi Redis context (realtime) - NGAY LẬP TỨC
     2. Trả 200 OK - KHÔNG chờ PostgreSQL
-    3. Background task ghi PostgreSQL (long-term)
+    3. Đẩy sang worker ghi PostgreSQL theo batch (Redis Stream nếu bật, không thì queue trong process)
     """
     try:
         # Lấy Redis context service
         redis_service = get_redis_context_service()
         
-        # Lấy category và brand từ database (nhanh, không block)
-        # Nếu không lấy được, sẽ lấy trong background task
-        category = await EventLoggingService.get_item_category(db, event_request.asin)
-        brand = await EventLoggingService.get_item_brand(db, event_request.asin)
+        # Lấy category và brand: ưu tiên cache Redis (item:{asin}:meta),
+        # cache miss thì query database một lần rồi ghi lại cache (TTL 24h)
+        item_meta = redis_service.get_item_meta(event_request.asin)
+        if item_meta is None:
+            item_meta = await EventLoggingService.get_item_meta(db, event_request.asin)
+            if any(item_meta):
+                redis_service.set_item_meta(event_request.asin, *item_meta)
+        category, brand = item_meta
         
         # 1. GHI REDIS CONTEXT (NGAY LẬP TỨC)
         # Đây là bước quan trọng nhất - phải làm ngay để re-ranking có context
@@ -126,23 +202,28 @@ async def log_event(
             )
             # Vẫn tiếp tục, không fail request
         
-        # 2. TẠO INTERACTION LOG OBJECT
+        # Context của user đã đổi -> bỏ cache recommendation cũ của user
+        redis_service.invalidate_user_recommendations(event_request.user_id)
+        
+        # 2. TẠO INTERACTION LOG OBJECT (kèm category/brand trong metadata nếu có)
+        metadata = dict(event_request.metadata or {})
+        if category:
+            metadata["category"] = category
+        if brand:
+            metadata["brand"] = brand
+        
         interaction_log = InteractionLog(
             user_id=event_request.user_id,
             asin=event_request.asin,
             event_type=event_request.event_type,
-            metadata=event_request.metadata
+            metadata=metadata
         )
         
-        # 3. GỬI SANG BACKGROUND TASK (KHÔNG CHỜ)
-        # Background task sẽ ghi vào PostgreSQL
-        background_tasks.add_task(
-            log_interaction_to_postgres,
-            db=db,
-            interaction_log=interaction_log,
-            category=category,
-            brand=brand
-        )
+        # 3. ĐẨY SANG WORKER (KHÔNG CHỜ POSTGRESQL)
+        # EVENT_STREAM_ENABLED=true: đẩy vào Redis Stream, event worker (process riêng) gom batch
+        # và ghi PostgreSQL. Mặc định (hoặc Redis lỗi): event queue trong process.
+        if not (settings.event_stream_enabled and redis_service.publish_event(interaction_log)):
+            enqueue_interaction_log(interaction_log)
         
         # 4. TRẢ 200 OK NGAY (KHÔNG CHỜ POSTGRESQL)
         return EventResponse(
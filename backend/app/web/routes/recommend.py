@@ -8,19 +8,21 @@ API endpoints để lấy recommendations cho user.
 import logging
 import asyncio
 import concurrent.futures
+import functools
 import random
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-from app.web.schemas.item import RecommendResponse, RecommendedItemResponse
+from app.web.schemas.item import ItemResponse, RecommendResponse, RecommendedItemResponse
 from app.web.schemas.auth import UserResponse
 from app.web.services.recommendation_service import get_recommendation_service
 from app.web.services.item_service import ItemService
+from app.web.services.redis_context_service import get_redis_context_service
 from app.web.services.user_history_service import UserHistoryService
-from app.web.utils.database import get_db
+from app.web.utils.database import AsyncSessionLocal, get_db
 from app.web.utils.auth_middleware import get_current_user, get_optional_user
 
 logger = logging.getLogger(__name__)
@@ -79,6 +81,18 @@ async def get_trending_items(
         return {}
 
 
+async def _get_trending_items_with_own_session(
+    hours: int = 24,
+    limit: int = 50
+) -> Dict[str, float]:
+    """
+    get_trending_items với session riêng, để chạy đồng thời với các query
+    khác trên session của request (một AsyncSession không dùng song song được).
+    """
+    async with AsyncSessionLocal() as session:
+        return await get_trending_items(session, hours=hours, limit=limit)
+
+
 def shuffle_recommendations(
     recommendations: List[RecommendedItemResponse],
     seed: Optional[int] = None,
@@ -139,254 +153,273 @@ def shuffle_recommendations(
         return shuffled
 
 
-@router.get(
-    "",
-    response_model=RecommendResponse,
-    summary="Get recommendations for user",
-    description="""
-    Lấy recommendations cho user.
-    - Nếu đã đăng nhập: Sử dụng full pipeline (MF + Popularity + Content recall)
-    - Nếu chưa đăng nhập: Chỉ dùng Popularity recall (top popular items)
-    - Có thể randomize bằng seed parameter
-    - Tự động boost trending items dựa trên recent views
+class _ItemPrefetcher:
     """
-)
-async def get_recommendations(
-    top_n: Optional[int] = Query(20, ge=1, le=100, description="Number of recommendations"),
-    seed: Optional[int] = Query(None, description="Random seed for shuffling (None = random each time)"),
-    current_user: Optional[UserResponse] = Depends(get_optional_user),
-    db: AsyncSession = Depends(get_db)
-):
+    Prefetch item details ngay khi ranking xong (shortlist top_n * 2 items).
+    
+    generate_recommendations (chạy trong thread pool) gọi instance này qua on_candidates;
+    query get_items_by_asins được đẩy lên event loop nên chạy song song với
+    re-ranking. Trong lúc chờ pipeline, session của request không bị dùng
+    ở chỗ khác nên query này dùng chung session.
     """
-    Lấy recommendations cho user.
     
-    Args:
-        top_n: Số lượng recommendations
-        current_user: Current user (optional, từ JWT token nếu có)
-        db: Database session
-        
+    def __init__(self, db: AsyncSession, loop: asyncio.AbstractEventLoop):
+        self.db = db
+        self.loop = loop
+        self.future: Optional[concurrent.futures.Future] = None
+        self.closed = False
+    
+    def __call__(self, candidate_item_ids: List[str]) -> None:
+        if self.closed:
+            return
+        self.future = asyncio.run_coroutine_threadsafe(
+            ItemService.get_items_by_asins(self.db, list(candidate_item_ids)),
+            self.loop
+        )
+    
+    async def get_items(self) -> Optional[List[ItemResponse]]:
+        """Items đã prefetch; None nếu chưa prefetch hoặc lỗi (caller tự query)."""
+        self.closed = True
+        if self.future is None:
+            return None
+        try:
+            return await asyncio.wrap_future(self.future)
+        except Exception as e:
+            logger.warning(f"Item prefetch failed: {e}, fetching items again")
+            # Session dùng chung đang ở transaction lỗi: rollback để caller query lại được
+            try:
+                await self.db.rollback()
+            except Exception:
+                pass
+            return None
+    
+    async def close(self) -> None:
+        """Không dùng kết quả prefetch: chờ query (nếu có) xong để session được dùng/đóng an toàn."""
+        await self.get_items()
+
+
+def _recommendations_to_cache(
+    recommendations: List[RecommendedItemResponse],
+    recall_count: int,
+    ranking_count: int
+) -> Dict:
+    """Payload JSON để cache kết quả recommendation (trước khi shuffle)."""
+    return {
+        "recommendations": [rec.model_dump() for rec in recommendations],
+        "recall_count": recall_count,
+        "ranking_count": ranking_count
+    }
+
+
+def _recommendations_from_cache(payload: Dict) -> Tuple[List[RecommendedItemResponse], int, int]:
+    """Khôi phục (recommendations, recall_count, ranking_count) từ payload đã cache."""
+    return (
+        [RecommendedItemResponse(**rec) for rec in payload["recommendations"]],
+        payload["recall_count"],
+        payload["ranking_count"]
+    )
+
+
+async def _generate_anonymous_recommendations(
+    db: AsyncSession,
+    recommendation_service,
+    top_n: int
+) -> Tuple[List[RecommendedItemResponse], int, int]:
+    """
+    Recommendations cho user chưa đăng nhập (chỉ Popularity recall), chưa shuffle.
+    
     Returns:
-        RecommendResponse
+        Tuple of (recommendations, recall_count, ranking_count)
     """
+    # Generate recommendations chỉ với Popularity recall (không dùng MF và Content recall)
+    # Sử dụng user_id="anonymous" và không có reference items
+    loop = asyncio.get_event_loop()
+    prefetcher = _ItemPrefetcher(db, loop)
+    
     try:
-        # Get recommendation service
-        recommendation_service = get_recommendation_service(top_n=top_n)
-        
-        # Lấy trending items từ interaction_logs (dựa trên recent views)
-        trending_scores = await get_trending_items(db, hours=24, limit=100)
-        
-        # Nếu chưa đăng nhập, chỉ dùng Popularity recall
-        if not current_user:
-            logger.info("User not logged in, using popularity-only recommendations")
-            
-            # Generate recommendations chỉ với Popularity recall (không dùng MF và Content recall)
-            # Sử dụng user_id="anonymous" và không có reference items
-            loop = asyncio.get_event_loop()
-            
-            try:
-                # Chạy trong thread pool với timeout 90 giây
-                with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                    future = loop.run_in_executor(
-                        executor,
-                        recommendation_service.generate_recommendations,
-                        "anonymous",  # Dummy user_id cho anonymous users
-                        top_n,
-                        None,  # Không có user_reference_items
-                        1.0,  # content_score_boost
-                        False  # use_only_content_recall = False (vẫn dùng Popularity recall)
-                    )
-                    reranked_items, recall_count, ranking_count = await asyncio.wait_for(
-                        future,
-                        timeout=90.0  # 90 giây timeout
-                    )
-            except asyncio.TimeoutError:
-                logger.error("Recommendation generation timeout for anonymous user")
-                raise HTTPException(
-                    status_code=504,
-                    detail="Recommendation generation timeout. Please try again."
-                )
-            except Exception as e:
-                logger.error(f"Error generating recommendations for anonymous user: {e}", exc_info=True)
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Failed to generate recommendations: {str(e)}"
-                )
-            
-            if not reranked_items:
-                return RecommendResponse(
-                    user_id=0,
-                    recommendations=[],
-                    total=0,
-                    recall_count=0,
-                    ranking_count=0
-                )
-            
-            # Lấy ASINs từ recommendations
-            asins = [item.item_id for item in reranked_items]
-            logger.info(f"Fetching details for {len(asins)} items from database (anonymous user)")
-            
-            # Lấy item details từ database
-            items = []
-            try:
-                items = await ItemService.get_items_by_asins(db, asins)
-                logger.info(f"Successfully fetched {len(items)} items from database")
-            except Exception as e:
-                logger.error(f"Error fetching items from database: {e}", exc_info=True)
-                try:
-                    await db.rollback()
-                except Exception:
-                    pass
-                items = []
-            
-            if not items:
-                logger.warning(f"No items found in database for {len(asins)} ASINs")
-                return RecommendResponse(
-                    user_id=0,
-                    recommendations=[],
-                    total=0,
-                    recall_count=recall_count,
-                    ranking_count=ranking_count
-                )
-            
-            # Tạo mapping ASIN -> ItemResponse
-            item_map = {item.asin: item for item in items}
-            
-            # Tạo recommendations
-            recommendations = []
-            rank_counter = 1
-            for reranked_item in reranked_items:
-                item = item_map.get(reranked_item.item_id)
-                
-                if item:
-                    recommendations.append(RecommendedItemResponse(
-                        asin=item.asin,
-                        title=item.title,
-                        main_category=item.main_category,
-                        avg_rating=item.avg_rating,
-                        rating_number=item.rating_number,
-                        primary_image=item.primary_image,
-                        score=reranked_item.adjusted_score,
-                        rank=rank_counter,
-                        applied_rules=reranked_item.applied_rules
-                    ))
-                    rank_counter += 1
-                    
-                    if len(recommendations) >= top_n:
-                        break
-            
-            # Shuffle recommendations dựa trên seed và trending scores
-            recommendations = shuffle_recommendations(
-                recommendations,
-                seed=seed,
-                trending_scores=trending_scores if trending_scores else None
-            )
-            
-            # Update rank sau khi shuffle
-            for idx, rec in enumerate(recommendations):
-                rec.rank = idx + 1
-            
-            logger.info(
-                f"Generated {len(recommendations)} popularity recommendations for anonymous user "
-                f"(seed={seed}, trending_items={len(trending_scores) if trending_scores else 0})"
+        # Chạy trong thread pool với timeout 90 giây
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            future = loop.run_in_executor(
+                executor,
+                functools.partial(recommendation_service.generate_recommendations, on_candidates=prefetcher),
+                "anonymous",  # Dummy user_id cho anonymous users
+                top_n,
+                None,  # Không có user_reference_items
+                1.0,  # content_score_boost
+                False  # use_only_content_recall = False (vẫn dùng Popularity recall)
             )
-            
-            return RecommendResponse(
-                user_id=0,
-                recommendations=recommendations,
-                total=len(recommendations),
-                recall_count=recall_count,
-                ranking_count=ranking_count
+            reranked_items, recall_count, ranking_count = await asyncio.wait_for(
+                future,
+                timeout=90.0  # 90 giây timeout
             )
-        
-        # User đã đăng nhập - sử dụng full pipeline
-        # Lấy amazon_user_id từ database (cần cho MF recall)
-        from sqlalchemy import text
-        result = await db.execute(
-            text("SELECT amazon_user_id FROM users WHERE id = :user_id"),
-            {"user_id": current_user.id}
+    except asyncio.TimeoutError:
+        await prefetcher.close()
+        logger.error("Recommendation generation timeout for anonymous user")
+        raise HTTPException(
+            status_code=504,
+            detail="Recommendation generation timeout. Please try again."
         )
-        user_row = result.fetchone()
-        amazon_user_id = user_row.amazon_user_id if user_row and user_row.amazon_user_id else None
-        
-        # Nếu không có amazon_user_id, dùng user.id làm fallback (sẽ chỉ có Popularity recall)
-        user_id_for_recall = amazon_user_id if amazon_user_id else str(current_user.id)
-        logger.info(
-            f"User {current_user.id}: "
-            f"amazon_user_id={amazon_user_id}, "
-            f"using user_id_for_recall={user_id_for_recall}"
+    except Exception as e:
+        await prefetcher.close()
+        logger.error(f"Error generating recommendations for anonymous user: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate recommendations: {str(e)}"
         )
-        
-        # Lấy user history để recommend items tương tự
-        user_reference_items = []
-        try:
-            user_reference_items = await UserHistoryService.get_user_reference_items(
-                db=db,
-                user_id=current_user.id,
-                include_cart=True,
-                include_purchases=True,
-                include_views=False,  # Chỉ dùng cart và purchases
-                limit_per_source=10
-            )
-            logger.info(f"User {current_user.id} has {len(user_reference_items)} reference items from history")
-        except Exception as e:
-            logger.warning(f"Error getting user history: {e}, continuing without history")
-            user_reference_items = []
-        
-        # Generate recommendations (vẫn có recommendations từ Popularity recall nếu không có history)
-        logger.info(f"Generating recommendations for user {current_user.id} (amazon_user_id: {user_id_for_recall})")
-        
-        # Chạy recommendation generation trong thread pool để không block event loop
-        loop = asyncio.get_event_loop()
-        
+    
+    if not reranked_items:
+        await prefetcher.close()
+        return [], 0, 0
+    
+    # Lấy ASINs từ recommendations
+    asins = [item.item_id for item in reranked_items]
+    logger.info(f"Fetching details for {len(asins)} items from database (anonymous user)")
+    
+    # Item details đã prefetch (song song với re-ranking) nếu được; không thì query như cũ
+    items = await prefetcher.get_items()
+    if items is None:
+        # Lấy item details từ database
+        items = []
         try:
-            # Chạy trong thread pool với timeout 90 giây
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                future = loop.run_in_executor(
-                    executor,
-                recommendation_service.generate_recommendations,
-                user_id_for_recall,
-                top_n,
-                user_reference_items if user_reference_items else user_reference_items_from_history,
-                1.5  # content_score_boost
-            )
-                reranked_items, recall_count, ranking_count = await asyncio.wait_for(
-                    future,
-                    timeout=90.0  # 90 giây timeout
-                )
-        except asyncio.TimeoutError:
-            logger.error(f"Recommendation generation timeout for user {current_user.id}")
-            raise HTTPException(
-                status_code=504,
-                detail="Recommendation generation timeout. Please try again."
-            )
+            items = await ItemService.get_items_by_asins(db, asins)
+            logger.info(f"Successfully fetched {len(items)} items from database")
         except Exception as e:
-            logger.error(f"Error generating recommendations: {e}", exc_info=True)
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to generate recommendations: {str(e)}"
-            )
+            logger.error(f"Error fetching items from database: {e}", exc_info=True)
+            try:
+                await db.rollback()
+            except Exception:
+                pass
+            items = []
         
-        logger.info(
-            f"Recommendation generation result: "
-            f"reranked_items={len(reranked_items)}, "
-            f"recall_count={recall_count}, "
-            f"ranking_count={ranking_count}"
+    if not items:
+        logger.warning(f"No items found in database for {len(asins)} ASINs")
+        return [], recall_count, ranking_count
+    
+    # Tạo mapping ASIN -> ItemResponse
+    item_map = {item.asin: item for item in items}
+    
+    # Tạo recommendations
+    recommendations = []
+    rank_counter = 1
+    for reranked_item in reranked_items:
+        item = item_map.get(reranked_item.item_id)
+        
+        if item:
+            recommendations.append(RecommendedItemResponse(
+                asin=item.asin,
+                title=item.title,
+                main_category=item.main_category,
+                avg_rating=item.avg_rating,
+                rating_number=item.rating_number,
+                primary_image=item.primary_image,
+                score=reranked_item.adjusted_score,
+                rank=rank_counter,
+                applied_rules=reranked_item.applied_rules
+            ))
+            rank_counter += 1
+            
+            if len(recommendations) >= top_n:
+                break
+    
+    return recommendations, recall_count, ranking_count
+
+
+async def _generate_user_recommendations(
+    db: AsyncSession,
+    recommendation_service,
+    current_user: UserResponse,
+    top_n: int
+) -> Tuple[List[RecommendedItemResponse], int, int]:
+    """
+    Recommendations cho user đã đăng nhập (full pipeline), chưa shuffle.
+    
+    Returns:
+        Tuple of (recommendations, recall_count, ranking_count)
+    """
+    # amazon_user_id (cần cho MF recall) đã được get_current_user lấy cùng user row
+    amazon_user_id = current_user.amazon_user_id or None
+    
+    # Nếu không có amazon_user_id, dùng user.id làm fallback (sẽ chỉ có Popularity recall)
+    user_id_for_recall = amazon_user_id if amazon_user_id else str(current_user.id)
+    logger.info(
+        f"User {current_user.id}: "
+        f"amazon_user_id={amazon_user_id}, "
+        f"using user_id_for_recall={user_id_for_recall}"
+    )
+    
+    # Lấy user history để recommend items tương tự
+    user_reference_items = []
+    try:
+        user_reference_items = await UserHistoryService.get_user_reference_items(
+            db=db,
+            user_id=current_user.id,
+            include_cart=True,
+            include_purchases=True,
+            include_views=False,  # Chỉ dùng cart và purchases
+            limit_per_source=10
         )
-        
-        if not reranked_items:
-            # Return empty recommendations
-            return RecommendResponse(
-                user_id=current_user.id,
-                recommendations=[],
-                total=0,
-                recall_count=0,
-                ranking_count=0
+        logger.info(f"User {current_user.id} has {len(user_reference_items)} reference items from history")
+    except Exception as e:
+        logger.warning(f"Error getting user history: {e}, continuing without history")
+        user_reference_items = []
+    
+    # Generate recommendations (vẫn có recommendations từ Popularity recall nếu không có history)
+    logger.info(f"Generating recommendations for user {current_user.id} (amazon_user_id: {user_id_for_recall})")
+    
+    # Chạy recommendation generation trong thread pool để không block event loop;
+    # item details được prefetch ngay sau ranking, song song với re-ranking
+    loop = asyncio.get_event_loop()
+    prefetcher = _ItemPrefetcher(db, loop)
+    
+    try:
+        # Chạy trong thread pool với timeout 90 giây
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            future = loop.run_in_executor(
+                executor,
+            functools.partial(recommendation_service.generate_recommendations, on_candidates=prefetcher),
+            user_id_for_recall,
+            top_n,
+            user_reference_items if user_reference_items else user_reference_items_from_history,
+            1.5  # content_score_boost
+        )
+            reranked_items, recall_count, ranking_count = await asyncio.wait_for(
+                future,
+                timeout=90.0  # 90 giây timeout
             )
-        
-        # Lấy ASINs từ recommendations
-        asins = [item.item_id for item in reranked_items]
-        logger.info(f"Fetching details for {len(asins)} items from database")
-        
+    except asyncio.TimeoutError:
+        await prefetcher.close()
+        logger.error(f"Recommendation generation timeout for user {current_user.id}")
+        raise HTTPException(
+            status_code=504,
+            detail="Recommendation generation timeout. Please try again."
+        )
+    except Exception as e:
+        await prefetcher.close()
+        logger.error(f"Error generating recommendations: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate recommendations: {str(e)}"
+        )
+    
+    logger.info(
+        f"Recommendation generation result: "
+        f"reranked_items={len(reranked_items)}, "
+        f"recall_count={recall_count}, "
+        f"ranking_count={ranking_count}"
+    )
+    
+    if not reranked_items:
+        # Return empty recommendations
+        await prefetcher.close()
+        return [], 0, 0
+    
+    # Lấy ASINs từ recommendations
+    asins = [item.item_id for item in reranked_items]
+    logger.info(f"Fetching details for {len(asins)} items from database")
+    
+    # Item details đã prefetch (song song với re-ranking) nếu được; không thì query như cũ
+    items = await prefetcher.get_items()
+    if items is None:
         # Lấy item details từ database với error handling
         items = []
         try:
@@ -416,56 +449,121 @@ async def get_recommendations(
                         pass
                     continue
         
-        if not items:
-            logger.warning(f"No items found in database for {len(asins)} ASINs. ASINs: {asins[:10]}")
-            return RecommendResponse(
-                user_id=current_user.id,
-                recommendations=[],
-                total=0,
-                recall_count=recall_count,
-                ranking_count=ranking_count
-            )
-        
-        # Tạo mapping ASIN -> ItemResponse
-        item_map = {item.asin: item for item in items}
-        
-        # Deduplication theo parent_asin ở API layer (để tránh recommend nhiều variants cùng sản phẩm)
-        seen_parent_asins = set()
-        recommendations = []
-        rank_counter = 1
-        
-        for reranked_item in reranked_items:
-            item = item_map.get(reranked_item.item_id)
+    if not items:
+        logger.warning(f"No items found in database for {len(asins)} ASINs. ASINs: {asins[:10]}")
+        return [], recall_count, ranking_count
+    
+    # Tạo mapping ASIN -> ItemResponse
+    item_map = {item.asin: item for item in items}
+    
+    # Deduplication theo parent_asin ở API layer (để tránh recommend nhiều variants cùng sản phẩm):
+    # giữ item đầu tiên (score cao nhất) của mỗi parent_asin, dừng khi đủ top_n
+    unique_items = {}  # parent_asin -> (ItemResponse, ReRankedItem), giữ thứ tự score
+    for reranked_item in reranked_items:
+        item = item_map.get(reranked_item.item_id)
+        if item is None:
+            continue
+        
+        parent_asin = item.parent_asin or item.asin
+        if parent_asin not in unique_items:
+            unique_items[parent_asin] = (item, reranked_item)
+            if len(unique_items) >= top_n:
+                break
+    
+    recommendations = [
+        RecommendedItemResponse(
+            asin=item.asin,
+            title=item.title,
+            main_category=item.main_category,
+            avg_rating=item.avg_rating,
+            rating_number=item.rating_number,
+            primary_image=item.primary_image,
+            score=reranked_item.adjusted_score,
+            rank=rank,
+            applied_rules=reranked_item.applied_rules
+        )
+        for rank, (item, reranked_item) in enumerate(unique_items.values(), start=1)
+    ]
+    
+    logger.info(
+        f"Generated {len(recommendations)} recommendations for user {current_user.id}: "
+        f"recall={recall_count}, ranking={ranking_count}, "
+        f"items_found={len(items)}/{len(asins)}"
+    )
+    
+    return recommendations, recall_count, ranking_count
+
+
+@router.get(
+    "",
+    response_model=RecommendResponse,
+    summary="Get recommendations for user",
+    description="""
+    Lấy recommendations cho user.
+    - Nếu đã đăng nhập: Sử dụng full pipeline (MF + Popularity + Content recall)
+    - Nếu chưa đăng nhập: Chỉ dùng Popularity recall (top popular items)
+    - Có thể randomize bằng seed parameter
+    - Tự động boost trending items dựa trên recent views
+    """
+)
+async def get_recommendations(
+    top_n: Optional[int] = Query(20, ge=1, le=100, description="Number of recommendations"),
+    seed: Optional[int] = Query(None, description="Random seed for shuffling (None = random each time)"),
+    current_user: Optional[UserResponse] = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Lấy recommendations cho user.
+    
+    Kết quả pipeline (trước khi shuffle) được cache trong Redis theo (user, top_n)
+    với TTL ngắn; cache của user bị xóa khi user có event hoặc đổi cart.
+    Shuffle + trending boost vẫn chạy mỗi request.
+    
+    Args:
+        top_n: Số lượng recommendations
+        current_user: Current user (optional, từ JWT token nếu có)
+        db: Database session
+    
+    Returns:
+        RecommendResponse
+    """
+    trending_task = None
+    try:
+        # Lấy trending items từ interaction_logs (dựa trên recent views) bằng session riêng,
+        # chạy song song với cache lookup / history / pipeline thay vì chặn trước chúng
+        trending_task = asyncio.create_task(_get_trending_items_with_own_session(hours=24, limit=100))
+        
+        redis_service = get_redis_context_service()
+        cache_scope = f"user:{current_user.id}" if current_user else "anonymous"
+        cached = redis_service.get_cached_recommendations(cache_scope, top_n)
+        
+        if cached is not None:
+            recommendations, recall_count, ranking_count = _recommendations_from_cache(cached)
+            logger.info(f"Recommendation cache hit: scope={cache_scope}, top_n={top_n}")
+        else:
+            # Get recommendation service
+            recommendation_service = get_recommendation_service(top_n=top_n)
             
-            if item:
-                # Check duplicate theo parent_asin
-                parent_asin = item.parent_asin or item.asin
-                
-                if parent_asin in seen_parent_asins:
-                    logger.debug(
-                        f"Skipping duplicate parent_asin: {parent_asin} "
-                        f"(asin: {item.asin}, score: {reranked_item.adjusted_score:.4f})"
-                    )
-                    continue
-                
-                seen_parent_asins.add(parent_asin)
-                
-                recommendations.append(RecommendedItemResponse(
-                    asin=item.asin,
-                    title=item.title,
-                    main_category=item.main_category,
-                    avg_rating=item.avg_rating,
-                    rating_number=item.rating_number,
-                    primary_image=item.primary_image,
-                    score=reranked_item.adjusted_score,
-                    rank=rank_counter,
-                    applied_rules=reranked_item.applied_rules
-                ))
-                rank_counter += 1
-                
-                # Giới hạn số lượng recommendations
-                if len(recommendations) >= top_n:
-                    break
+            if not current_user:
+                # Nếu chưa đăng nhập, chỉ dùng Popularity recall
+                logger.info("User not logged in, using popularity-only recommendations")
+                recommendations, recall_count, ranking_count = await _generate_anonymous_recommendations(
+                    db, recommendation_service, top_n
+                )
+            else:
+                # User đã đăng nhập - sử dụng full pipeline
+                recommendations, recall_count, ranking_count = await _generate_user_recommendations(
+                    db, recommendation_service, current_user, top_n
+                )
+            
+            if recommendations:
+                redis_service.set_cached_recommendations(
+                    cache_scope,
+                    top_n,
+                    _recommendations_to_cache(recommendations, recall_count, ranking_count)
+                )
+        
+        trending_scores = await trending_task
         
         # Shuffle recommendations dựa trên seed và trending scores
         recommendations = shuffle_recommendations(
@@ -479,26 +577,36 @@ async def get_recommendations(
             rec.rank = idx + 1
         
         logger.info(
-            f"Generated {len(recommendations)} recommendations for user {current_user.id}: "
-            f"recall={recall_count}, ranking={ranking_count}, "
-            f"items_found={len(items)}/{len(asins)}, "
-            f"seed={seed}, trending_items={len(trending_scores) if trending_scores else 0}"
+            f"Returning {len(recommendations)} recommendations ({cache_scope}, "
+            f"seed={seed}, trending_items={len(trending_scores) if trending_scores else 0})"
         )
         
         return RecommendResponse(
-            user_id=current_user.id,
+            user_id=current_user.id if current_user else 0,
             recommendations=recommendations,
             total=len(recommendations),
             recall_count=recall_count,
             ranking_count=ranking_count
         )
-        
+    
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating recommendations: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to generate recommendations: {str(e)}"
         )
+    finally:
+        # Request lỗi trước khi dùng trending: hủy task (đang giữ session riêng) và lấy kết quả
+        # để event loop không log "Task exception was never retrieved"
+        if trending_task is not None:
+            if not trending_task.done():
+                trending_task.cancel()
+            try:
+                await trending_task
+            except (asyncio.CancelledError, Exception):
+                pass
 
 
 @router.get(
@@ -529,6 +637,22 @@ async def get_similar_items(
         RecommendResponse
     """
     try:
+        # Anonymous user: kết quả chỉ phụ thuộc (asin, top_n) -> dùng chung cache Redis
+        # giữa mọi người xem cùng trang sản phẩm
+        redis_service = get_redis_context_service()
+        cache_scope = f"similar:{asin}" if not current_user else None
+        if cache_scope:
+            cached = redis_service.get_cached_recommendations(cache_scope, top_n)
+            if cached is not None:
+                recommendations, recall_count, ranking_count = _recommendations_from_cache(cached)
+                return RecommendResponse(
+                    user_id=0,
+                    recommendations=recommendations,
+                    total=len(recommendations),
+                    recall_count=recall_count,
+                    ranking_count=ranking_count
+                )
+        
         # Lấy thông tin item hiện tại
         item = await ItemService.get_item_by_asin(db, asin)
         if not item:
@@ -538,17 +662,26 @@ async def get_similar_items(
         recommendation_service = get_recommendation_service(top_n=top_n)
         
         # Generate recommendations CHỈ dựa trên Content-based recall (items tương tự)
-        # KHÔNG dùng MF recall và Popularity recall cho trang chi tiết
-        reranked_items, recall_count, ranking_count = recommendation_service.generate_recommendations(
-            user_id=str(current_user.id) if current_user else "0",
-            top_n=top_n,
-            reference_item_id=asin,  # Item hiện tại để tính similarity
-            content_score_boost=2.5,  # Boost mạnh cho product detail page
-            use_only_content_recall=True  # CHỈ dùng Content-based recall, không dùng MF/Popularity
-        )
+        # KHÔNG dùng MF recall và Popularity recall cho trang chi tiết.
+        # Chạy trong thread để không block event loop; item details prefetch sau ranking
+        prefetcher = _ItemPrefetcher(db, asyncio.get_running_loop())
+        try:
+            reranked_items, recall_count, ranking_count = await asyncio.to_thread(
+                recommendation_service.generate_recommendations,
+                user_id=str(current_user.id) if current_user else "0",
+                top_n=top_n,
+                reference_item_id=asin,  # Item hiện tại để tính similarity
+                content_score_boost=2.5,  # Boost mạnh cho product detail page
+                use_only_content_recall=True,  # CHỈ dùng Content-based recall, không dùng MF/Popularity
+                on_candidates=prefetcher
+            )
+        except Exception:
+            await prefetcher.close()
+            raise
         
         if not reranked_items:
-            # Fallback: tìm items cùng category nếu không có recommendations
+            await prefetcher.close()
+# Fallback: tìm items cùng category nếu không có recommendations
             target_category = item.category or item.main_category
             if target_category:
                 similar_items, total = await ItemService.search_items(
@@ -592,8 +725,10 @@ async def get_similar_items(
         # Lấy ASINs từ recommendations
         asins = [item.item_id for item in reranked_items]
         
-        # Lấy item details từ database
-        items = await ItemService.get_items_by_asins(db, asins)
+        # Lấy item details: dùng kết quả prefetch nếu có, không thì query database
+        items = await prefetcher.get_items()
+        if items is None:
+            items = await ItemService.get_items_by_asins(db, asins)
         
         # Tạo mapping ASIN -> ItemResponse
         item_map = {item.asin: item for item in items}
@@ -621,6 +756,13 @@ async def get_similar_items(
             f"using content-based recommendations"
         )
         
+        if cache_scope and recommendations:
+            redis_service.set_cached_recommendations(
+                cache_scope,
+                top_n,
+                _recommendations_to_cache(recommendations, recall_count, ranking_count)
+            )
+        
         return RecommendResponse(
             user_id=current_user.id if current_user else 0,
             recommendations=recommendations,
@@ -667,13 +809,21 @@ async def get_recommendations_for_user(
         # Get recommendation service
         recommendation_service = get_recommendation_service(top_n=top_n)
         
-        # Generate recommendations
-        reranked_items, recall_count, ranking_count = recommendation_service.generate_recommendations(
-            user_id=str(user_id),
-            top_n=top_n
-        )
+        # Generate recommendations trong thread; item details prefetch ngay sau ranking
+        prefetcher = _ItemPrefetcher(db, asyncio.get_running_loop())
+        try:
+            reranked_items, recall_count, ranking_count = await asyncio.to_thread(
+                recommendation_service.generate_recommendations,
+                user_id=str(user_id),
+                top_n=top_n,
+                on_candidates=prefetcher
+            )
+        except Exception:
+            await prefetcher.close()
+            raise
         
         if not reranked_items:
+            await prefetcher.close()
             return RecommendResponse(
                 user_id=user_id,
                 recommendations=[],
@@ -685,8 +835,10 @@ async def get_recommendations_for_user(
         # Lấy ASINs từ recommendations
         asins = [item.item_id for item in reranked_items]
         
-        # Lấy item details từ database
-        items = await ItemService.get_items_by_asins(db, asins)
+        # Lấy item details: dùng kết quả prefetch nếu có, không thì query database
+        items = await prefetcher.get_items()
+        if items is None:
+            items = await ItemService.get_items_by_asins(db, asins)
         
         # Tạo mapping ASIN -> ItemResponse
         item_map = {item.asin: item for item in items}
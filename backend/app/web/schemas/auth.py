@@ -34,6 +34,8 @@ class UserResponse(BaseModel):
     phone_number: Optional[str] = None
     created_at: datetime
     last_login: Optional[datetime] = None
+    # Lấy kèm khi xác thực request (cho MF recall), không trả ra trong response
+    amazon_user_id: Optional[str] = Field(None, exclude=True)
     
     class Config:
         from_attributes = True
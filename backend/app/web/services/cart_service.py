@@ -12,82 +12,98 @@ class CartService:
     """Service xử lý shopping cart."""
     
     @staticmethod
-    async def get_or_create_cart(
+    async def _get_active_cart_row(
         db: AsyncSession,
         user_id: int
-    ) -> int:
+    ):
         """
-        Lấy hoặc tạo active cart cho user.
+        Lấy active cart (id, user_id, status, created_at) của user.
         
         Args:
             db: Database session
             user_id: User ID
             
         Returns:
-            Cart ID
+            Row của cart hoặc None nếu không có cart
         """
-        # Tìm active cart
         result = await db.execute(
             text("""
-                SELECT id FROM shopping_carts
+                SELECT id, user_id, status, created_at
+                FROM shopping_carts
                 WHERE user_id = :user_id AND status = 'active'
                 ORDER BY created_at DESC
                 LIMIT 1
             """),
             {"user_id": user_id}
         )
+        return result.fetchone()
+    
+    @staticmethod
+    async def _get_or_create_cart_row(
+        db: AsyncSession,
+        user_id: int
+    ):
+        """
+        Lấy hoặc tạo active cart cho user, trả về row (id, user_id, status, created_at).
         
-        cart_row = result.fetchone()
+        Args:
+            db: Database session
+            user_id: User ID
+            
+        Returns:
+            Row của cart
+        """
+        cart_row = await CartService._get_active_cart_row(db, user_id)
         
         if cart_row:
-            return cart_row.id
+            return cart_row
         
         # Tạo cart mới
         result = await db.execute(
             text("""
                 INSERT INTO shopping_carts (user_id, status)
                 VALUES (:user_id, 'active')
-                RETURNING id
+                RETURNING id, user_id, status, created_at
             """),
             {"user_id": user_id}
         )
         await db.commit()
         
-        cart_row = result.fetchone()
-        return cart_row.id
+        return result.fetchone()
     
     @staticmethod
-    async def get_cart(
+    async def get_or_create_cart(
         db: AsyncSession,
         user_id: int
-    ) -> Optional[CartResponse]:
+    ) -> int:
         """
-        Lấy cart với tất cả items và thông tin product.
+        Lấy hoặc tạo active cart cho user.
         
         Args:
             db: Database session
             user_id: User ID
             
         Returns:
-            CartResponse hoặc None nếu không có cart
+            Cart ID
         """
-        # Lấy cart
-        result = await db.execute(
-            text("""
-                SELECT id, user_id, status, created_at
-                FROM shopping_carts
-                WHERE user_id = :user_id AND status = 'active'
-                ORDER BY created_at DESC
-                LIMIT 1
-            """),
-            {"user_id": user_id}
-        )
-        
-        cart_row = result.fetchone()
-        
-        if not cart_row:
-            return None
+        cart_row = await CartService._get_or_create_cart_row(db, user_id)
+        return cart_row.id
+    
+    @staticmethod
+    async def _build_cart_response(
+        db: AsyncSession,
+        cart_row
+    ) -> CartResponse:
+        """
+        Tạo CartResponse từ cart row đã có (chỉ query cart items).
         
+        Args:
+            db: Database session
+            cart_row: Row (id, user_id, status, created_at) của cart
+            
+        Returns:
+            CartResponse
+        """
         cart_id = cart_row.id
         
         # Lấy cart items với product info
@@ -131,12 +147,34 @@ class CartService:
             total_items=total_items
         )
     
+    @staticmethod
+    async def get_cart(
+        db: AsyncSession,
+        user_id: int
+    ) -> Optional[CartResponse]:
+        """
+        Lấy cart với tất cả items và thông tin product.
+        
+        Args:
+            db: Database session
+            user_id: User ID
+            
+        Returns:
+            CartResponse hoặc None nếu không có cart
+        """
+        cart_row = await CartService._get_active_cart_row(db, user_id)
+        
+        if not cart_row:
+            return None
+        
+        return await CartService._build_cart_response(db, cart_row)
+    
     @staticmethod
     async def add_item(
         db: AsyncSession,
         user_id: int,
         item_data: AddToCartRequest
-    ) -> tuple[bool, Optional[str]]:
+    ) -> tuple[Optional[CartResponse], Optional[str]]:
         """
         Thêm item vào cart hoặc tăng quantity nếu đã có.
         
@@ -146,7 +184,7 @@ class CartService:
             item_data: Thông tin item cần thêm
             
         Returns:
-            Tuple (success, error_message)
+            Tuple (cart sau khi thêm, error_message)
         """
         # Kiểm tra item có tồn tại không
         result = await db.execute(
@@ -155,53 +193,28 @@ class CartService:
         )
         
         if not result.fetchone():
-            return False, "Item không tồn tại"
+            return None, "Item không tồn tại"
         
         # Lấy hoặc tạo cart
-        cart_id = await CartService.get_or_create_cart(db, user_id)
+        cart_row = await CartService._get_or_create_cart_row(db, user_id)
         
-        # Kiểm tra item đã có trong cart chưa
-        result = await db.execute(
+        # Thêm item mới hoặc tăng quantity nếu đã có (PRIMARY KEY (cart_id, asin))
+        await db.execute(
             text("""
-                SELECT quantity FROM cart_items
-                WHERE cart_id = :cart_id AND asin = :asin
+                INSERT INTO cart_items (cart_id, asin, quantity)
+                VALUES (:cart_id, :asin, :quantity)
+                ON CONFLICT (cart_id, asin)
+                DO UPDATE SET quantity = cart_items.quantity + EXCLUDED.quantity
             """),
-            {"cart_id": cart_id, "asin": item_data.asin}
+            {
+                "cart_id": cart_row.id,
+                "asin": item_data.asin,
+                "quantity": item_data.quantity
+            }
         )
         
-        existing_item = result.fetchone()
-        
-        if existing_item:
-            # Cập nhật quantity
-            new_quantity = existing_item.quantity + item_data.quantity
-            await db.execute(
-                text("""
-                    UPDATE cart_items
-                    SET quantity = :quantity
-                    WHERE cart_id = :cart_id AND asin = :asin
-                """),
-                {
-                    "cart_id": cart_id,
-                    "asin": item_data.asin,
-                    "quantity": new_quantity
-                }
-            )
-        else:
-            # Thêm item mới
-            await db.execute(
-                text("""
-                    INSERT INTO cart_items (cart_id, asin, quantity)
-                    VALUES (:cart_id, :asin, :quantity)
-                """),
-                {
-                    "cart_id": cart_id,
-                    "asin": item_data.asin,
-                    "quantity": item_data.quantity
-                }
-            )
-        
         await db.commit()
-        return True, None
+        return await CartService._build_cart_response(db, cart_row), None
     
     @staticmethod
     async def update_item(
@@ -209,7 +222,7 @@ class CartService:
         user_id: int,
         asin: str,
         item_data: UpdateCartItemRequest
-    ) -> tuple[bool, Optional[str]]:
+    ) -> tuple[Optional[CartResponse], Optional[str]]:
         """
         Cập nhật quantity của item trong cart.
         
@@ -220,61 +233,41 @@ class CartService:
             item_data: Thông tin cập nhật
             
         Returns:
-            Tuple (success, error_message)
+            Tuple (cart sau khi cập nhật, error_message)
         """
         # Lấy cart
-        result = await db.execute(
-            text("""
-                SELECT id FROM shopping_carts
-                WHERE user_id = :user_id AND status = 'active'
-                ORDER BY created_at DESC
-                LIMIT 1
-            """),
-            {"user_id": user_id}
-        )
-        
-        cart_row = result.fetchone()
+        cart_row = await CartService._get_active_cart_row(db, user_id)
         
         if not cart_row:
-            return False, "Cart không tồn tại"
-        
-        cart_id = cart_row.id
+            return None, "Cart không tồn tại"
         
-        # Kiểm tra item có trong cart không
+        # Cập nhật quantity (không có dòng nào được update = item không có trong cart)
         result = await db.execute(
-            text("""
-                SELECT quantity FROM cart_items
-                WHERE cart_id = :cart_id AND asin = :asin
-            """),
-            {"cart_id": cart_id, "asin": asin}
-        )
-        
-        if not result.fetchone():
-            return False, "Item không có trong cart"
-        
-        # Cập nhật quantity
-        await db.execute(
             text("""
                 UPDATE cart_items
                 SET quantity = :quantity
                 WHERE cart_id = :cart_id AND asin = :asin
             """),
             {
-                "cart_id": cart_id,
+                "cart_id": cart_row.id,
                 "asin": asin,
                 "quantity": item_data.quantity
             }
         )
         
+        if result.rowcount == 0:
+            await db.rollback()
+            return None, "Item không có trong cart"
+        
         await db.commit()
-        return True, None
+        return await CartService._build_cart_response(db, cart_row), None
     
     @staticmethod
     async def remove_item(
         db: AsyncSession,
         user_id: int,
         asin: str
-    ) -> tuple[bool, Optional[str]]:
+    ) -> tuple[Optional[CartResponse], Optional[str]]:
         """
         Xóa item khỏi cart.
         
@@ -284,25 +277,13 @@ class CartService:
             asin: Item ASIN
             
         Returns:
-            Tuple (success, error_message)
+            Tuple (cart sau khi xóa, error_message)
         """
         # Lấy cart
-        result = await db.execute(
-            text("""
-                SELECT id FROM shopping_carts
-                WHERE user_id = :user_id AND status = 'active'
-                ORDER BY created_at DESC
-                LIMIT 1
-            """),
-            {"user_id": user_id}
-        )
-        
-        cart_row = result.fetchone()
+        cart_row = await CartService._get_active_cart_row(db, user_id)
         
         if not cart_row:
-            return False, "Cart không tồn tại"
-        
-        cart_id = cart_row.id
+            return None, "Cart không tồn tại"
         
         # Xóa item
         result = await db.execute(
@@ -310,21 +291,21 @@ class CartService:
                 DELETE FROM cart_items
                 WHERE cart_id = :cart_id AND asin = :asin
             """),
-            {"cart_id": cart_id, "asin": asin}
+            {"cart_id": cart_row.id, "asin": asin}
         )
         
         await db.commit()
         
         if result.rowcount == 0:
-            return False, "Item không có trong cart"
+            return None, "Item không có trong cart"
         
-        return True, None
+        return await CartService._build_cart_response(db, cart_row), None
     
     @staticmethod
     async def clear_cart(
         db: AsyncSession,
         user_id: int
-    ) -> tuple[bool, Optional[str]]:
+    ) -> tuple[Optional[CartResponse], Optional[str]]:
         """
         Xóa tất cả items khỏi cart.
         
@@ -333,32 +314,29 @@ class CartService:
             user_id: User ID
             
         Returns:
-            Tuple (success, error_message)
+            Tuple (cart rỗng sau khi xóa, error_message)
         """
         # Lấy cart
-        result = await db.execute(
-            text("""
-                SELECT id FROM shopping_carts
-                WHERE user_id = :user_id AND status = 'active'
-                ORDER BY created_at DESC
-                LIMIT 1
-            """),
-            {"user_id": user_id}
-        )
-        
-        cart_row = result.fetchone()
+        cart_row = await CartService._get_active_cart_row(db, user_id)
         
         if not cart_row:
-            return False, "Cart không tồn tại"
-        
-        cart_id = cart_row.id
+            return None, "Cart không tồn tại"
         
         # Xóa tất cả items
         await db.execute(
             text("DELETE FROM cart_items WHERE cart_id = :cart_id"),
-            {"cart_id": cart_id}
+            {"cart_id": cart_row.id}
         )
         
         await db.commit()
-        return True, None
+        
+        # Cart đã rỗng -> không cần query lại items
+        return CartResponse(
+            cart_id=cart_row.id,
+            user_id=cart_row.user_id,
+            status=cart_row.status,
+            created_at=cart_row.created_at,
+            items=[],
+            total_items=0
+        ), None
 
@@ -3,12 +3,12 @@ Event Logging Service
 =====================
 
 Async worker service để ghi interaction_logs vào PostgreSQL (LONG-TERM).
-Service này chạy trong background task, KHÔNG block request.
+Service này chạy trong event worker (routes/event.py), KHÔNG block request.
 """
 
 import json
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -21,7 +21,7 @@ class EventLoggingService:
     """
     Service để ghi interaction logs vào PostgreSQL.
     
-    Chạy trong background task, có retry đơn giản nếu insert fail.
+    Chạy trong event worker, ghi theo batch; có retry đơn giản nếu insert fail.
     """
     
     @staticmethod
@@ -106,61 +106,95 @@ class EventLoggingService:
         return False
     
     @staticmethod
-    async def get_item_category(
+    async def log_interactions_batch(
         db: AsyncSession,
-        asin: str
-    ) -> Optional[str]:
+        interaction_logs: List[InteractionLog]
+    ) -> int:
         """
-        Lấy category của item từ database.
+        Ghi nhiều interaction logs vào PostgreSQL trong một transaction
+        (executemany + một lần commit thay vì commit từng event).
+        
+        Nếu batch fail (ví dụ một asin vi phạm foreign key), rollback rồi ghi
+        lại từng event bằng log_interaction để không mất các event hợp lệ.
         
         Args:
             db: Database session
-            asin: Item ASIN
+            interaction_logs: Danh sách InteractionLog
             
         Returns:
-            Category string hoặc None
+            Số event ghi thành công
         """
+        if not interaction_logs:
+            return 0
+        
+        params = [
+            {
+                "user_id": interaction_log.user_id,
+                "asin": interaction_log.asin,
+                "event_type": interaction_log.event_type.value,
+                "metadata": json.dumps(interaction_log.metadata) if interaction_log.metadata else None
+            }
+            for interaction_log in interaction_logs
+        ]
+        
         try:
-            result = await db.execute(
+            await db.execute(
                 text("""
-                    SELECT p.main_category
-                    FROM items i
-                    JOIN products p ON i.parent_asin = p.parent_asin
-                    WHERE i.asin = :asin
-                    LIMIT 1
+                    INSERT INTO interaction_logs (
+                        user_id,
+                        asin,
+                        event_type,
+                        ts,
+                        metadata
+                    ) VALUES (
+                        :user_id,
+                        :asin,
+                        CAST(:event_type AS event_type_enum),
+                        NOW(),
+                        CAST(:metadata AS jsonb)
+                    )
                 """),
-                {"asin": asin}
+                params
             )
+            await db.commit()
             
-            row = result.fetchone()
-            if row and row.main_category:
-                return row.main_category
-            
-            return None
+            logger.debug(f"Logged {len(interaction_logs)} interactions in one batch")
+            return len(interaction_logs)
             
         except Exception as e:
-            logger.warning(f"Failed to get item category for {asin}: {e}")
-            return None
+            await db.rollback()
+            logger.warning(
+                f"Failed to log batch of {len(interaction_logs)} interactions: {e}. "
+                f"Fallback ghi từng event"
+            )
+        
+        success_count = 0
+        for interaction_log in interaction_logs:
+            if await EventLoggingService.log_interaction(db, interaction_log, max_retries=1):
+                success_count += 1
+        
+        return success_count
     
     @staticmethod
-    async def get_item_brand(
+    async def get_item_meta(
         db: AsyncSession,
         asin: str
-    ) -> Optional[str]:
+    ) -> Tuple[Optional[str], Optional[str]]:
         """
-        Lấy brand của item từ database (từ raw_metadata).
+        Lấy category và brand của item từ database trong một query
+        (brand lấy từ raw_metadata).
         
         Args:
             db: Database session
             asin: Item ASIN
             
         Returns:
-            Brand string hoặc None
+            (category, brand), mỗi giá trị có thể None
         """
         try:
             result = await db.execute(
                 text("""
-                    SELECT p.raw_metadata
+                    SELECT p.main_category, p.raw_metadata
                     FROM items i
                     JOIN products p ON i.parent_asin = p.parent_asin
                     WHERE i.asin = :asin
@@ -170,26 +204,31 @@ class EventLoggingService:
             )
             
             row = result.fetchone()
-            if row and row.raw_metadata:
-                # Parse JSONB để lấy brand
-                import json
-                metadata = row.raw_metadata
-                if isinstance(metadata, dict):
-                    brand = metadata.get("brand") or metadata.get("Brand")
-                    if brand:
-                        return str(brand)
-                elif isinstance(metadata, str):
-                    try:
-                        metadata_dict = json.loads(metadata)
-                        brand = metadata_dict.get("brand") or metadata_dict.get("Brand")
-                        if brand:
-                            return str(brand)
-                    except:
-                        pass
+            if not row:
+                return None, None
             
-            return None
+            return row.main_category or None, EventLoggingService._extract_brand(row.raw_metadata)
             
         except Exception as e:
-            logger.warning(f"Failed to get item brand for {asin}: {e}")
+            logger.warning(f"Failed to get item meta for {asin}: {e}")
+            return None, None
+    
+    @staticmethod
+    def _extract_brand(raw_metadata: Any) -> Optional[str]:
+        """Lấy brand từ products.raw_metadata (JSONB dạng dict hoặc string)."""
+        if not raw_metadata:
             return None
-
+        
+        metadata = raw_metadata
+        if isinstance(metadata, str):
+            try:
+                metadata = json.loads(metadata)
+            except (ValueError, TypeError):
+                return None
+        
+        if isinstance(metadata, dict):
+            brand = metadata.get("brand") or metadata.get("Brand")
+            if brand:
+                return str(brand)
+        
+        return None
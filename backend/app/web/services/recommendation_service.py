@@ -8,7 +8,7 @@ Recall -> Ranking -> Re-ranking
 
 import logging
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Any, Callable, Dict, List, Optional
 import numpy as np
 
 from app.recommender.recall_service import RecallService
@@ -85,7 +85,8 @@ class RecommendationService:
         reference_item_id: Optional[str] = None,
         user_reference_items: Optional[List[str]] = None,
         content_score_boost: float = 1.0,
-        use_only_content_recall: bool = False
+        use_only_content_recall: bool = False,
+        on_candidates: Optional[Callable[[List[str]], None]] = None
     ) -> tuple[List[ReRankedItem], int, int]:
         """
         Generate recommendations cho user.
@@ -97,6 +98,8 @@ class RecommendationService:
             user_reference_items: List of item IDs từ user history (cart, purchases, views)
             content_score_boost: Multiplier để boost content_score (default: 1.0, tăng lên 2.0-3.0 cho product detail)
             use_only_content_recall: Nếu True, chỉ dùng Content-based recall (cho product detail page, không dùng MF/Popularity)
+            on_candidates: Callback nhận item IDs của shortlist ngay sau bước ranking (ví dụ để route
+                prefetch item details từ database trong lúc re-ranking chạy)
             
         Returns:
             Tuple of (recommendations, recall_count, ranking_count)
@@ -297,6 +300,14 @@ class RecommendationService:
             ranking_count = len(ranked_items)
             logger.info(f"Error fallback ranking: {ranking_count} items")
         
+        # Báo shortlist cho caller trước khi re-ranking: kết quả cuối là tập con của ranked_items
+        # (không để lỗi callback làm hỏng pipeline)
+        if on_candidates is not None:
+            try:
+                on_candidates([item.item_id for item in ranked_items])
+            except Exception as e:
+                logger.warning(f"on_candidates callback failed: {e}")
+        
         # Step 3: Re-ranking
         try:
             reranked_items = self.reranking_service.rerank_items(
@@ -7,13 +7,22 @@ Redis chỉ giữ short-term state (TTL 10-30 phút).
 PostgreSQL là source of truth cho interaction history.
 """
 
+import json
 import logging
 import time
 import redis
-from typing import Optional, Dict
+from collections import OrderedDict
+from typing import Any, Optional, Dict, Tuple
+
+from app.config import settings
+from app.web.schemas.event import InteractionLog
 
 logger = logging.getLogger(__name__)
 
+# Redis Stream chứa interaction logs chờ ghi PostgreSQL
+EVENTS_STREAM_KEY = "events"
+EVENTS_STREAM_MAXLEN = 1_000_000  # Giới hạn (xấp xỉ) độ dài stream nếu worker dừng lâu
+
 
 class RedisContextService:
     """
@@ -23,6 +32,10 @@ class RedisContextService:
     - user:{user_id}:recent_items (List)
     - user:{user_id}:recent_categories (Hash)
     - user:{user_id}:last_active (String)
+    - item:{asin}:meta (Hash: category, brand) - cache metadata item, TTL 24h
+    - events (Stream) - interaction logs chờ event worker ghi PostgreSQL
+    - rec:{scope}:{top_n} (String: JSON) - cache kết quả recommendation, TTL ngắn
+    - rec:{scope}:top_ns (Set) - các top_n đang cache của scope, để invalidate bằng DEL
     """
     
     def __init__(
@@ -30,7 +43,12 @@ class RedisContextService:
         redis_host: str = "localhost",
         redis_port: int = 6379,
         redis_db: int = 0,
-        ttl_seconds: int = 900  # 15 phút
+        redis_url: Optional[str] = None,
+        ttl_seconds: int = 900,  # 15 phút
+        item_meta_ttl_seconds: int = 86400,  # 24h, metadata item gần như không đổi
+        item_meta_local_ttl_seconds: int = 300,  # 5 phút, cache trong process trước Redis
+        item_meta_local_max_entries: int = 10000,
+        recommendation_ttl_seconds: int = 60  # Cache recommendation ngắn, xóa khi user có event/cart mới
     ):
         """
         Khởi tạo RedisContextService.
@@ -39,15 +57,31 @@ class RedisContextService:
             redis_host: Redis host
             redis_port: Redis port
             redis_db: Redis database number
+            redis_url: Redis URL (default: settings.redis_url); nếu có thì bỏ qua host/port/db
             ttl_seconds: TTL cho các keys (default: 900 = 15 phút)
+            item_meta_ttl_seconds: TTL cho cache item:{asin}:meta (default: 86400 = 24h)
+            item_meta_local_ttl_seconds: TTL cache item meta trong process (default: 300 = 5 phút)
+            item_meta_local_max_entries: Số ASIN tối đa giữ trong cache trong process
+            recommendation_ttl_seconds: TTL cache kết quả recommendation (default: 60 giây)
         """
-        self.redis_client = redis.Redis(
-            host=redis_host,
-            port=redis_port,
-            db=redis_db,
-            decode_responses=True
-        )
+        redis_url = redis_url or settings.redis_url
+        if redis_url:
+            # REDIS_URL (Redis dùng chung khi deploy, cùng instance với event worker)
+            self.redis_client = redis.Redis.from_url(redis_url, decode_responses=True)
+        else:
+            self.redis_client = redis.Redis(
+                host=redis_host,
+                port=redis_port,
+                db=redis_db,
+                decode_responses=True
+            )
         self.ttl_seconds = ttl_seconds
+        self.item_meta_ttl_seconds = item_meta_ttl_seconds
+        self.item_meta_local_ttl_seconds = item_meta_local_ttl_seconds
+        self.item_meta_local_max_entries = item_meta_local_max_entries
+        self.recommendation_ttl_seconds = recommendation_ttl_seconds
+        # asin -> (expire_at, (category, brand)); sản phẩm hot (flash sale) không phải gọi Redis mỗi event
+        self._item_meta_local: "OrderedDict[str, Tuple[float, Tuple[Optional[str], Optional[str]]]]" = OrderedDict()
         
         logger.info(
             f"RedisContextService initialized: "
@@ -114,6 +148,169 @@ class RedisContextService:
             logger.error(f"Unexpected error updating Redis context: {e}")
             return False
     
+    def _remember_item_meta(self, asin: str, item_meta: Tuple[Optional[str], Optional[str]]) -> None:
+        """Ghi item meta vào cache trong process (bỏ entry cũ nhất khi đầy)."""
+        self._item_meta_local[asin] = (time.monotonic() + self.item_meta_local_ttl_seconds, item_meta)
+        self._item_meta_local.move_to_end(asin)
+        while len(self._item_meta_local) > self.item_meta_local_max_entries:
+            self._item_meta_local.popitem(last=False)
+    
+    def get_item_meta(self, asin: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """
+        Lấy category và brand của item: cache trong process (TTL 5 phút),
+        rồi tới cache Redis (HMGET item:{asin}:meta).
+        
+        Args:
+            asin: Item ASIN
+            
+        Returns:
+            (category, brand) nếu cache hit (giá trị rỗng -> None),
+            None nếu cache miss hoặc Redis lỗi
+        """
+        local = self._item_meta_local.get(asin)
+        if local is not None and local[0] > time.monotonic():
+            return local[1]
+        
+        try:
+            key = f"item:{asin}:meta"
+            category, brand = self.redis_client.hmget(key, "category", "brand")
+            if category is None and brand is None:
+                return None
+            item_meta = (category or None, brand or None)
+            self._remember_item_meta(asin, item_meta)
+            return item_meta
+        except Exception as e:
+            logger.warning(f"Failed to get item meta for {asin}: {e}")
+            return None
+    
+    def set_item_meta(
+        self,
+        asin: str,
+        category: Optional[str] = None,
+        brand: Optional[str] = None
+    ) -> bool:
+        """
+        Ghi category và brand của item vào cache Redis (HSET + EXPIRE 24h).
+        
+        Giá trị None được lưu thành chuỗi rỗng để item chỉ có category
+        (hoặc chỉ có brand) vẫn được cache.
+        
+        Args:
+            asin: Item ASIN
+            category: Item category (optional)
+            brand: Item brand (optional)
+            
+        Returns:
+            True nếu thành công, False nếu có lỗi
+        """
+        self._remember_item_meta(asin, (category, brand))
+        
+        try:
+            key = f"item:{asin}:meta"
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.hset(key, mapping={"category": category or "", "brand": brand or ""})
+            pipe.expire(key, self.item_meta_ttl_seconds)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to set item meta for {asin}: {e}")
+            return False
+    
+    def publish_event(self, interaction_log: InteractionLog) -> bool:
+        """
+        Đẩy interaction log vào Redis Stream (XADD events *).
+        
+        Event worker (backend/scripts/event_worker.py) đọc stream bằng consumer group
+        và ghi PostgreSQL theo batch, tách hẳn khỏi process API.
+        
+        Args:
+            interaction_log: InteractionLog object
+            
+        Returns:
+            True nếu thành công, False nếu có lỗi (caller tự fallback)
+        """
+        try:
+            self.redis_client.xadd(
+                EVENTS_STREAM_KEY,
+                {
+                    "user_id": str(interaction_log.user_id),
+                    "asin": interaction_log.asin,
+                    "event_type": interaction_log.event_type.value,
+                    "metadata": json.dumps(interaction_log.metadata) if interaction_log.metadata else ""
+                },
+                maxlen=EVENTS_STREAM_MAXLEN,
+                approximate=True
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to publish event to Redis stream: {e}")
+            return False
+    
+    def get_cached_recommendations(self, scope: str, top_n: int) -> Optional[Dict[str, Any]]:
+        """
+        Lấy kết quả recommendation đã cache (GET rec:{scope}:{top_n}).
+        
+        Args:
+            scope: Phạm vi cache, ví dụ "user:{user_id}", "anonymous", "similar:{asin}"
+            top_n: Số lượng recommendations
+            
+        Returns:
+            Dict payload đã cache, None nếu cache miss hoặc Redis lỗi
+        """
+        try:
+            cached = self.redis_client.get(f"rec:{scope}:{top_n}")
+            return json.loads(cached) if cached else None
+        except Exception as e:
+            logger.warning(f"Failed to get cached recommendations for {scope}: {e}")
+            return None
+    
+    def set_cached_recommendations(self, scope: str, top_n: int, payload: Dict[str, Any]) -> bool:
+        """
+        Cache kết quả recommendation (SETEX rec:{scope}:{top_n}).
+        
+        Mỗi (scope, top_n) là một key riêng với TTL riêng, nên cache của scope
+        không bao giờ bị invalidate (anonymous, similar:{asin}) vẫn hết hạn đúng TTL.
+        
+        Args:
+            scope: Phạm vi cache (xem get_cached_recommendations)
+            top_n: Số lượng recommendations
+            payload: Dict JSON-serializable
+            
+        Returns:
+            True nếu thành công, False nếu có lỗi
+        """
+        try:
+            index_key = f"rec:{scope}:top_ns"
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.setex(f"rec:{scope}:{top_n}", self.recommendation_ttl_seconds, json.dumps(payload))
+            pipe.sadd(index_key, top_n)
+            pipe.expire(index_key, self.recommendation_ttl_seconds)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to cache recommendations for {scope}: {e}")
+            return False
+    
+    def invalidate_user_recommendations(self, user_id: int) -> bool:
+        """
+        Xóa cache recommendation của user (gọi khi user có event hoặc đổi cart):
+        DEL các key rec:user:{user_id}:{top_n} có trong index rec:user:{user_id}:top_ns.
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            True nếu thành công, False nếu có lỗi
+        """
+        try:
+            index_key = f"rec:user:{user_id}:top_ns"
+            top_ns = self.redis_client.smembers(index_key)
+            self.redis_client.delete(index_key, *(f"rec:user:{user_id}:{top_n}" for top_n in top_ns))
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to invalidate recommendations for user {user_id}: {e}")
+            return False
+    
     def get_recent_items(self, user_id: int) -> list[str]:
         """
         Lấy danh sách recent items từ Redis.
@@ -11,6 +11,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 import redis
 
+from app.config import settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,7 +26,8 @@ class UserInteractionService:
         redis_client: Optional[redis.Redis] = None,
         redis_host: str = "localhost",
         redis_port: int = 6379,
-        redis_db: int = 0
+        redis_db: int = 0,
+        redis_url: Optional[str] = None
     ):
         """
         Khởi tạo UserInteractionService.
@@ -34,9 +37,13 @@ class UserInteractionService:
             redis_host: Redis host
             redis_port: Redis port
             redis_db: Redis database number
+            redis_url: Redis URL (default: settings.redis_url); nếu có thì bỏ qua host/port/db
         """
+        redis_url = redis_url or settings.redis_url
         if redis_client:
             self.redis_client = redis_client
+        elif redis_url:
+            self.redis_client = redis.Redis.from_url(redis_url, decode_responses=True)
         else:
             self.redis_client = redis.Redis(
                 host=redis_host,
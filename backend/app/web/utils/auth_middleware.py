@@ -49,10 +49,10 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Lấy user từ database
+    # Lấy user từ database (kèm amazon_user_id để route recommend không phải query lại)
     result = await db.execute(
         text("""
-            SELECT id, username, phone_number, created_at, last_login
+            SELECT id, username, phone_number, created_at, last_login, amazon_user_id
             FROM users
             WHERE id = :user_id
         """),
@@ -73,7 +73,8 @@ async def get_current_user(
         username=user_row.username,
         phone_number=user_row.phone_number,
         created_at=user_row.created_at,
-        last_login=user_row.last_login
+        last_login=user_row.last_login,
+        amazon_user_id=user_row.amazon_user_id
     )
 
 
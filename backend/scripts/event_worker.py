@@ -0,0 +1,151 @@
+"""
+Event Worker
+============
+
+Process riêng đọc interaction logs từ Redis Stream (key "events", do
+POST /api/event đẩy vào bằng XADD) và ghi vào PostgreSQL theo batch.
+
+- Dùng consumer group nên có thể chạy nhiều worker song song (EVENT_WORKER_NAME khác nhau)
+- Chỉ XACK sau khi đã ghi PostgreSQL; nếu worker chết giữa chừng, các event
+  chưa ACK được xử lý lại khi worker khởi động lại
+
+Usage:
+    python backend/scripts/event_worker.py
+"""
+
+import sys
+import os
+import json
+import socket
+import asyncio
+import logging
+from pathlib import Path
+
+import redis
+import redis.asyncio as aioredis
+
+# Thêm backend vào path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from app.config import settings
+from app.web.schemas.event import EventType, InteractionLog
+from app.web.services.event_logging_service import EventLoggingService
+from app.web.services.redis_context_service import EVENTS_STREAM_KEY
+from app.web.utils.database import AsyncSessionLocal
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger("event_worker")
+
+CONSUMER_GROUP = "pg_writers"
+# Tên consumer cố định theo host để sau khi restart đọc lại đúng các event pending của mình;
+# chạy nhiều worker trên cùng host thì đặt EVENT_WORKER_NAME khác nhau
+CONSUMER_NAME = os.getenv("EVENT_WORKER_NAME", socket.gethostname())
+BATCH_SIZE = 500  # Số event tối đa mỗi lần XREADGROUP / INSERT
+BLOCK_MS = 1000  # Chờ tối đa 1s nếu stream trống
+RETRY_DELAY_SECONDS = 5  # Chờ trước khi xử lý lại batch ghi PostgreSQL lỗi
+
+
+def parse_event(fields: dict) -> InteractionLog:
+    """Chuyển fields của một stream entry thành InteractionLog."""
+    metadata = fields.get("metadata")
+    return InteractionLog(
+        user_id=int(fields["user_id"]),
+        asin=fields["asin"],
+        event_type=EventType(fields["event_type"]),
+        metadata=json.loads(metadata) if metadata else None
+    )
+
+
+async def ensure_consumer_group(client: aioredis.Redis):
+    """Tạo consumer group (và stream nếu chưa có); bỏ qua nếu đã tồn tại."""
+    try:
+        await client.xgroup_create(EVENTS_STREAM_KEY, CONSUMER_GROUP, id="0", mkstream=True)
+        logger.info(f"Created consumer group {CONSUMER_GROUP} on stream {EVENTS_STREAM_KEY}")
+    except redis.ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def process_entries(client: aioredis.Redis, entries: list) -> int:
+    """
+    Ghi một batch stream entries vào PostgreSQL rồi XACK.
+
+    Returns:
+        Số event ghi thành công
+    """
+    interaction_logs = []
+    entry_ids = []
+    for entry_id, fields in entries:
+        entry_ids.append(entry_id)
+        try:
+            interaction_logs.append(parse_event(fields))
+        except (KeyError, ValueError) as e:
+            # Entry hỏng: ACK luôn để không xử lý lại mãi
+            logger.error(f"Invalid event {entry_id}: {e}")
+
+    async with AsyncSessionLocal() as db:
+        success_count = await EventLoggingService.log_interactions_batch(db, interaction_logs)
+
+    if interaction_logs and success_count == 0:
+        # Không ghi được event nào (thường do PostgreSQL lỗi): không ACK, đọc lại sau
+        raise RuntimeError(f"Failed to log batch of {len(interaction_logs)} interactions")
+
+    await client.xack(EVENTS_STREAM_KEY, CONSUMER_GROUP, *entry_ids)
+
+    if success_count < len(interaction_logs):
+        logger.error(
+            f"❌ Failed to log {len(interaction_logs) - success_count}/"
+            f"{len(interaction_logs)} interactions to PostgreSQL"
+        )
+
+    return success_count
+
+
+async def run_worker():
+    """Vòng lặp chính: xử lý các event pending của consumer này, sau đó đọc event mới."""
+    redis_url = settings.redis_url or "redis://localhost:6379/0"
+    client = aioredis.from_url(redis_url, decode_responses=True)
+
+    await ensure_consumer_group(client)
+    logger.info(f"Event worker {CONSUMER_NAME} started: stream={EVENTS_STREAM_KEY}, batch_size={BATCH_SIZE}")
+
+    # "0": các event đã đọc nhưng chưa ACK (worker trước bị dừng giữa chừng),
+    # hết pending thì chuyển sang ">" (event mới)
+    last_id = "0"
+
+    try:
+        while True:
+            response = await client.xreadgroup(
+                CONSUMER_GROUP,
+                CONSUMER_NAME,
+                {EVENTS_STREAM_KEY: last_id},
+                count=BATCH_SIZE,
+                block=BLOCK_MS
+            )
+
+            entries = response[0][1] if response else []
+            if not entries:
+                last_id = ">"
+                continue
+
+            try:
+                success_count = await process_entries(client, entries)
+                logger.info(f"✅ Logged {success_count} interactions to PostgreSQL")
+            except Exception as e:
+                logger.error(f"Error processing events, retry sau {RETRY_DELAY_SECONDS}s: {e}")
+                await asyncio.sleep(RETRY_DELAY_SECONDS)
+                last_id = "0"
+    finally:
+        await client.aclose()
+
+
+def main():
+    try:
+        asyncio.run(run_worker())
+    except KeyboardInterrupt:
+        logger.info("Event worker stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Precompute Similar Items
+========================
+
+Tính sẵn top-K items tương tự (cosine similarity trên item embeddings) cho mọi item
+và ghi vào Redis (hash similar:{item_id}: item_id -> score, TTL 7 ngày).
+
+ContentBasedRecallService đọc hash này thay vì search Qdrant mỗi request
+(trang chi tiết sản phẩm, content scores). Chạy lại sau mỗi lần train embeddings;
+entry không được ghi lại sẽ tự hết hạn theo TTL.
+
+Usage:
+    python backend/scripts/precompute_similar_items.py [--top-k 200] [--batch-size 1024]
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+import numpy as np
+import redis
+
+# Thêm backend vào path
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from app.config import settings
+from app.recommender.content_recall_service import (
+    SIMILAR_ITEMS_K,
+    SIMILAR_ITEMS_KEY,
+    SIMILAR_ITEMS_TTL_SECONDS,
+)
+
+
+def load_embeddings():
+    """Load item embeddings (đã L2-normalize) và item_ids từ artifacts/embeddings."""
+    embeddings_dir = BASE_DIR / "artifacts" / "embeddings"
+    # Fallback: artifacts ở project root
+    if not (embeddings_dir / "item_embeddings.npy").exists():
+        embeddings_dir = BASE_DIR.parent / "artifacts" / "embeddings"
+
+    embeddings = np.load(str(embeddings_dir / "item_embeddings.npy")).astype(np.float32)
+    with open(embeddings_dir / "item_ids.json", 'r', encoding='utf-8') as f:
+        item_ids = json.load(f)
+
+    if len(embeddings) != len(item_ids):
+        raise ValueError(f"Số lượng không khớp: {len(embeddings)} embeddings vs {len(item_ids)} item_ids")
+
+    # Normalize lại cho chắc (giống QdrantManager.search_similar_items)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms, [str(item_id) for item_id in item_ids]
+
+
+def precompute_similar_items(top_k: int = SIMILAR_ITEMS_K, batch_size: int = 1024):
+    """Tính top-K neighbors theo batch (matrix product) và ghi Redis bằng pipeline."""
+    embeddings, item_ids = load_embeddings()
+    num_items = len(item_ids)
+    top_k = min(top_k, num_items)
+    print(f"📦 Loaded {num_items:,} item embeddings, dim={embeddings.shape[1]}")
+
+    redis_url = settings.redis_url or "redis://localhost:6379/0"
+    client = redis.Redis.from_url(redis_url, decode_responses=True)
+
+    for start in range(0, num_items, batch_size):
+        end = min(start + batch_size, num_items)
+        scores = embeddings[start:end] @ embeddings.T
+
+        # Top-K mỗi hàng (chưa sort), rồi sort giảm dần theo score
+        # Giữ cả chính item (score = 1.0) giống kết quả search Qdrant
+        top_idx = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+        top_scores = np.take_along_axis(scores, top_idx, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top_idx = np.take_along_axis(top_idx, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        pipe = client.pipeline(transaction=False)
+        for row, item_id in enumerate(item_ids[start:end]):
+            key = SIMILAR_ITEMS_KEY.format(item_id=item_id)
+            pipe.delete(key)
+            pipe.hset(key, mapping={
+                item_ids[idx]: float(score)
+                for idx, score in zip(top_idx[row], top_scores[row])
+            })
+            pipe.expire(key, SIMILAR_ITEMS_TTL_SECONDS)
+        pipe.execute()
+
+        print(f"  ✅ {end:,}/{num_items:,} items")
+
+    print(f"✅ Done: cached top-{top_k} similar items for {num_items:,} items")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute similar items vào Redis")
+    parser.add_argument("--top-k", type=int, default=SIMILAR_ITEMS_K, help="Số neighbors mỗi item")
+    parser.add_argument("--batch-size", type=int, default=1024, help="Số items mỗi batch matrix product")
+    args = parser.parse_args()
+
+    precompute_similar_items(top_k=args.top_k, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
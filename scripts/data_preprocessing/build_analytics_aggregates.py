@@ -0,0 +1,218 @@
+"""
+Build Analytics Aggregates
+==========================
+Mục tiêu: Tính sẵn các aggregate nhỏ cho dashboard analytics
+- Phân bố rating của interactions_5core
+- Phân bố category của metadata_clean
+- Top items theo số lượng interactions
+- Thống kê tổng quan interactions (kèm train/test)
+- dashboard_stats.json: kết quả /cleaning-stats, /data-quality và /user-activity
+
+Endpoint /api/analytics/* đọc các file này thay vì group_by trên toàn bộ
+interactions mỗi request; nếu file chưa có hoặc cũ hơn dữ liệu nguồn thì
+endpoint tự fallback về tính trực tiếp.
+
+Chạy sau Phase 5: python scripts/data_preprocessing/build_analytics_aggregates.py
+"""
+
+import json
+import polars as pl
+from pathlib import Path
+import sys
+import io
+
+# Fix encoding cho Windows console
+if sys.platform == "win32":
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+
+# Số top items lưu sẵn; endpoint /top-items phục vụ mọi top_n <= giá trị này
+TOP_ITEMS_LIMIT = 1000
+
+# Dùng lại đúng các hàm tính của analytics routes để JSON tính sẵn cùng format với endpoint
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def build_rating_distribution(interactions_df: pl.DataFrame) -> pl.DataFrame:
+    """Phân bố rating: columns rating (int), count."""
+    return (
+        interactions_df.select(pl.col("rating").value_counts())
+        .unnest("rating")
+        .sort("rating")
+        .select([
+            pl.col("rating").cast(pl.Int64),
+            pl.col("count").cast(pl.Int64),
+        ])
+    )
+
+
+def build_category_distribution(metadata_df: pl.DataFrame) -> pl.DataFrame:
+    """Phân bố category (toàn bộ, sort giảm dần): columns category, count."""
+    return (
+        metadata_df.select(pl.col("main_category").value_counts(sort=True))
+        .unnest("main_category")
+        .filter(pl.col("main_category").is_not_null())
+        .select([
+            pl.col("main_category").alias("category"),
+            pl.col("count").cast(pl.Int64),
+        ])
+    )
+
+
+def build_top_items(interactions_df: pl.DataFrame, limit: int = TOP_ITEMS_LIMIT) -> pl.DataFrame:
+    """Top items theo số interactions: columns item_id, count."""
+    return (
+        interactions_df.select(pl.col("item_id").value_counts(sort=True))
+        .unnest("item_id")
+        .head(limit)
+        .with_columns(pl.col("count").cast(pl.Int64))
+    )
+
+
+def build_interaction_stats(
+    interactions_df: pl.DataFrame,
+    train_path: Path,
+    test_path: Path
+) -> dict:
+    """Thống kê tổng quan interactions, cùng format với /interaction-stats."""
+    summary = interactions_df.select([
+        pl.len().alias("total_interactions"),
+        pl.col("user_id").n_unique().alias("unique_users"),
+        pl.col("item_id").n_unique().alias("unique_items"),
+        pl.col("rating").mean().alias("avg_rating"),
+        pl.col("rating").min().alias("min_rating"),
+        pl.col("rating").max().alias("max_rating"),
+    ]).row(0, named=True)
+
+    stats = {
+        "total_interactions": summary["total_interactions"],
+        "unique_users": summary["unique_users"],
+        "unique_items": summary["unique_items"],
+        "avg_rating": float(summary["avg_rating"]),
+        "min_rating": float(summary["min_rating"]),
+        "max_rating": float(summary["max_rating"]),
+    }
+
+    if train_path.exists() and test_path.exists():
+        train_count = pl.scan_parquet(str(train_path)).select(pl.len()).collect().item()
+        test_count = pl.scan_parquet(str(test_path)).select(pl.len()).collect().item()
+        stats["train_count"] = train_count
+        stats["test_count"] = test_count
+        stats["train_ratio"] = train_count / (train_count + test_count)
+        stats["test_ratio"] = test_count / (train_count + test_count)
+
+    return stats
+
+
+def build_dashboard_stats(data_processed_dir: Path, embedding_dir: Path) -> dict:
+    """Tính sẵn data của /cleaning-stats, /data-quality và /user-activity (cùng format với endpoint)."""
+    from app.web.routes.analytics import (
+        _compute_user_activity,
+        _data_quality_stats,
+        _embedding_token_stats,
+        _interactions_5core_stats,
+        _reviews_cleaning_stats,
+    )
+
+    cleaning_stats = {}
+    reviews_stats = _reviews_cleaning_stats(
+        data_processed_dir / "reviews_normalized.parquet",
+        data_processed_dir / "reviews_clean.parquet",
+    )
+    if reviews_stats is not None:
+        cleaning_stats["reviews"] = reviews_stats
+    interactions_stats = _interactions_5core_stats(
+        data_processed_dir / "interactions_all.parquet",
+        data_processed_dir / "interactions_5core.parquet",
+        data_processed_dir / "interactions_5core_train.parquet",
+        data_processed_dir / "interactions_5core_test.parquet",
+    )
+    if interactions_stats is not None:
+        cleaning_stats["interactions_5core"] = interactions_stats
+    token_stats = _embedding_token_stats(embedding_dir / "embedding_text.parquet")
+    if token_stats is not None:
+        cleaning_stats["embedding_tokens"] = token_stats
+
+    data_quality = _data_quality_stats(
+        data_processed_dir / "reviews_raw.parquet",
+        data_processed_dir / "reviews_normalized.parquet",
+        data_processed_dir / "metadata_raw.parquet",
+        data_processed_dir / "metadata_normalized.parquet",
+    )
+
+    dashboard_stats = {
+        "cleaning_stats": cleaning_stats,
+        "data_quality": data_quality,
+    }
+
+    interactions_path = data_processed_dir / "interactions_5core.parquet"
+    if interactions_path.exists():
+        dashboard_stats["user_activity"] = _compute_user_activity(interactions_path)
+
+    return dashboard_stats
+
+
+def main():
+    """Hàm chính để build các analytics aggregates."""
+    # Xác định đường dẫn project root
+    script_path = Path(__file__).resolve()
+    current = script_path.parent
+    while current != current.parent:
+        data_dir = current / "data"
+        if data_dir.exists() and (data_dir / "processed").exists():
+            project_root = current
+            break
+        current = current.parent
+    else:
+        project_root = script_path.parent.parent.parent
+
+    data_processed_dir = project_root / "data" / "processed"
+    interactions_path = data_processed_dir / "interactions_5core.parquet"
+    train_path = data_processed_dir / "interactions_5core_train.parquet"
+    test_path = data_processed_dir / "interactions_5core_test.parquet"
+    metadata_path = data_processed_dir / "metadata_clean.parquet"
+
+    print("=" * 80)
+    print("BUILD ANALYTICS AGGREGATES")
+    print("=" * 80)
+
+    if not interactions_path.exists():
+        raise FileNotFoundError(f"Không tìm thấy file: {interactions_path}")
+
+    print(f"Đang load interactions: {interactions_path}")
+    interactions_df = pl.read_parquet(str(interactions_path), columns=["user_id", "item_id", "rating"])
+    print(f"[OK] Đã load {len(interactions_df):,} interactions")
+
+    rating_path = data_processed_dir / "agg_rating_distribution.parquet"
+    build_rating_distribution(interactions_df).write_parquet(str(rating_path))
+    print(f"[OK] Đã lưu: {rating_path}")
+
+    top_items_path = data_processed_dir / "agg_top_items.parquet"
+    build_top_items(interactions_df).write_parquet(str(top_items_path))
+    print(f"[OK] Đã lưu: {top_items_path}")
+
+    stats_path = data_processed_dir / "interaction_stats.json"
+    with open(stats_path, 'w', encoding='utf-8') as f:
+        json.dump(build_interaction_stats(interactions_df, train_path, test_path), f, indent=2)
+    print(f"[OK] Đã lưu: {stats_path}")
+
+    if metadata_path.exists():
+        metadata_df = pl.read_parquet(str(metadata_path), columns=["main_category"])
+        category_path = data_processed_dir / "agg_category_distribution.parquet"
+        build_category_distribution(metadata_df).write_parquet(str(category_path))
+        print(f"[OK] Đã lưu: {category_path}")
+    else:
+        print(f"[WARN] Không tìm thấy {metadata_path}, bỏ qua category distribution")
+
+    dashboard_stats_path = data_processed_dir / "dashboard_stats.json"
+    dashboard_stats = build_dashboard_stats(data_processed_dir, project_root / "data" / "embedding")
+    with open(dashboard_stats_path, 'w', encoding='utf-8') as f:
+        json.dump(dashboard_stats, f, indent=2)
+    print(f"[OK] Đã lưu: {dashboard_stats_path}")
+
+    print("\n[OK] Đã build analytics aggregates thành công!")
+
+
+if __name__ == "__main__":
+    main()
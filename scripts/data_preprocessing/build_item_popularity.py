@@ -12,6 +12,7 @@ Usage:
 import sys
 from pathlib import Path
 import polars as pl
+import pyarrow.parquet as pq
 import numpy as np
 import io
 
@@ -183,7 +184,18 @@ def save_popularity_stats(popularity_df: pl.DataFrame, output_path: Path):
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
     print(f"\nĐang lưu popularity statistics: {output_path}")
-    popularity_df.write_parquet(str(output_path))
+    # Giữ thứ tự interaction_count giảm dần và khai báo sorting_columns trong footer
+    # để /api/analytics/item-popularity chỉ cần đọc top_n dòng đầu (không phải sort lại)
+    popularity_df = popularity_df.sort("interaction_count", descending=True)
+    sort_index = popularity_df.columns.index("interaction_count")
+    popularity_df.write_parquet(
+        str(output_path),
+        use_pyarrow=True,
+        pyarrow_options={
+            "sorting_columns": [pq.SortingColumn(sort_index, descending=True)],
+            "write_statistics": True,
+        },
+    )
     
     file_size_mb = output_path.stat().st_size / (1024 * 1024)
     print(f"[OK] Đã lưu {len(popularity_df):,} items vào {output_path}")
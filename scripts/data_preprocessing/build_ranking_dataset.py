@@ -433,7 +433,7 @@ def main():
         print(f"\nSố dòng dataset: {len(df_ranking):,}")
         
         # Thống kê label
-        label_counts = df_ranking.group_by('label').agg(pl.count().alias('count')).sort('label')
+        label_counts = df_ranking.group_by('label').agg(pl.len().alias('count')).sort('label')
         print(f"\nTỷ lệ label:")
         for row in label_counts.to_dicts():
             label = row['label']
@@ -224,7 +224,9 @@ def save_normalized_data(reviews_df: pl.DataFrame, metadata_df: pl.DataFrame, ou
     metadata_path = output_dir / "metadata_normalized.parquet"
     
     print(f"\nĐang lưu reviews: {reviews_path}")
-    reviews_df.write_parquet(str(reviews_path))
+    # Ghi kèm column statistics (min/max/null_count) để các reader lazy
+    # (analytics) có thể bỏ qua row group theo predicate trên rating
+    reviews_df.write_parquet(str(reviews_path), statistics=True)
     
     print(f"Đang lưu metadata: {metadata_path}")
     metadata_df.write_parquet(str(metadata_path))
@@ -357,7 +357,7 @@ def clean_metadata(metadata_df: pl.DataFrame) -> tuple[pl.DataFrame, dict]:
     normalized_count = before_cat_normalization - after_cat_normalization
     
     # Thống kê category distribution
-    cat_dist = current_df.group_by("main_category").agg(pl.count().alias("count")).sort("count", descending=True)
+    cat_dist = current_df.group_by("main_category").agg(pl.len().alias("count")).sort("count", descending=True)
     print(f"  Normalized {normalized_count:,} products từ 'All Beauty' sang category cụ thể")
     print(f"  Category distribution:")
     for row in cat_dist.head(10).to_dicts():
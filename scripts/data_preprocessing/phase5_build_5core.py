@@ -170,6 +170,29 @@ def step3_split_train_test(interactions_df: pl.DataFrame) -> tuple[pl.DataFrame,
     return train_df, test_df
 
 
+# Cột id/rating đặt đầu để các reader chỉ project vài cột (analytics, training)
+# đọc các column chunk liền nhau trong mỗi row group
+INTERACTION_LEADING_COLUMNS = ["user_id", "item_id", "rating"]
+
+
+def write_interactions_parquet(df: pl.DataFrame, path: Path):
+    """
+    Ghi interactions ra parquet với thứ tự cột và options cố định.
+    
+    Args:
+        df: Interactions DataFrame
+        path: Đường dẫn file output
+    """
+    leading = [col for col in INTERACTION_LEADING_COLUMNS if col in df.columns]
+    ordered = df.select(leading + [col for col in df.columns if col not in leading])
+    ordered.write_parquet(
+        str(path),
+        compression="zstd",
+        statistics=True,
+        row_group_size=1_000_000,
+    )
+
+
 def save_5core_data(
     interactions_5core: pl.DataFrame,
     train_df: pl.DataFrame,
@@ -192,13 +215,13 @@ def save_5core_data(
     test_path = output_dir / "interactions_5core_test.parquet"
     
     print(f"\nĐang lưu 5-core interactions: {interactions_path}")
-    interactions_5core.write_parquet(str(interactions_path))
+    write_interactions_parquet(interactions_5core, interactions_path)
     
     print(f"Đang lưu train: {train_path}")
-    train_df.write_parquet(str(train_path))
+    write_interactions_parquet(train_df, train_path)
     
     print(f"Đang lưu test: {test_path}")
-    test_df.write_parquet(str(test_path))
+    write_interactions_parquet(test_df, test_path)
     
     print("\n[OK] Đã lưu dữ liệu 5-core thành công!")
 
@@ -273,10 +296,11 @@ def main():
     # Thống kê bổ sung
     print("\n[THỐNG KÊ BỔ SUNG]")
     print("-" * 80)
-    avg_interactions_per_user = train_df.group_by("user_id").agg(pl.len().alias("count"))["count"].mean()
+    # Trung bình số dòng mỗi nhóm = tổng số dòng / số key unique, không cần group_by
+    avg_interactions_per_user = len(train_df) / train_df["user_id"].n_unique()
     print(f"Trung bình interactions/user trong train: {avg_interactions_per_user:.2f}")
     
-    avg_interactions_per_item = train_df.group_by("item_id").agg(pl.len().alias("count"))["count"].mean()
+    avg_interactions_per_item = len(train_df) / train_df["item_id"].n_unique()
     print(f"Trung bình interactions/item trong train: {avg_interactions_per_item:.2f}")
     
     print("\n" + "=" * 80)
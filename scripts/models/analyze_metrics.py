@@ -22,7 +22,7 @@ print(f"  Unique items: {test_df['item_id'].n_unique():,}")
 print(f"  Avg interactions per user: {len(test_df) / test_df['user_id'].n_unique():.2f}")
 
 print(f"\n[2] Rating Distribution:")
-rating_dist = test_df.group_by('rating').agg(pl.count().alias('count')).sort('rating')
+rating_dist = test_df.group_by('rating').agg(pl.len().alias('count')).sort('rating')
 for row in rating_dist.iter_rows(named=True):
     pct = row['count'] / len(test_df) * 100
     print(f"  Rating {row['rating']}: {row['count']:,} ({pct:.1f}%)")
@@ -34,8 +34,12 @@ print(f"\n[3] Positive Items (rating >= {positive_threshold}):")
 print(f"  Total positive interactions: {len(positive_df):,} ({len(positive_df)/len(test_df)*100:.1f}%)")
 print(f"  Users with positive items: {positive_df['user_id'].n_unique():,}")
 
-# Phân tích interactions per user
-user_interactions = test_df.group_by('user_id').agg(pl.count().alias('count'))
+# Phân tích interactions per user và unique items per user (một lần group_by)
+user_stats = test_df.group_by('user_id').agg([
+    pl.len().alias('count'),
+    pl.col('item_id').n_unique().alias('unique_items'),
+])
+user_interactions = user_stats.select('count')
 print(f"\n[4] Interactions per User:")
 print(f"  Min: {user_interactions['count'].min()}")
 print(f"  Max: {user_interactions['count'].max()}")
@@ -43,7 +47,7 @@ print(f"  Mean: {user_interactions['count'].mean():.2f}")
 print(f"  Median: {user_interactions['count'].median():.2f}")
 
 # Phân tích items per user
-user_items = test_df.group_by('user_id').agg(pl.col('item_id').n_unique().alias('unique_items'))
+user_items = user_stats.select('unique_items')
 print(f"\n[5] Unique Items per User:")
 print(f"  Min: {user_items['unique_items'].min()}")
 print(f"  Max: {user_items['unique_items'].max()}")